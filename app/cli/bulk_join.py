@@ -0,0 +1,93 @@
+"""
+Bulk membership import
+
+Joins the user IDs listed in a file (one UUID per line, '-' for stdin) to a
+community via sp_community_bulk_join. Runs as a trusted operator tool: the
+organizer check is skipped. Joined users' home timelines are dropped from Redis
+so they are rebuilt with the community, as the HTTP bulk join does.
+
+Usage:
+    python -m app.cli.bulk_join <community_id> <user_ids_file> [--batch-size N] [--details]
+"""
+import argparse
+import asyncio
+import sys
+from typing import Iterator, List, TextIO
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.database import db
+from app.core.logging_config import setup_logging
+from app.core.redis import redis_client
+from app.services.community_service import CommunityService
+from app.services.timeline_service import TimelineService
+
+def read_user_ids(source: TextIO) -> Iterator[UUID]:
+    for line_number, line in enumerate(source, start=1):
+        value = line.strip()
+        if not value or value.startswith("#"):
+            continue
+        try:
+            yield UUID(value)
+        except ValueError:
+            raise SystemExit(f"line {line_number}: not a UUID: {value!r}")
+
+def batched(user_ids: Iterator[UUID], size: int) -> Iterator[List[UUID]]:
+    batch: List[UUID] = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def run(community_id: UUID, source: TextIO, batch_size: int, details: bool) -> int:
+    await db.connect()
+    await redis_client.connect()
+    service = CommunityService(db)
+    timeline = TimelineService(db)
+    totals = {"requested": 0, "joined": 0, "already_member": 0, "user_not_found": 0, "community_full": 0}
+
+    try:
+        for batch in batched(read_user_ids(source), batch_size):
+            # Each batch commits on its own, so a rerun after a failure only redoes the rest
+            result = await service.bulk_join_community(
+                community_id=community_id,
+                requesting_user_id=None,
+                user_ids=batch
+            )
+            await timeline.invalidate([row.user_id for row in result.results if row.outcome == 'joined'])
+            for key in totals:
+                totals[key] += getattr(result, key)
+            if details:
+                for row in result.results:
+                    print(f"{row.user_id}\t{row.outcome}")
+
+    except HTTPException as e:
+        print(f"error: {e.detail}", file=sys.stderr)
+        return 1
+
+    finally:
+        await redis_client.disconnect()
+        await db.disconnect()
+
+    print(", ".join(f"{key}={value}" for key, value in totals.items()), file=sys.stderr)
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Join many users to a community")
+    parser.add_argument("community_id", type=UUID)
+    parser.add_argument("user_ids_file", type=argparse.FileType("r"))
+    parser.add_argument("--batch-size", type=int, default=settings.BULK_JOIN_MAX_USERS)
+    parser.add_argument("--details", action="store_true", help="print one outcome per user")
+    args = parser.parse_args()
+
+    setup_logging(settings.ENVIRONMENT)
+    batch_size = max(1, min(args.batch_size, settings.BULK_JOIN_MAX_USERS))
+    sys.exit(asyncio.run(run(args.community_id, args.user_ids_file, batch_size, args.details)))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 class Settings(BaseSettings):
     # Environment
@@ -27,12 +27,135 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
 
+    # Operator endpoints (/api/v1/admin/*, X-Admin-Key header; disabled when empty)
+    ADMIN_API_KEY: str = ""
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
 
+    # Realtime (Server-Sent Events over LISTEN/NOTIFY)
+    SSE_ENABLED: bool = True
+    SSE_HEARTBEAT_SECONDS: int = 15
+    SSE_SUBSCRIBER_QUEUE_SIZE: int = 100
+    SSE_MAX_SUBSCRIBERS: int = 10000
+
+    # Author profile cache (hydrates list responses)
+    AUTHOR_CACHE_SIZE: int = 5000
+    AUTHOR_CACHE_TTL_SECONDS: int = 300
+
+    # Pinned posts (served as a separate, cached feed section)
+    PINNED_POSTS_LIMIT: int = 10
+    PINNED_CACHE_SIZE: int = 10000
+    PINNED_CACHE_TTL_SECONDS: int = 60
+
+    # Trending rankings
+    TRENDING_ENABLED: bool = True
+    TRENDING_REFRESH_SECONDS: int = 300
+    TRENDING_WINDOW_HOURS: int = 168
+    TRENDING_HALF_LIFE_HOURS: float = 48.0
+    TRENDING_JOIN_WEIGHT: float = 1.0
+    TRENDING_POST_WEIGHT: float = 3.0
+    TRENDING_REACTION_WEIGHT: float = 0.5
+    TRENDING_FEATURED_BOOST: float = 10.0
+
+    # Tag autocomplete index
+    TAG_INDEX_REBUILD_SECONDS: int = 3600
+
+    # Idempotency-Key support for write endpoints (stored in Redis)
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    # Request profiling (pyinstrument; signed X-Profile header or random sample)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: str = ""
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_MAX_PROFILES: int = 50
+
+    # Health monitor (background dependency checks; probes read the cached result)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_FAILURE_THRESHOLD: int = 3
+    HEALTH_STALE_SECONDS: float = 30.0
+
+    # Admission control (adaptive concurrency limit, load shedding)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 40
+    ADMISSION_MIN_LIMIT: int = 5
+    ADMISSION_MAX_LIMIT: int = 400
+    ADMISSION_LATENCY_TARGET_MS: float = 100.0
+    ADMISSION_QUEUE_SIZE: int = 200
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Query timeouts (per-procedure overrides of the call sites' budgets, in seconds)
+    PROCEDURE_TIMEOUTS: Dict[str, float] = {}
+    CANCEL_ON_DISCONNECT: bool = True
+
+    # Slow procedure capture (ring buffer, optional sampled auto_explain plans)
+    SLOW_PROCEDURE_THRESHOLD_MS: float = 500.0
+    SLOW_PROCEDURE_BUFFER_SIZE: int = 200
+    SLOW_EXPLAIN_ENABLED: bool = False
+    SLOW_EXPLAIN_SAMPLE_RATE: float = 0.1
+    SLOW_EXPLAIN_COOLDOWN_SECONDS: int = 60
+
+    # Request coalescing (identical concurrent calls share one procedure execution)
+    SINGLEFLIGHT_ENABLED: bool = True
+    COALESCED_PROCEDURES: List[str] = [
+        "activity.sp_community_get_by_id",
+        "activity.sp_community_get_content_versions",
+        "activity.sp_community_post_get_feed",
+        "activity.sp_community_post_get_comments",
+        "activity.sp_community_post_get_feed_json",
+        "activity.sp_community_post_get_comments_json",
+        "activity.sp_community_get_trending",
+    ]
+
+    # Pagination (?count=capped upper bound)
+    PAGINATION_COUNT_CAP: int = 1000
+
+    # Feed, comment and member pages assembled as JSON by the database (*_json procedures)
+    DB_JSON_LISTS: bool = False
+
+    # Home timeline (fan-out on write to Redis, fan-in for large communities)
+    TIMELINE_ENABLED: bool = True
+    TIMELINE_FANOUT_MAX_MEMBERS: int = 10000
+    TIMELINE_MAX_LENGTH: int = 800
+    TIMELINE_TTL_SECONDS: int = 604800
+    TIMELINE_FANOUT_BATCH_SIZE: int = 1000
+
+    # Transactional outbox relay ("redis" stream sink, or "memory" for local runs)
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_SINK: Literal["redis", "memory"] = "redis"
+    OUTBOX_STREAM_KEY: str = "community:events"
+    OUTBOX_STREAM_MAXLEN: int = 100000
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_LAG_TARGET_SECONDS: float = 1.0
+
+    # Retention purge of soft-deleted posts/comments (destructive, opt-in)
+    RETENTION_ENABLED: bool = False
+    RETENTION_DAYS: int = 30
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.2
+    RETENTION_MAX_BATCHES_PER_RUN: int = 200
+    RETENTION_ARCHIVE: bool = True
+
+    # Bulk membership import
+    BULK_JOIN_MAX_USERS: int = 50000
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2000
+
     class Config:
         env_file = ".env"
         case_sensitive = True
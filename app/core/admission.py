@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from app.config import settings
+
+# Priority classes, most important first
+READ = "read"
+WRITE = "write"
+EXPENSIVE = "expensive"
+PRIORITIES = (READ, WRITE, EXPENSIVE)
+
+# Share of the concurrency limit each class may use: lower classes are shed first
+CAPACITY_SHARE = {READ: 1.0, WRITE: 0.9, EXPENSIVE: 0.5}
+
+# Classes allowed to wait for a slot (expensive calls are rejected right away)
+QUEUEABLE = (READ, WRITE)
+
+# Multiplicative decrease factor, and minimum spacing between decreases
+BACKOFF = 0.9
+BACKOFF_INTERVAL_SECONDS = 0.1
+
+class AdmissionController:
+    """
+    Adaptive concurrency limit (AIMD) for in-flight requests
+    - Every stored procedure call reports its latency (pool wait included)
+    - Latency above ADMISSION_LATENCY_TARGET_MS: limit *= 0.9 (at most every 100ms)
+    - Latency on target while the limit is in use: limit grows by ~1 per limit's worth of calls
+    - Requests over their class's share of the limit wait briefly (reads, writes) or are rejected
+    """
+
+    def __init__(self):
+        self.limit = float(settings.ADMISSION_INITIAL_LIMIT)
+        self.in_flight = 0
+        self.latency_ewma_ms = 0.0
+        self._last_backoff = 0.0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self.admitted: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.rejected: Dict[str, int] = {p: 0 for p in PRIORITIES}
+
+    def _capacity(self, priority: str) -> int:
+        return max(1, int(self.limit * CAPACITY_SHARE[priority]))
+
+    def _queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _queued_ahead(self, priority: str) -> bool:
+        """Waiters of the same or a higher class: a new request must not overtake them"""
+        ranks = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        return any(self._waiters[p] for p in ranks)
+
+    async def acquire(self, priority: str) -> bool:
+        """Take a slot (True), or False if the request should be shed"""
+        if self.in_flight < self._capacity(priority) and not self._queued_ahead(priority):
+            self.in_flight += 1
+            self.admitted[priority] += 1
+            return True
+
+        if priority not in QUEUEABLE or self._queued() >= settings.ADMISSION_QUEUE_SIZE:
+            self.rejected[priority] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            # release() hands the slot over: in_flight is already counted for us
+            await asyncio.wait_for(waiter, timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._discard(priority, waiter)
+            self.rejected[priority] += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Slot was handed over as we were cancelled
+            else:
+                self._discard(priority, waiter)
+            raise
+
+        self.admitted[priority] += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        """Hand free slots to queued waiters, highest class first"""
+        for priority in PRIORITIES:
+            waiters = self._waiters[priority]
+            while waiters:
+                if waiters[0].done():
+                    waiters.popleft()  # Timed out or cancelled while queued
+                    continue
+                if self.in_flight >= self._capacity(priority):
+                    break
+                self.in_flight += 1
+                waiters.popleft().set_result(None)
+
+    def _discard(self, priority: str, waiter: asyncio.Future):
+        try:
+            self._waiters[priority].remove(waiter)
+        except ValueError:
+            pass
+
+    def observe_latency(self, seconds: float):
+        latency_ms = seconds * 1000
+        self.latency_ewma_ms = 0.9 * self.latency_ewma_ms + 0.1 * latency_ms
+
+        if latency_ms > settings.ADMISSION_LATENCY_TARGET_MS:
+            now = time.monotonic()
+            if now - self._last_backoff >= BACKOFF_INTERVAL_SECONDS:
+                self._last_backoff = now
+                self.limit = max(settings.ADMISSION_MIN_LIMIT, self.limit * BACKOFF)
+        elif self.in_flight >= self.limit * 0.8:
+            self.limit = min(settings.ADMISSION_MAX_LIMIT, self.limit + 1 / self.limit)
+            self._wake()  # A higher limit may free slots for queued requests
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": {p: len(self._waiters[p]) for p in PRIORITIES},
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2),
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+        }
+
+admission = AdmissionController()
@@ -1,5 +1,6 @@
+import hmac
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from typing import Optional, Dict
 import structlog
@@ -7,6 +8,7 @@ from app.config import settings
 
 logger = structlog.get_logger()
 security = HTTPBearer()
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
 
 class CurrentUser:
     """Container for current user from JWT token"""
@@ -75,3 +77,15 @@ async def get_current_user_optional(
         )
     except HTTPException:
         return None
+
+async def require_admin(api_key: Optional[str] = Depends(admin_key_header)) -> None:
+    """Operator endpoints: X-Admin-Key must match ADMIN_API_KEY (disabled when unset)"""
+    if (
+        not settings.ADMIN_API_KEY
+        or not api_key
+        or not hmac.compare_digest(api_key.encode(), settings.ADMIN_API_KEY.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
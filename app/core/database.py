@@ -36,6 +36,13 @@ class Database:
         async with self.pool.acquire() as connection:
             yield connection
 
+    @asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[asyncpg.Connection, None]:
+        """Get connection from pool with an open transaction (committed on exit)"""
+        async with self.get_connection() as connection:
+            async with connection.transaction():
+                yield connection
+
 db = Database()
 
 async def get_db() -> Database:
@@ -22,12 +22,23 @@ ERROR_STATUS_MAP: Dict[str, int] = {
     'LINK_ALREADY_EXISTS': 409,
     'COMMUNITY_NOT_ACTIVE': 400,
     'POST_NOT_PUBLISHED': 400,
+    'PINNED_LIMIT_REACHED': 409,
     'COMMENT_DELETED': 400,
     'PARENT_COMMENT_NOT_FOUND': 400,
     'INVALID_COMMUNITY_TYPE': 400,
     'INVALID_TARGET_TYPE': 400,
     'TARGET_NOT_FOUND': 404,
     'NOT_ORGANIZATION_MEMBER': 403,
+    'STREAM_CAPACITY_REACHED': 503,
+    'STREAMS_DISABLED': 503,
+    'INVALID_IDEMPOTENCY_KEY': 400,
+    'IDEMPOTENCY_KEY_IN_PROGRESS': 409,
+    'IDEMPOTENCY_KEY_REUSED': 422,
+    'BULK_JOIN_TOO_LARGE': 413,
+    'INVALID_CURSOR': 400,
+    'SERVER_OVERLOADED': 503,
+    'QUERY_TIMEOUT': 504,
+    'PROFILE_NOT_FOUND': 404,
 }
 
 # Error code to human-readable message mapping
@@ -50,12 +61,23 @@ ERROR_MESSAGES: Dict[str, str] = {
     'LINK_ALREADY_EXISTS': 'Activity already linked to community',
     'COMMUNITY_NOT_ACTIVE': 'Community is not active',
     'POST_NOT_PUBLISHED': 'Post is not published',
+    'PINNED_LIMIT_REACHED': 'Too many pinned posts, unpin one first',
     'COMMENT_DELETED': 'Comment has been deleted',
     'PARENT_COMMENT_NOT_FOUND': 'Parent comment not found',
     'INVALID_COMMUNITY_TYPE': 'Invalid community type',
     'INVALID_TARGET_TYPE': 'Invalid target type',
     'TARGET_NOT_FOUND': 'Target not found',
     'NOT_ORGANIZATION_MEMBER': 'Not an organization member',
+    'STREAM_CAPACITY_REACHED': 'Too many open streams, retry later',
+    'STREAMS_DISABLED': 'Live streams are disabled',
+    'INVALID_IDEMPOTENCY_KEY': 'Idempotency-Key must be at most 255 characters',
+    'IDEMPOTENCY_KEY_IN_PROGRESS': 'A request with this Idempotency-Key is still in progress',
+    'IDEMPOTENCY_KEY_REUSED': 'Idempotency-Key was already used for a different request',
+    'BULK_JOIN_TOO_LARGE': 'Too many user IDs in one bulk join',
+    'INVALID_CURSOR': 'Invalid pagination cursor',
+    'SERVER_OVERLOADED': 'Server is overloaded, retry later',
+    'QUERY_TIMEOUT': 'The request took too long to process, retry later',
+    'PROFILE_NOT_FOUND': 'No profile stored for this trace ID',
 }
 
 def parse_db_error(error_message: str) -> str:
@@ -67,16 +89,19 @@ def parse_db_error(error_message: str) -> str:
                 return error_code
     return "UNKNOWN_ERROR"
 
+def error_detail(error_code: str) -> Dict[str, str]:
+    """Error body used by HTTPException detail (and by middleware responses)"""
+    return {
+        "detail": ERROR_MESSAGES.get(error_code, "An unexpected error occurred"),
+        "error_code": error_code,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 def raise_http_exception(error_code: str):
     """Raise HTTPException with proper status code and message"""
     status_code = ERROR_STATUS_MAP.get(error_code, 500)
-    message = ERROR_MESSAGES.get(error_code, "An unexpected error occurred")
 
     raise HTTPException(
         status_code=status_code,
-        detail={
-            "detail": message,
-            "error_code": error_code,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        detail=error_detail(error_code)
     )
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from typing import Dict, Optional
+import structlog
+
+from app.config import settings
+from app.core.database import db
+from app.core.redis import redis_client
+from app.utils.periodic import PeriodicTask
+
+logger = structlog.get_logger()
+
+OK = "ok"
+ERROR = "error"
+SATURATED = "saturated"
+UNAVAILABLE = "unavailable"
+
+class HealthMonitor:
+    """
+    Background dependency checks; probes are answered from the last result
+    - Every HEALTH_CHECK_INTERVAL_SECONDS: SELECT 1 on the pool, PING on Redis
+      (each bounded by HEALTH_CHECK_TIMEOUT_SECONDS)
+    - A saturated pool (no idle connections at max size) skips the database probe
+      so it never queues behind real queries; it is reported as "saturated" and
+      the failure count is left as it was
+    - Readiness fails after HEALTH_FAILURE_THRESHOLD consecutive database failures,
+      or when the last check is older than HEALTH_STALE_SECONDS
+    - Redis is optional (features degrade gracefully): reported, never fails readiness
+    """
+
+    def __init__(self):
+        self.checks: Dict[str, str] = {"database": UNAVAILABLE, "redis": UNAVAILABLE}
+        self.pool: Dict[str, int] = {}
+        self.database_failures = 0
+        self.checked_at: Optional[float] = None
+        self._task = PeriodicTask(
+            "health_monitor",
+            settings.HEALTH_CHECK_INTERVAL_SECONDS,
+            self.run_checks
+        )
+
+    def start(self):
+        self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    async def run_checks(self):
+        self.pool = self._pool_stats()
+        saturated = bool(self.pool) and self.pool["idle"] == 0 and self.pool["size"] >= self.pool["max_size"]
+
+        if saturated and self.checked_at is not None:
+            self.checks["database"] = SATURATED  # No new information: failure count unchanged
+        else:
+            database_ok = await self._check("database", self._ping_database)
+            self.checks["database"] = OK if database_ok else ERROR
+            self.database_failures = 0 if database_ok else self.database_failures + 1
+
+        if redis_client.client is None:
+            self.checks["redis"] = UNAVAILABLE
+        else:
+            self.checks["redis"] = OK if await self._check("redis", redis_client.client.ping) else ERROR
+
+        self.checked_at = time.monotonic()
+
+    async def _check(self, name: str, probe) -> bool:
+        try:
+            await asyncio.wait_for(probe(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("health_check_failed", check=name, error=str(e), error_type=type(e).__name__)
+            return False
+
+    async def _ping_database(self):
+        async with db.get_connection() as conn:
+            await conn.fetchval("SELECT 1")
+
+    def _pool_stats(self) -> Dict[str, int]:
+        if db.pool is None:
+            return {}
+        size = db.pool.get_size()
+        idle = db.pool.get_idle_size()
+        return {"size": size, "idle": idle, "in_use": size - idle, "max_size": db.pool.get_max_size()}
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        if self.checked_at is None:
+            return None
+        return time.monotonic() - self.checked_at
+
+    @property
+    def ready(self) -> bool:
+        age = self.age_seconds
+        if age is None or age > settings.HEALTH_STALE_SECONDS:
+            return False
+        # A single failed check (a blip) doesn't take the instance out of rotation
+        return self.database_failures < settings.HEALTH_FAILURE_THRESHOLD
+
+    def snapshot(self) -> Dict[str, object]:
+        age = self.age_seconds
+        ready = self.ready
+        if not ready:
+            status = "unavailable"
+        elif any(check != OK for check in self.checks.values()):
+            status = "degraded"
+        else:
+            status = "ok"
+        return {
+            "status": status,
+            "ready": ready,
+            "checks": {"api": OK, **self.checks},
+            "pool": self.pool,
+            "checked_seconds_ago": round(age, 3) if age is not None else None,
+        }
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,174 @@
+import asyncio
+import functools
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+from redis.exceptions import RedisError
+import structlog
+
+from app.config import settings
+from app.core.errors import raise_http_exception
+from app.core.redis import redis_client
+
+logger = structlog.get_logger()
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# In-flight originals on this worker, so local duplicates don't poll Redis
+_inflight: Dict[str, asyncio.Future] = {}
+
+def idempotent(status_code: int = 200):
+    """
+    Answer retries of a write endpoint from the first response
+    - Keyed by (user, Idempotency-Key header); no header = normal execution
+    - Reusing a key for another method, path or body is rejected (IDEMPOTENCY_KEY_REUSED)
+    - First response (success or 4xx) is stored in Redis for IDEMPOTENCY_TTL_SECONDS
+    - Concurrent duplicates wait for the original instead of running the procedure
+    - Endpoint must take `request: Request` and `current_user: CurrentUser`
+    """
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Optional[Request] = kwargs.get("request")
+            current_user = kwargs.get("current_user")
+            key = request.headers.get(IDEMPOTENCY_HEADER) if request else None
+
+            if (
+                not settings.IDEMPOTENCY_ENABLED
+                or not key
+                or current_user is None
+                or redis_client.client is None
+            ):
+                return await func(*args, **kwargs)
+
+            if len(key) > MAX_KEY_LENGTH:
+                raise_http_exception("INVALID_IDEMPOTENCY_KEY")
+
+            return await _execute_once(
+                storage_key=_storage_key(current_user.user_id, key),
+                fingerprint=await _fingerprint(request),
+                status_code=status_code,
+                call=lambda: func(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+async def _fingerprint(request: Request) -> str:
+    """Method, path and body hash (the body is already read and cached by FastAPI)"""
+    body_digest = hashlib.sha256(await request.body()).hexdigest()
+    return f"{request.method} {request.url.path} {body_digest}"
+
+def _storage_key(user_id: str, key: str) -> str:
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"idempotency:{user_id}:{digest}"
+
+async def _execute_once(
+    storage_key: str,
+    fingerprint: str,
+    status_code: int,
+    call: Callable
+):
+    redis = redis_client.client
+    pending = json.dumps({"state": "pending", "fingerprint": fingerprint})
+
+    try:
+        acquired = await redis.set(
+            storage_key, pending, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+    except RedisError as e:
+        logger.warning("idempotency_store_unavailable", error=str(e))
+        return await call()
+
+    if not acquired:
+        record = await _wait_for_record(storage_key)
+        if record is None:
+            raise_http_exception("IDEMPOTENCY_KEY_IN_PROGRESS")
+        if record["fingerprint"] != fingerprint:
+            raise_http_exception("IDEMPOTENCY_KEY_REUSED")
+
+        logger.info("idempotent_replay", fingerprint=fingerprint, status_code=record["status_code"])
+        return JSONResponse(
+            status_code=record["status_code"],
+            content=record["body"],
+            headers={REPLAYED_HEADER: "true"}
+        )
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[storage_key] = future
+    record = None
+
+    try:
+        result = await call()
+        if not isinstance(result, Response):
+            record = _record(fingerprint, status_code, jsonable_encoder(result))
+        return result
+
+    except HTTPException as e:
+        # Deterministic client errors (ALREADY_MEMBER, ...) are replayed too
+        if 400 <= e.status_code < 500:
+            record = _record(fingerprint, e.status_code, {"detail": e.detail})
+        raise
+
+    finally:
+        _inflight.pop(storage_key, None)
+        future.set_result(record)
+        await _finish(storage_key, record)
+
+def _record(fingerprint: str, status_code: int, body: Any) -> Dict[str, Any]:
+    return {
+        "state": "complete",
+        "fingerprint": fingerprint,
+        "status_code": status_code,
+        "body": body,
+    }
+
+async def _finish(storage_key: str, record: Optional[Dict[str, Any]]):
+    """Store the completed response, or release the key so a retry can run"""
+    redis = redis_client.client
+    try:
+        if record is None:
+            await redis.delete(storage_key)
+        else:
+            await redis.set(storage_key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+    except RedisError as e:
+        logger.warning("idempotency_store_failed", error=str(e))
+
+async def _wait_for_record(storage_key: str) -> Optional[Dict[str, Any]]:
+    """Wait for the original request to complete (None on timeout)"""
+    future = _inflight.get(storage_key)
+    if future is not None:
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), timeout=settings.IDEMPOTENCY_WAIT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            return None
+
+    # Original is running on another worker: poll Redis with backoff
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.02
+
+    while True:
+        try:
+            raw = await redis_client.client.get(storage_key)
+        except RedisError:
+            return None
+
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        if record["state"] == "complete":
+            return record
+
+        if loop.time() + delay > deadline:
+            return None
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
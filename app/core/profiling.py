@@ -0,0 +1,87 @@
+import hashlib
+import hmac
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # optional dependency: profiling is unavailable without it
+    Profiler = None
+
+PROFILE_HEADER = "x-profile"
+
+def sign_trace_id(trace_id: str) -> str:
+    """Value of the X-Profile header that opts a request with this X-Trace-ID into profiling"""
+    return hmac.new(settings.PROFILING_SECRET.encode(), trace_id.encode(), hashlib.sha256).hexdigest()
+
+def profiling_available() -> bool:
+    return Profiler is not None and settings.PROFILING_ENABLED
+
+def should_profile(trace_id: Optional[str], signature: Optional[str]) -> bool:
+    """Signed X-Profile header for this trace ID, or the random sample"""
+    if trace_id and signature and settings.PROFILING_SECRET:
+        # Compare bytes: compare_digest rejects non-ASCII str (headers arrive decoded as latin-1)
+        return hmac.compare_digest(signature.encode(), sign_trace_id(trace_id).encode())
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+class ProfileStore:
+    """
+    Most recent request profiles, keyed by trace ID
+    - Bounded (PROFILING_MAX_PROFILES, oldest evicted first), per worker, in memory
+    - Sessions are rendered on fetch (speedscope JSON or pyinstrument HTML flamegraph)
+    - One profiled request at a time per worker: the sampling profiler hooks the thread
+    """
+
+    def __init__(self):
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.active = False
+
+    def start(self):
+        """Start a profiler, or None if one is already running in this worker"""
+        if self.active or Profiler is None:
+            return None
+        self.active = True
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        profiler.start()
+        return profiler
+
+    def finish(self, profiler, trace_id: str, method: str, path: str, status_code: int, started: float):
+        try:
+            session = profiler.stop()
+        finally:
+            self.active = False
+
+        self._profiles[trace_id] = {
+            "trace_id": trace_id,
+            "method": method,
+            "path": path,
+            "status_code": status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "session": session,
+        }
+        self._profiles.move_to_end(trace_id)
+        while len(self._profiles) > settings.PROFILING_MAX_PROFILES:
+            self._profiles.popitem(last=False)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Newest first, without the sessions"""
+        return [
+            {key: value for key, value in profile.items() if key != "session"}
+            for profile in reversed(self._profiles.values())
+        ]
+
+    def render(self, trace_id: str, output: str) -> Optional[str]:
+        profile = self._profiles.get(trace_id)
+        if profile is None:
+            return None
+        renderer = SpeedscopeRenderer() if output == "speedscope" else HTMLRenderer()
+        return renderer.render(profile["session"])
+
+profile_store = ProfileStore()
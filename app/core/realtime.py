@@ -0,0 +1,170 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+import asyncpg
+import structlog
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# NOTIFY channel written by the community/post/comment procedures
+EVENTS_CHANNEL = "community_events"
+
+class Subscription:
+    """A single SSE client waiting for events on one topic"""
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+class RealtimeBroker:
+    """
+    Fan out database notifications to in-process subscribers
+    - Holds one dedicated LISTEN connection per worker (outside the pool)
+    - Formats each event once and shares the encoded message with all subscribers
+    - Evicts slow consumers whose queue is full instead of buffering unbounded
+    - Reconnects with backoff when the LISTEN connection drops
+    - Also dispatches events to in-process handlers (cache/index maintenance)
+    """
+
+    def __init__(self):
+        self.connection: Optional[asyncpg.Connection] = None
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._subscriber_count = 0
+        self._handlers: Dict[str, List[Callable[[Dict], None]]] = defaultdict(list)
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.delivered_count = 0
+        self.evicted_count = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscriber_count
+
+    async def start(self):
+        """Open the LISTEN connection"""
+        self._closing = False
+        await self._connect()
+        logger.info("realtime_broker_started", channel=EVENTS_CHANNEL)
+
+    async def stop(self):
+        """Close the LISTEN connection and release all subscribers"""
+        self._closing = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self.connection and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+        for subscriptions in list(self._subscribers.values()):
+            for subscription in list(subscriptions):
+                self._close(subscription)
+        logger.info("realtime_broker_stopped")
+
+    async def _connect(self):
+        self.connection = await asyncpg.connect(settings.DATABASE_URL)
+        self.connection.add_termination_listener(self._on_termination)
+        await self.connection.add_listener(EVENTS_CHANNEL, self._on_notify)
+
+    def _on_termination(self, connection: asyncpg.Connection):
+        if self._closing:
+            return
+        logger.warning("realtime_listen_connection_lost")
+        if not self._reconnect_task or self._reconnect_task.done():
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1.0
+        while not self._closing:
+            try:
+                await self._connect()
+                logger.info("realtime_listen_connection_restored")
+                return
+            except Exception as e:
+                logger.error("realtime_reconnect_failed", error=str(e), retry_in=delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def subscribe(self, topic: str) -> Optional[Subscription]:
+        """Register a subscriber (returns None when the worker is at capacity)"""
+        if self._subscriber_count >= settings.SSE_MAX_SUBSCRIBERS:
+            return None
+
+        subscription = Subscription(topic, settings.SSE_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[topic].add(subscription)
+        self._subscriber_count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber (safe to call more than once)"""
+        subscriptions = self._subscribers.get(subscription.topic)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+
+        subscriptions.discard(subscription)
+        self._subscriber_count -= 1
+        if not subscriptions:
+            del self._subscribers[subscription.topic]
+
+    def add_handler(self, event_type: str, handler: Callable[[Dict], None]):
+        """Register a synchronous callback for an event type"""
+        self._handlers[event_type].append(handler)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("realtime_invalid_payload", payload=payload[:200])
+            return
+
+        for handler in self._handlers.get(event.get('type'), ()):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error("realtime_handler_failed", event_type=event.get('type'), error=str(e))
+
+        # Encode once, share across all subscribers of the topic
+        message = f"event: {event.get('type', 'message')}\ndata: {payload}\n\n"
+
+        for topic in self._topics_for(event):
+            for subscription in list(self._subscribers.get(topic, ())):
+                self._deliver(subscription, message)
+
+    @staticmethod
+    def _topics_for(event: Dict) -> list:
+        event_type = event.get("type")
+        if event_type == "post_created":
+            return [community_topic(event["community_id"])]
+        if event_type == "comment_created":
+            return [post_topic(event["post_id"])]
+        return []
+
+    def _deliver(self, subscription: Subscription, message: str):
+        try:
+            subscription.queue.put_nowait(message)
+            self.delivered_count += 1
+        except asyncio.QueueFull:
+            logger.info("realtime_slow_consumer_evicted", topic=subscription.topic)
+            self._evict(subscription)
+
+    def _evict(self, subscription: Subscription):
+        """Drop a subscriber that cannot keep up"""
+        subscription.evicted = True
+        self.evicted_count += 1
+        self._close(subscription)
+
+    def _close(self, subscription: Subscription):
+        """Unregister a subscriber and wake its stream with a close sentinel"""
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+def community_topic(community_id) -> str:
+    return f"community:{community_id}"
+
+def post_topic(post_id) -> str:
+    return f"post:{post_id}"
+
+broker = RealtimeBroker()
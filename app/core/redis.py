@@ -0,0 +1,34 @@
+from typing import Optional
+import redis.asyncio as redis
+import structlog
+from app.config import settings
+
+logger = structlog.get_logger()
+
+class RedisClient:
+    def __init__(self):
+        self.client: Optional[redis.Redis] = None
+
+    async def connect(self):
+        """Create client (connections are opened lazily by the pool)"""
+        logger.info("connecting_to_redis", url=settings.REDIS_URL.split('@')[-1])
+        self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        try:
+            await self.client.ping()
+            logger.info("redis_connected")
+        except redis.RedisError as e:
+            # Redis-backed features degrade gracefully; don't block startup
+            logger.error("redis_connect_failed", error=str(e))
+
+    async def disconnect(self):
+        """Close client"""
+        if self.client:
+            await self.client.close()
+            self.client = None
+            logger.info("redis_disconnected")
+
+redis_client = RedisClient()
+
+async def get_redis() -> RedisClient:
+    """Dependency for getting Redis instance"""
+    return redis_client
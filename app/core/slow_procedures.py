@@ -0,0 +1,160 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+# Plans for the statements run inside the procedure, sent back as NOTICEs
+_AUTO_EXPLAIN_SETUP = """
+SET LOCAL auto_explain.log_min_duration = 0;
+SET LOCAL auto_explain.log_analyze = on;
+SET LOCAL auto_explain.log_buffers = on;
+SET LOCAL auto_explain.log_nested_statements = on;
+SET LOCAL auto_explain.log_format = 'json';
+SET LOCAL auto_explain.log_level = 'notice';
+"""
+
+# PG16+ adds the bound parameters to logged plans unless told not to
+_AUTO_EXPLAIN_NO_PARAMETERS = "SET LOCAL auto_explain.log_parameter_max_length = 0"
+
+# Plan keys that can carry argument values (bound parameters, literals formatted into dynamic SQL)
+_PLAN_VALUE_KEYS = ("Query Text", "Query Parameters")
+
+def redact(value: Any) -> Any:
+    """Keep values that describe the query shape (numbers, flags, times); hide everything else"""
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if isinstance(value, str):
+        return f"<str len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+def _parse_plan(message: str) -> Any:
+    """auto_explain JSON plan without query text or parameters (None if it isn't JSON)"""
+    _, _, plan = message.partition("plan:")
+    try:
+        parsed = json.loads(plan)
+    except ValueError:
+        return None  # Text output may quote argument values: drop it
+    if isinstance(parsed, dict):
+        for key in _PLAN_VALUE_KEYS:
+            parsed.pop(key, None)
+    return parsed
+
+class SlowProcedureLog:
+    """
+    Ring buffer of stored procedure calls slower than SLOW_PROCEDURE_THRESHOLD_MS
+    - Arguments are redacted (shape only), entries carry the request's trace ID
+    - With SLOW_EXPLAIN_ENABLED, a sample of slow calls (at most one per procedure per
+      SLOW_EXPLAIN_COOLDOWN_SECONDS, one at a time) is re-run in the background inside a
+      read-only transaction that is rolled back, with auto_explain reporting the plan of
+      every statement the procedure runs (ANALYZE, BUFFERS)
+    - Write procedures fail in the read-only transaction: they are recorded without a plan
+    - auto_explain must be loadable (superuser or session_preload_libraries)
+    """
+
+    def __init__(self):
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=settings.SLOW_PROCEDURE_BUFFER_SIZE)
+        self._last_explained: Dict[str, float] = {}
+        self._explaining = False
+        self._explain_task: Optional[asyncio.Task] = None
+        self.recorded = 0
+
+    def observe(
+        self,
+        db,
+        procedure_name: str,
+        query: str,
+        params: List[Any],
+        kwargs: Dict[str, Any],
+        seconds: float,
+        row_count: int,
+        timeout: Optional[float]
+    ):
+        duration_ms = seconds * 1000
+        if duration_ms < settings.SLOW_PROCEDURE_THRESHOLD_MS:
+            return
+
+        entry = {
+            "procedure": procedure_name,
+            "duration_ms": round(duration_ms, 2),
+            "row_count": row_count,
+            "trace_id": structlog.contextvars.get_contextvars().get("correlation_id"),
+            "args": {key: redact(value) for key, value in kwargs.items()},
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "plans": None,
+            "plan_error": None,
+        }
+        self._entries.append(entry)
+        self.recorded += 1
+        logger.warning(
+            "slow_stored_procedure",
+            procedure=procedure_name,
+            duration_ms=entry["duration_ms"],
+            row_count=row_count
+        )
+
+        if self._should_explain(procedure_name):
+            self._explaining = True
+            self._last_explained[procedure_name] = time.monotonic()
+            self._explain_task = asyncio.create_task(self._explain(db, entry, query, params, timeout))
+
+    def _should_explain(self, procedure_name: str) -> bool:
+        if not settings.SLOW_EXPLAIN_ENABLED or self._explaining:
+            return False
+        last = self._last_explained.get(procedure_name)
+        if last is not None and time.monotonic() - last < settings.SLOW_EXPLAIN_COOLDOWN_SECONDS:
+            return False
+        return random.random() < settings.SLOW_EXPLAIN_SAMPLE_RATE
+
+    async def _explain(self, db, entry: Dict[str, Any], query: str, params: List[Any], timeout: Optional[float]):
+        notices: List[str] = []
+
+        def on_notice(connection, message):
+            notices.append(message.message)
+
+        try:
+            async with db.get_connection() as conn:
+                conn.add_log_listener(on_notice)
+                transaction = conn.transaction(readonly=True)
+                await transaction.start()
+                try:
+                    await conn.execute("LOAD 'auto_explain'")
+                    await conn.execute(_AUTO_EXPLAIN_SETUP)
+                    if conn.get_server_version().major >= 16:
+                        await conn.execute(_AUTO_EXPLAIN_NO_PARAMETERS)
+                    await conn.fetch(query, *params, timeout=timeout)
+                finally:
+                    await transaction.rollback()
+                    conn.remove_log_listener(on_notice)
+
+            plans = (_parse_plan(message) for message in notices if "plan:" in message)
+            entry["plans"] = [plan for plan in plans if plan is not None]
+
+        except Exception as e:
+            entry["plan_error"] = f"{type(e).__name__}: {e}"
+            logger.info("slow_procedure_explain_failed", procedure=entry["procedure"], error=entry["plan_error"])
+
+        finally:
+            self._explaining = False
+
+    def entries(self, procedure: Optional[str] = None, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest first"""
+        return [
+            entry for entry in reversed(self._entries)
+            if (procedure is None or entry["procedure"] == procedure)
+            and (trace_id is None or entry["trace_id"] == trace_id)
+        ]
+
+slow_procedure_log = SlowProcedureLog()
@@ -8,9 +8,21 @@ import structlog
 from app.config import settings
 from app.core.logging_config import setup_logging
 from app.core.database import db
+from app.core.redis import redis_client
+from app.core.health import health_monitor
 from app.core.rate_limit import limiter
+from app.core.realtime import broker
+from app.services.ranking_service import ranking_refresher
+from app.services.outbox import outbox_relay
+from app.services.pinned_cache import pinned_cache
+from app.services.retention import retention_purger
+from app.services.tag_index import tag_index, tag_index_rebuilder
 from app.middleware.correlation import CorrelationMiddleware
-from app.routes import health
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.disconnect import ClientDisconnectMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.routes import health, metrics
 
 # Setup logging
 setup_logging(settings.ENVIRONMENT)
@@ -22,9 +34,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("starting_application", environment=settings.ENVIRONMENT)
     await db.connect()
+    await redis_client.connect()
+    health_monitor.start()
+    broker.add_handler("tags_changed", tag_index.on_tags_changed)
+    broker.add_handler("pinned_changed", pinned_cache.on_pinned_changed)
+    await broker.start()
+    await tag_index.load(db)
+    tag_index_rebuilder.start()
+    if settings.TRENDING_ENABLED:
+        ranking_refresher.start()
+    if settings.OUTBOX_ENABLED:
+        outbox_relay.start()
+    if settings.RETENTION_ENABLED:
+        retention_purger.start()
     yield
     # Shutdown
     logger.info("shutting_down_application")
+    await retention_purger.stop()
+    await outbox_relay.stop()
+    await ranking_refresher.stop()
+    await tag_index_rebuilder.stop()
+    await broker.stop()
+    await health_monitor.stop()
+    await redis_client.disconnect()
     await db.disconnect()
 
 app = FastAPI(
@@ -85,6 +117,14 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Middleware
+if settings.CANCEL_ON_DISCONNECT:
+    app.add_middleware(ClientDisconnectMiddleware)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(CorrelationMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -96,9 +136,10 @@ app.add_middleware(
 
 # Routes
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
 
 # API Routes (Phase 7)
-from app.routes import communities, posts, comments, reactions, activity_links
+from app.routes import communities, posts, comments, reactions, activity_links, streams, timeline, admin
 app.include_router(
     communities.router,
     prefix=f"{settings.API_V1_PREFIX}/communities",
@@ -124,6 +165,21 @@ app.include_router(
     prefix=f"{settings.API_V1_PREFIX}/communities",
     tags=["activity-links"]
 )
+app.include_router(
+    streams.router,
+    prefix=f"{settings.API_V1_PREFIX}/communities",
+    tags=["streams"]
+)
+app.include_router(
+    timeline.router,
+    prefix=f"{settings.API_V1_PREFIX}/me",
+    tags=["timeline"]
+)
+app.include_router(
+    admin.router,
+    prefix=f"{settings.API_V1_PREFIX}/admin",
+    tags=["admin"]
+)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,59 @@
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+import structlog
+
+from app.config import settings
+from app.core.admission import EXPENSIVE, READ, WRITE, admission
+from app.core.errors import ERROR_STATUS_MAP, error_detail
+
+logger = structlog.get_logger()
+
+# Never limited: probes, metrics, and long-lived SSE streams (they hold no DB connection)
+BYPASS_PREFIXES = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+BYPASS_SUFFIXES = ("/stream",)
+
+# Shed first: batch writes, bulk moderation and unindexed scans
+EXPENSIVE_SUFFIXES = ("/members/bulk", "/moderation/remove-user-content", "/communities/search")
+
+def classify(method: str, path: str) -> str:
+    if path.endswith(EXPENSIVE_SUFFIXES):
+        return EXPENSIVE
+    if method in ("GET", "HEAD"):
+        return READ
+    return WRITE
+
+class AdmissionMiddleware:
+    """
+    Admission control in front of the routes
+    - Classifies requests (read / write / expensive) and asks the controller for a slot
+    - Shed requests get an immediate 503 with Retry-After instead of queueing on the pool
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or path.startswith(BYPASS_PREFIXES)
+            or path.endswith(BYPASS_SUFFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        priority = classify(scope["method"], path)
+        if not await admission.acquire(priority):
+            logger.warning("request_shed", priority=priority, path=path, limit=round(admission.limit, 2))
+            response = JSONResponse(
+                status_code=ERROR_STATUS_MAP["SERVER_OVERLOADED"],
+                content={"detail": error_detail("SERVER_OVERLOADED")},
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
@@ -0,0 +1,65 @@
+import asyncio
+import contextlib
+from typing import Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import structlog
+
+logger = structlog.get_logger()
+
+# SSE streams watch for disconnects themselves
+BYPASS_SUFFIXES = ("/stream",)
+
+# Requests cancelled because the client went away (exported in /metrics)
+disconnect_stats: Dict[str, int] = {"cancelled_requests": 0}
+
+class ClientDisconnectMiddleware:
+    """
+    Cancel the request handler when the client disconnects mid-request
+    - The handler runs as a task; a watcher forwards receive() messages to it
+      and cancels it on http.disconnect before the response is complete
+    - Cancellation reaches the awaiting asyncpg call, which cancels the statement
+      and returns the connection to the pool right away
+    - After the response is complete (background tasks running) nothing is cancelled
+    - Request bodies are read ahead by the watcher (bounded by the route's own limits)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope.get("path", "").endswith(BYPASS_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+
+        async def watch():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        async def send_wrapper(message: Message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, messages.get, send_wrapper))
+        watcher = asyncio.create_task(watch())
+        try:
+            await asyncio.wait({handler, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_complete:
+                handler.cancel()
+                disconnect_stats["cancelled_requests"] += 1
+                logger.info("request_cancelled_client_disconnected", path=scope.get("path"))
+                with contextlib.suppress(asyncio.CancelledError):
+                    await handler
+                return
+            await handler
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()  # We were cancelled ourselves (shutdown)
@@ -0,0 +1,52 @@
+import time
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import structlog
+
+from app.core.profiling import PROFILE_HEADER, profile_store, should_profile
+
+logger = structlog.get_logger()
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for single requests
+    - Runs for requests carrying a valid signed X-Profile header
+      (HMAC-SHA256 of X-Trace-ID with PROFILING_SECRET) or picked by PROFILING_SAMPLE_RATE
+    - Covers dependency resolution, validation, the route and serialization
+    - The profile is stored under the request's trace ID (see /api/v1/admin/profiles)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        # Runs inside CorrelationMiddleware, so the trace ID is already bound
+        trace_id = structlog.contextvars.get_contextvars().get("correlation_id") or headers.get("x-trace-id")
+        if not trace_id or not should_profile(headers.get("x-trace-id"), headers.get(PROFILE_HEADER)):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = profile_store.start()
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile_store.finish(profiler, trace_id, scope["method"], scope["path"], status_code, started)
+            logger.info("request_profiled", trace_id=trace_id, status_code=status_code)
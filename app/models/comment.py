@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from datetime import datetime
 from app.models.common import PaginationMeta
+from app.models.reaction import ReactionType
 
 # Request: Create comment
 class CommentCreateRequest(BaseModel):
@@ -44,6 +45,8 @@ class CommentListItem(BaseModel):
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
+    reaction_counts: Dict[str, int] = Field(default_factory=dict)
+    viewer_reaction: Optional[ReactionType] = None
 
 # Response: Comment list
 class CommentListResponse(BaseModel):
@@ -1,11 +1,21 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
+
+# How list endpoints compute total_count (?count=)
+#   exact    - full count of matching rows
+#   capped   - count up to PAGINATION_COUNT_CAP, label "1000+" beyond it
+#   estimate - planner row estimate or maintained counter
+#   none     - no count (total_count is null)
+CountMode = Literal['exact', 'capped', 'estimate', 'none']
 
 class PaginationMeta(BaseModel):
     limit: int
     offset: int
-    total_count: int
+    total_count: Optional[int]
+    count_kind: CountMode = 'exact'
+    total_count_label: Optional[str] = None
+    next_cursor: Optional[str] = None  # Keyset lists: pass as ?after= for the next page
 
 class ErrorResponse(BaseModel):
     detail: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator, HttpUrl
+from pydantic import BaseModel, Field, field_validator, model_validator, HttpUrl
 from typing import Optional, List, Literal
 from uuid import UUID
 from datetime import datetime
@@ -90,6 +90,25 @@ class CommunitySearchResponse(BaseModel):
     communities: List[CommunityListItem]
     pagination: PaginationMeta
 
+# Response: Trending community item
+class CommunityTrendingItem(CommunityListItem):
+    rank: int
+    trending_score: float
+
+# Response: Trending communities
+class CommunityTrendingResponse(BaseModel):
+    communities: List[CommunityTrendingItem]
+    pagination: PaginationMeta
+
+# Response: Tag suggestion
+class TagSuggestion(BaseModel):
+    tag: str
+    community_count: int
+
+# Response: Tag suggestions
+class TagSuggestResponse(BaseModel):
+    tags: List[TagSuggestion]
+
 # Response: Join community
 class MembershipCreateResponse(BaseModel):
     community_id: UUID
@@ -104,6 +123,50 @@ class MembershipLeaveResponse(BaseModel):
     user_id: UUID
     left_at: datetime
 
+# Request: Bulk join (organizer import)
+class BulkJoinRequest(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1)
+
+# Response: Bulk join outcome per user
+class BulkJoinResult(BaseModel):
+    user_id: UUID
+    outcome: Literal['joined', 'already_member', 'user_not_found', 'community_full']
+
+# Response: Bulk join
+class BulkJoinResponse(BaseModel):
+    community_id: UUID
+    requested: int
+    joined: int
+    already_member: int
+    user_not_found: int
+    community_full: int
+    results: List[BulkJoinResult]
+
+# Request: Remove a user's content from a community (moderation)
+class RemoveUserContentRequest(BaseModel):
+    user_id: UUID
+    since: Optional[datetime] = None  # Only content created at/after (inclusive)
+    until: Optional[datetime] = None  # Only content created before (exclusive)
+
+    @model_validator(mode='after')
+    def validate_window(self):
+        if self.since and self.until and self.since >= self.until:
+            raise ValueError('since must be before until')
+        return self
+
+# Response: Removed content summary
+class RemoveUserContentResponse(BaseModel):
+    community_id: UUID
+    user_id: UUID
+    posts_removed: int
+    comments_removed: int
+    reactions_removed: int
+    posts_recounted: int
+    removed_at: datetime
+
+# Member roles, in listing order (organizers first)
+MemberRole = Literal['organizer', 'co_organizer', 'member']
+
 # Response: Member list item
 class MemberListItem(BaseModel):
     user_id: UUID
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Dict, Optional, List, Literal
 from uuid import UUID
 from datetime import datetime
 from app.models.common import PaginationMeta
+from app.models.reaction import ReactionType
 
 # Request: Create post
 class PostCreateRequest(BaseModel):
@@ -34,6 +35,12 @@ class PostDeleteResponse(BaseModel):
     post_id: UUID
     deleted_at: datetime
 
+# Response: Post pinned / unpinned
+class PostPinResponse(BaseModel):
+    post_id: UUID
+    is_pinned: bool
+    updated_at: datetime
+
 # Response: Post list item
 class PostListItem(BaseModel):
     post_id: UUID
@@ -51,8 +58,11 @@ class PostListItem(BaseModel):
     is_pinned: bool
     created_at: datetime
     updated_at: datetime
+    reaction_counts: Dict[str, int] = Field(default_factory=dict)
+    viewer_reaction: Optional[ReactionType] = None
 
 # Response: Post feed
 class PostFeedResponse(BaseModel):
+    pinned: List[PostListItem] = Field(default_factory=list)  # First page only
     posts: List[PostListItem]
     pagination: PaginationMeta
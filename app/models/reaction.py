@@ -3,9 +3,11 @@ from typing import Literal
 from uuid import UUID
 from datetime import datetime
 
+ReactionType = Literal['like', 'love', 'celebrate', 'support', 'insightful']
+
 # Request: Create/update reaction
 class ReactionCreateRequest(BaseModel):
-    reaction_type: Literal['like', 'love', 'celebrate', 'support', 'insightful']
+    reaction_type: ReactionType
 
 # Response: Reaction created/updated
 class ReactionCreateResponse(BaseModel):
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+from app.models.common import PaginationMeta
+from app.models.post import PostListItem
+
+# Response: Home timeline item (post plus the community it was posted in)
+class TimelineItem(PostListItem):
+    community_id: UUID
+
+# Response: Home timeline (cursor-paginated, newest first)
+class TimelineResponse(BaseModel):
+    posts: List[TimelineItem]
+    pagination: PaginationMeta  # No total (count_kind 'none'); next_cursor for the next page
@@ -5,6 +5,7 @@ import structlog
 from app.core.auth import CurrentUser, get_current_user
 from app.core.database import Database, get_db
 from app.core.rate_limit import limiter
+from app.core.idempotency import idempotent
 from app.services.reaction_service import ReactionService
 from app.models.reaction import (
     CommunityActivityLinkRequest,
@@ -24,6 +25,7 @@ def get_reaction_service(db: Database = Depends(get_db)) -> ReactionService:
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("20/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def link_activity_to_community(
     request: Request,
     community_id: UUID,
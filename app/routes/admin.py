@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import HTMLResponse, Response
+from typing import Literal, Optional
+import structlog
+
+from app.config import settings
+from app.core.auth import require_admin
+from app.core.errors import raise_http_exception
+from app.core.profiling import profile_store, profiling_available
+from app.core.slow_procedures import slow_procedure_log
+
+logger = structlog.get_logger()
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# E28: GET /api/v1/admin/profiles
+@router.get("/profiles")
+async def list_profiles():
+    """Recent request profiles in this worker (newest first)"""
+    return {"available": profiling_available(), "profiles": profile_store.list()}
+
+# E29: GET /api/v1/admin/profiles/{trace_id}
+@router.get("/profiles/{trace_id}")
+async def get_profile(
+    trace_id: str,
+    output: Literal['speedscope', 'html'] = Query('speedscope', description="speedscope JSON or HTML flamegraph")
+):
+    """Rendered profile for one trace ID (speedscope: open in https://www.speedscope.app)"""
+    rendered = profile_store.render(trace_id, output)
+    if rendered is None:
+        raise_http_exception("PROFILE_NOT_FOUND")
+
+    if output == "html":
+        return HTMLResponse(rendered)
+    return Response(
+        content=rendered,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{trace_id}.speedscope.json"'}
+    )
+
+# E30: GET /api/v1/admin/slow-procedures
+@router.get("/slow-procedures")
+async def list_slow_procedures(
+    procedure: Optional[str] = Query(None, description="e.g. activity.sp_community_search"),
+    trace_id: Optional[str] = Query(None, description="X-Trace-ID of the request")
+):
+    """Recent stored procedure calls over SLOW_PROCEDURE_THRESHOLD_MS in this worker (newest first)"""
+    return {
+        "threshold_ms": settings.SLOW_PROCEDURE_THRESHOLD_MS,
+        "recorded": slow_procedure_log.recorded,
+        "calls": slow_procedure_log.entries(procedure=procedure, trace_id=trace_id),
+    }
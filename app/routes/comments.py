@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, Query, status, Request
+from fastapi import APIRouter, Depends, Query, status, Request, Response
 from typing import Optional
 from uuid import UUID
 import structlog
 
-from app.core.auth import CurrentUser, get_current_user
+from app.core.auth import CurrentUser, get_current_user, get_current_user_optional
 from app.core.database import Database, get_db
 from app.core.rate_limit import limiter
+from app.core.idempotency import idempotent
 from app.services.comment_service import CommentService
+from app.services.community_service import CommunityService
 from app.models.comment import (
     CommentCreateRequest,
     CommentCreateResponse,
@@ -15,7 +17,11 @@ from app.models.comment import (
     CommentDeleteResponse,
     CommentListResponse,
 )
-from app.utils.pagination import build_pagination_response
+from app.config import settings
+from app.models.common import CountMode
+from app.utils.pagination import build_pagination_meta
+from app.utils.etag import make_etag, etag_matches, not_modified, set_etag
+from app.utils.json_lists import json_list_body, json_body_response
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -23,6 +29,9 @@ router = APIRouter()
 def get_comment_service(db: Database = Depends(get_db)) -> CommentService:
     return CommentService(db)
 
+def get_community_service(db: Database = Depends(get_db)) -> CommunityService:
+    return CommunityService(db)
+
 # E12: POST /api/v1/communities/{community_id}/posts/{post_id}/comments
 @router.post(
     "/{community_id}/posts/{post_id}/comments",
@@ -30,6 +39,7 @@ def get_comment_service(db: Database = Depends(get_db)) -> CommentService:
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("100/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def create_comment(
     request: Request,
     community_id: UUID,
@@ -51,6 +61,7 @@ async def create_comment(
     response_model=CommentUpdateResponse
 )
 @limiter.limit("50/hour")
+@idempotent()
 async def update_comment(
     request: Request,
     community_id: UUID,
@@ -73,6 +84,7 @@ async def update_comment(
     response_model=CommentDeleteResponse
 )
 @limiter.limit("50/hour")
+@idempotent()
 async def delete_comment(
     request: Request,
     community_id: UUID,
@@ -93,24 +105,58 @@ async def delete_comment(
     response_model=CommentListResponse
 )
 async def get_comments(
+    request: Request,
+    response: Response,
     community_id: UUID,
     post_id: UUID,
     parent_comment_id: Optional[UUID] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    service: CommentService = Depends(get_comment_service)
+    after: Optional[str] = Query(None, description="pagination.next_cursor from the previous page"),
+    count: CountMode = Query('exact', description="total_count mode: exact, capped, estimate or none"),
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+    service: CommentService = Depends(get_comment_service),
+    community_service: CommunityService = Depends(get_community_service)
 ):
-    """Get comments for a post (threaded)"""
-    comments, total_count = await service.get_comments(
+    """Get comments for a post, one thread level at a time (keyset pages via ?after=)"""
+    requesting_user_id = UUID(current_user.user_id) if current_user else None
+
+    # Conditional GET: answer 304 before running the comments procedure
+    versions = await community_service.get_content_versions(community_id, post_id)
+    if versions:
+        etag = make_etag(
+            "comments", post_id, versions['comments_version'], requesting_user_id, request.url.query
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+    if settings.DB_JSON_LISTS:
+        items, total_count, next_cursor = await service.get_comments_json(
+            post_id=post_id,
+            parent_comment_id=parent_comment_id,
+            requesting_user_id=requesting_user_id,
+            limit=limit,
+            offset=offset,
+            count_mode=count,
+            after=after
+        )
+        return json_body_response(
+            json_list_body("comments", items, build_pagination_meta(limit, offset, total_count, count, next_cursor)),
+            response
+        )
+
+    comments, total_count, next_cursor = await service.get_comments(
         post_id=post_id,
         parent_comment_id=parent_comment_id,
+        requesting_user_id=requesting_user_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_mode=count,
+        after=after
     )
 
-    return build_pagination_response(
-        items=comments,
-        total_count=total_count,
-        limit=limit,
-        offset=offset
+    return CommentListResponse(
+        comments=comments,
+        pagination=build_pagination_meta(limit, offset, total_count, count, next_cursor)
     )
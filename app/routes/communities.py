@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException, status, Request, Response
 from typing import Optional, List
 from uuid import UUID
 import structlog
@@ -6,7 +6,11 @@ import structlog
 from app.core.auth import CurrentUser, get_current_user, get_current_user_optional
 from app.core.database import Database, get_db
 from app.core.rate_limit import limiter
+from app.core.idempotency import idempotent
 from app.services.community_service import CommunityService
+from app.services.ranking_service import RankingService
+from app.services.timeline_service import TimelineService
+from app.services.tag_index import tag_index
 from app.models.community import (
     CommunityCreateRequest,
     CommunityCreateResponse,
@@ -14,12 +18,24 @@ from app.models.community import (
     CommunityUpdateResponse,
     CommunityDetailResponse,
     CommunitySearchResponse,
+    CommunityTrendingResponse,
+    TagSuggestion,
+    TagSuggestResponse,
     MembershipCreateResponse,
     MembershipLeaveResponse,
     MemberListResponse,
+    MemberRole,
+    BulkJoinRequest,
+    BulkJoinResponse,
+    RemoveUserContentRequest,
+    RemoveUserContentResponse,
 )
-from app.utils.pagination import build_pagination_response
-from app.models.common import PaginationMeta
+from app.config import settings
+from app.utils.pagination import build_pagination_meta
+from app.utils.etag import make_etag, etag_matches, not_modified
+from app.utils.json_lists import json_list_body, json_body_response
+from app.utils.response_cache import cached_response, cache_response
+from app.models.common import CountMode, PaginationMeta
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -27,6 +43,12 @@ router = APIRouter()
 def get_community_service(db: Database = Depends(get_db)) -> CommunityService:
     return CommunityService(db)
 
+def get_ranking_service(db: Database = Depends(get_db)) -> RankingService:
+    return RankingService(db)
+
+def get_timeline_service(db: Database = Depends(get_db)) -> TimelineService:
+    return TimelineService(db)
+
 # E1: POST /api/v1/communities
 @router.post(
     "",
@@ -34,6 +56,7 @@ def get_community_service(db: Database = Depends(get_db)) -> CommunityService:
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("10/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def create_community(
     request: Request,
     body: CommunityCreateRequest,
@@ -57,6 +80,7 @@ async def search_communities(
     tags: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    count: CountMode = Query('exact', description="total_count mode: exact, capped, estimate or none"),
     current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
     service: CommunityService = Depends(get_community_service)
 ):
@@ -70,10 +94,34 @@ async def search_communities(
         tags=tags_array,
         requesting_user_id=UUID(current_user.user_id) if current_user else None,
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_mode=count
     )
 
     return CommunitySearchResponse(
+        communities=communities,
+        pagination=build_pagination_meta(limit, offset, total_count, count)
+    )
+
+# E23: GET /api/v1/communities/trending (MUST come before /{community_id})
+@router.get(
+    "/trending",
+    response_model=CommunityTrendingResponse
+)
+async def get_trending_communities(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+    service: RankingService = Depends(get_ranking_service)
+):
+    """Get trending communities (precomputed ranking)"""
+    communities, total_count = await service.get_trending(
+        requesting_user_id=UUID(current_user.user_id) if current_user else None,
+        limit=limit,
+        offset=offset
+    )
+
+    return CommunityTrendingResponse(
         communities=communities,
         pagination=PaginationMeta(
             limit=limit,
@@ -82,12 +130,31 @@ async def search_communities(
         )
     )
 
+# E24: GET /api/v1/communities/tags/suggest (MUST come before /{community_id})
+@router.get(
+    "/tags/suggest",
+    response_model=TagSuggestResponse
+)
+async def suggest_tags(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """Tag autocomplete (served from the in-memory tag index)"""
+    return TagSuggestResponse(
+        tags=[
+            TagSuggestion(tag=tag, community_count=count)
+            for tag, count in tag_index.suggest(prefix, limit)
+        ]
+    )
+
 # E2: GET /api/v1/communities/{community_id}
 @router.get(
     "/{community_id}",
     response_model=CommunityDetailResponse
 )
 async def get_community(
+    request: Request,
+    response: Response,
     community_id: UUID,
     current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
     service: CommunityService = Depends(get_community_service)
@@ -95,6 +162,16 @@ async def get_community(
     """Get community details"""
     requesting_user_id = UUID(current_user.user_id) if current_user else None
 
+    # Conditional GET: updated_at covers edits, tags and member_count changes
+    versions = await service.get_content_versions(community_id)
+    if versions:
+        etag = make_etag("community", community_id, versions['community_updated_at'].isoformat(), requesting_user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        cached = cached_response(request, etag)
+        if cached:
+            return cached
+
     community = await service.get_community(
         community_id=community_id,
         requesting_user_id=requesting_user_id
@@ -103,6 +180,8 @@ async def get_community(
     if not community:
         raise HTTPException(status_code=404, detail="Community not found")
 
+    if versions:
+        return cache_response(request, etag, community)
     return community
 
 # E3: PATCH /api/v1/communities/{community_id}
@@ -111,6 +190,7 @@ async def get_community(
     response_model=CommunityUpdateResponse
 )
 @limiter.limit("20/hour")
+@idempotent()
 async def update_community(
     request: Request,
     community_id: UUID,
@@ -132,36 +212,99 @@ async def update_community(
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("30/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def join_community(
     request: Request,
     community_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
-    service: CommunityService = Depends(get_community_service)
+    service: CommunityService = Depends(get_community_service),
+    timeline: TimelineService = Depends(get_timeline_service)
 ):
     """Join a community"""
-    return await service.join_community(
+    membership = await service.join_community(
         community_id=community_id,
         user_id=UUID(current_user.user_id)
     )
 
+    background_tasks.add_task(timeline.on_member_joined, membership.user_id, community_id)
+    return membership
+
 # E5: POST /api/v1/communities/{community_id}/leave
 @router.post(
     "/{community_id}/leave",
     response_model=MembershipLeaveResponse
 )
 @limiter.limit("20/hour")
+@idempotent()
 async def leave_community(
     request: Request,
     community_id: UUID,
+    background_tasks: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
-    service: CommunityService = Depends(get_community_service)
+    service: CommunityService = Depends(get_community_service),
+    timeline: TimelineService = Depends(get_timeline_service)
 ):
     """Leave a community"""
-    return await service.leave_community(
+    result = await service.leave_community(
         community_id=community_id,
         user_id=UUID(current_user.user_id)
     )
 
+    # The community's posts are dropped when the timeline is rebuilt
+    background_tasks.add_task(timeline.invalidate, [result.user_id])
+    return result
+
+# E25: POST /api/v1/communities/{community_id}/members/bulk
+@router.post(
+    "/{community_id}/members/bulk",
+    response_model=BulkJoinResponse
+)
+@limiter.limit("10/hour")
+@idempotent()
+async def bulk_join_community(
+    request: Request,
+    community_id: UUID,
+    body: BulkJoinRequest,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    service: CommunityService = Depends(get_community_service),
+    timeline: TimelineService = Depends(get_timeline_service)
+):
+    """Join many users to a community in one batch (organizer only)"""
+    result = await service.bulk_join_community(
+        community_id=community_id,
+        requesting_user_id=UUID(current_user.user_id),
+        user_ids=body.user_ids
+    )
+
+    background_tasks.add_task(
+        timeline.invalidate,
+        [row.user_id for row in result.results if row.outcome == 'joined']
+    )
+    return result
+
+# E27: POST /api/v1/communities/{community_id}/moderation/remove-user-content
+@router.post(
+    "/{community_id}/moderation/remove-user-content",
+    response_model=RemoveUserContentResponse
+)
+@limiter.limit("30/hour")
+@idempotent()
+async def remove_user_content(
+    request: Request,
+    community_id: UUID,
+    body: RemoveUserContentRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    service: CommunityService = Depends(get_community_service)
+):
+    """Remove all of a user's posts, comments and reactions in a community (organizer only)"""
+    return await service.remove_user_content(
+        community_id=community_id,
+        moderator_user_id=UUID(current_user.user_id),
+        request=body
+    )
+
 # E6: GET /api/v1/communities/{community_id}/members
 @router.get(
     "/{community_id}/members",
@@ -171,20 +314,41 @@ async def get_members(
     community_id: UUID,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    count: CountMode = Query('exact', description="total_count mode: exact, capped, estimate or none"),
+    role: Optional[MemberRole] = Query(None, description="Only members with this role"),
+    q: Optional[str] = Query(None, min_length=3, max_length=100, description="Match username, first or last name"),
+    after: Optional[str] = Query(None, description="pagination.next_cursor from the previous page"),
     current_user: CurrentUser = Depends(get_current_user),
     service: CommunityService = Depends(get_community_service)
 ):
-    """Get community members"""
-    members, total_count = await service.get_members(
+    """Get community members (organizers first, then by join date)"""
+    if settings.DB_JSON_LISTS:
+        items, total_count, next_cursor = await service.get_members_json(
+            community_id=community_id,
+            requesting_user_id=UUID(current_user.user_id),
+            limit=limit,
+            offset=offset,
+            count_mode=count,
+            role=role,
+            search=q,
+            after=after
+        )
+        return json_body_response(
+            json_list_body("members", items, build_pagination_meta(limit, offset, total_count, count, next_cursor))
+        )
+
+    members, total_count, next_cursor = await service.get_members(
         community_id=community_id,
         requesting_user_id=UUID(current_user.user_id),
         limit=limit,
-        offset=offset
+        offset=offset,
+        count_mode=count,
+        role=role,
+        search=q,
+        after=after
     )
 
-    return build_pagination_response(
-        items=members,
-        total_count=total_count,
-        limit=limit,
-        offset=offset
+    return MemberListResponse(
+        members=members,
+        pagination=build_pagination_meta(limit, offset, total_count, count, next_cursor)
     )
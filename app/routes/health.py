@@ -1,32 +1,32 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 import structlog
-from app.core.database import Database, get_db
+from app.core.health import health_monitor
 
 logger = structlog.get_logger()
 router = APIRouter()
 
-@router.get("/health")
-async def health_check(db: Database = Depends(get_db)):
-    """Health check endpoint"""
-    checks = {"api": "ok"}
+# Probes never touch the pool or Redis: they read the background monitor's last result
 
-    # Check database
-    try:
-        async with db.get_connection() as conn:
-            await conn.fetchval("SELECT 1")
-        checks["database"] = "ok"
-    except Exception as e:
-        logger.error("health_check_database_failed", error=str(e))
-        checks["database"] = "error"
+@router.get("/health")
+async def health_check():
+    """Dependency status from the last background check (503 when not ready)"""
+    snapshot = health_monitor.snapshot()
+    return JSONResponse(
+        status_code=200 if snapshot["ready"] else 503,
+        content=snapshot
+    )
 
-    all_ok = all(v == "ok" for v in checks.values())
-    status_code = 200 if all_ok else 503
+@router.get("/health/live")
+async def liveness():
+    """Liveness: the process is serving requests (never checks dependencies)"""
+    return {"status": "ok"}
 
+@router.get("/health/ready")
+async def readiness():
+    """Readiness: the database answered recently enough to take traffic"""
+    ready = health_monitor.ready
     return JSONResponse(
-        status_code=status_code,
-        content={
-            "status": "ok" if all_ok else "degraded",
-            "checks": checks
-        }
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready"}
     )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+import structlog
+
+from app.core.admission import admission
+from app.core.realtime import broker
+from app.middleware.disconnect import disconnect_stats
+from app.services.author_cache import author_cache
+from app.services.outbox import outbox_relay
+from app.services.pinned_cache import pinned_cache
+from app.services.retention import retention_purger
+from app.utils.response_cache import response_cache
+from app.utils.stored_procedures import cancel_counts, singleflight, timeout_counts
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics():
+    """In-process counters for this worker (since start)"""
+    return {
+        "admission": admission.stats(),
+        "coalescing": singleflight.stats(),
+        "queries": {
+            "timeouts": dict(timeout_counts),
+            "cancelled": dict(cancel_counts),
+            "cancelled_requests": disconnect_stats["cancelled_requests"],
+        },
+        "outbox": outbox_relay.stats(),
+        "retention": retention_purger.stats(),
+        "author_cache": {"hits": author_cache.hits, "misses": author_cache.misses},
+        "pinned_cache": pinned_cache.stats(),
+        "response_cache": {"hits": response_cache.hits, "misses": response_cache.misses},
+        "streams": {
+            "subscribers": broker.subscriber_count,
+            "delivered": broker.delivered_count,
+            "evicted": broker.evicted_count,
+        },
+    }
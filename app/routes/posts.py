@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status, Request, Response
 from typing import Optional
 from uuid import UUID
 import structlog
@@ -6,16 +6,25 @@ import structlog
 from app.core.auth import CurrentUser, get_current_user, get_current_user_optional
 from app.core.database import Database, get_db
 from app.core.rate_limit import limiter
+from app.core.idempotency import idempotent
 from app.services.post_service import PostService
+from app.services.community_service import CommunityService
+from app.services.timeline_service import TimelineService
 from app.models.post import (
     PostCreateRequest,
     PostCreateResponse,
     PostUpdateRequest,
     PostUpdateResponse,
     PostDeleteResponse,
+    PostPinResponse,
     PostFeedResponse,
 )
-from app.utils.pagination import build_pagination_response
+from app.config import settings
+from app.models.common import CountMode
+from app.utils.pagination import build_pagination_meta
+from app.utils.etag import make_etag, etag_matches, not_modified, set_etag
+from app.utils.json_lists import json_list_body, json_body_response
+from app.utils.response_cache import cached_response, cache_response, cache_body
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -23,6 +32,12 @@ router = APIRouter()
 def get_post_service(db: Database = Depends(get_db)) -> PostService:
     return PostService(db)
 
+def get_community_service(db: Database = Depends(get_db)) -> CommunityService:
+    return CommunityService(db)
+
+def get_timeline_service(db: Database = Depends(get_db)) -> TimelineService:
+    return TimelineService(db)
+
 # E8: POST /api/v1/communities/{community_id}/posts
 @router.post(
     "/{community_id}/posts",
@@ -30,26 +45,34 @@ def get_post_service(db: Database = Depends(get_db)) -> PostService:
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("50/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def create_post(
     request: Request,
     community_id: UUID,
     body: PostCreateRequest,
+    background_tasks: BackgroundTasks,
     current_user: CurrentUser = Depends(get_current_user),
-    service: PostService = Depends(get_post_service)
+    service: PostService = Depends(get_post_service),
+    timeline: TimelineService = Depends(get_timeline_service)
 ):
     """Create a new post in a community"""
-    return await service.create_post(
+    post = await service.create_post(
         community_id=community_id,
         author_user_id=UUID(current_user.user_id),
         request=body
     )
 
+    # Fan out to members' home timelines after the response is sent
+    background_tasks.add_task(timeline.fan_out_post, post.community_id, post.post_id, post.created_at)
+    return post
+
 # E9: PATCH /api/v1/communities/{community_id}/posts/{post_id}
 @router.patch(
     "/{community_id}/posts/{post_id}",
     response_model=PostUpdateResponse
 )
 @limiter.limit("30/hour")
+@idempotent()
 async def update_post(
     request: Request,
     community_id: UUID,
@@ -71,6 +94,7 @@ async def update_post(
     response_model=PostDeleteResponse
 )
 @limiter.limit("30/hour")
+@idempotent()
 async def delete_post(
     request: Request,
     community_id: UUID,
@@ -90,23 +114,119 @@ async def delete_post(
     response_model=PostFeedResponse
 )
 async def get_post_feed(
+    request: Request,
+    response: Response,
     community_id: UUID,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    count: CountMode = Query('exact', description="total_count mode: exact, capped, estimate or none"),
     current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
-    service: PostService = Depends(get_post_service)
+    service: PostService = Depends(get_post_service),
+    community_service: CommunityService = Depends(get_community_service)
 ):
     """Get post feed for a community"""
-    posts, total_count = await service.get_post_feed(
-        community_id=community_id,
-        requesting_user_id=UUID(current_user.user_id) if current_user else None,
-        limit=limit,
-        offset=offset
+    requesting_user_id = UUID(current_user.user_id) if current_user else None
+
+    # Conditional GET: answer 304 before running the feed procedure
+    versions = await community_service.get_content_versions(community_id)
+    etag = None
+    if versions:
+        etag = make_etag(
+            "feed", community_id, versions['feed_version'],
+            versions['community_updated_at'].isoformat(), requesting_user_id,
+            request.url.query
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
+    # First page is the hot one: keep it serialized and precompressed
+    cacheable = etag is not None and offset == 0
+    if cacheable:
+        cached = cached_response(request, etag)
+        if cached:
+            return cached
+
+    if settings.DB_JSON_LISTS:
+        items, total_count = await service.get_post_feed_json(
+            community_id=community_id,
+            requesting_user_id=requesting_user_id,
+            limit=limit,
+            offset=offset,
+            count_mode=count
+        )
+    else:
+        posts, total_count = await service.get_post_feed(
+            community_id=community_id,
+            requesting_user_id=requesting_user_id,
+            limit=limit,
+            offset=offset,
+            count_mode=count
+        )
+
+    # Pinned posts come from their own cached query, shown above the first page
+    pinned = []
+    if offset == 0:
+        pinned = await service.get_pinned_posts(
+            community_id, requesting_user_id, versions['feed_version'] if versions else None
+        )
+
+    if settings.DB_JSON_LISTS:
+        body = json_list_body(
+            "posts", items, build_pagination_meta(limit, offset, total_count, count), pinned=pinned
+        )
+        if cacheable:
+            return cache_body(request, etag, body)
+        return json_body_response(body, response)
+
+    feed = PostFeedResponse(
+        pinned=pinned,
+        posts=posts,
+        pagination=build_pagination_meta(limit, offset, total_count, count)
     )
 
-    return build_pagination_response(
-        items=posts,
-        total_count=total_count,
-        limit=limit,
-        offset=offset
+    if cacheable:
+        return cache_response(request, etag, feed)
+    return feed
+
+# E31: PUT /api/v1/communities/{community_id}/posts/{post_id}/pin
+@router.put(
+    "/{community_id}/posts/{post_id}/pin",
+    response_model=PostPinResponse
+)
+@limiter.limit("30/hour")
+@idempotent()
+async def pin_post(
+    request: Request,
+    community_id: UUID,
+    post_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user),
+    service: PostService = Depends(get_post_service)
+):
+    """Pin a post above the feed (organizers only)"""
+    return await service.set_pinned(
+        post_id=post_id,
+        user_id=UUID(current_user.user_id),
+        is_pinned=True
+    )
+
+# E32: DELETE /api/v1/communities/{community_id}/posts/{post_id}/pin
+@router.delete(
+    "/{community_id}/posts/{post_id}/pin",
+    response_model=PostPinResponse
+)
+@limiter.limit("30/hour")
+@idempotent()
+async def unpin_post(
+    request: Request,
+    community_id: UUID,
+    post_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user),
+    service: PostService = Depends(get_post_service)
+):
+    """Unpin a post (organizers only)"""
+    return await service.set_pinned(
+        post_id=post_id,
+        user_id=UUID(current_user.user_id),
+        is_pinned=False
     )
@@ -5,6 +5,7 @@ import structlog
 from app.core.auth import CurrentUser, get_current_user
 from app.core.database import Database, get_db
 from app.core.rate_limit import limiter
+from app.core.idempotency import idempotent
 from app.services.reaction_service import ReactionService
 from app.models.reaction import (
     ReactionCreateRequest,
@@ -25,6 +26,7 @@ def get_reaction_service(db: Database = Depends(get_db)) -> ReactionService:
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("200/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def create_post_reaction(
     request: Request,
     community_id: UUID,
@@ -47,6 +49,7 @@ async def create_post_reaction(
     response_model=ReactionDeleteResponse
 )
 @limiter.limit("200/hour")
+@idempotent()
 async def delete_post_reaction(
     request: Request,
     community_id: UUID,
@@ -68,6 +71,7 @@ async def delete_post_reaction(
     status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("200/hour")
+@idempotent(status_code=status.HTTP_201_CREATED)
 async def create_comment_reaction(
     request: Request,
     community_id: UUID,
@@ -91,6 +95,7 @@ async def create_comment_reaction(
     response_model=ReactionDeleteResponse
 )
 @limiter.limit("200/hour")
+@idempotent()
 async def delete_comment_reaction(
     request: Request,
     community_id: UUID,
@@ -0,0 +1,117 @@
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from uuid import UUID
+import structlog
+
+from app.config import settings
+from app.core.auth import CurrentUser, get_current_user_optional
+from app.core.database import Database, get_db
+from app.core.errors import raise_http_exception
+from app.core.realtime import Subscription, broker, community_topic, post_topic
+from app.services.community_service import CommunityService
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+def get_community_service(db: Database = Depends(get_db)) -> CommunityService:
+    return CommunityService(db)
+
+async def _ensure_can_read(
+    community_id: UUID,
+    current_user: Optional[CurrentUser],
+    service: CommunityService
+):
+    """Same visibility rule as the feed: members, or anyone for open communities"""
+    community = await service.get_community(
+        community_id=community_id,
+        requesting_user_id=UUID(current_user.user_id) if current_user else None
+    )
+
+    if not community:
+        raise_http_exception("COMMUNITY_NOT_FOUND")
+
+    if community.community_type != 'open' and not community.is_member:
+        raise_http_exception("INSUFFICIENT_PERMISSIONS")
+
+async def _ensure_post_in_community(community_id: UUID, post_id: UUID, service: CommunityService):
+    """Access was checked on community_id, so the post must belong to it"""
+    versions = await service.get_content_versions(community_id, post_id)
+    if not versions or not versions['post_in_community']:
+        raise_http_exception("POST_NOT_FOUND")
+
+def _open_subscription(topic: str) -> Subscription:
+    if not settings.SSE_ENABLED:
+        raise_http_exception("STREAMS_DISABLED")
+
+    subscription = broker.subscribe(topic)
+    if subscription is None:
+        raise_http_exception("STREAM_CAPACITY_REACHED")
+    return subscription
+
+async def _event_stream(request: Request, subscription: Subscription):
+    """Relay broker messages to one client, with heartbeats to detect disconnects"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.SSE_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+
+            # None = evicted as a slow consumer or broker shutting down
+            if message is None:
+                break
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+# E21: GET /api/v1/communities/{community_id}/posts/stream
+@router.get("/{community_id}/posts/stream")
+async def stream_posts(
+    request: Request,
+    community_id: UUID,
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+    service: CommunityService = Depends(get_community_service)
+):
+    """Server-sent events for new posts in a community"""
+    await _ensure_can_read(community_id, current_user, service)
+    subscription = _open_subscription(community_topic(community_id))
+
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+# E22: GET /api/v1/communities/{community_id}/posts/{post_id}/comments/stream
+@router.get("/{community_id}/posts/{post_id}/comments/stream")
+async def stream_comments(
+    request: Request,
+    community_id: UUID,
+    post_id: UUID,
+    current_user: Optional[CurrentUser] = Depends(get_current_user_optional),
+    service: CommunityService = Depends(get_community_service)
+):
+    """Server-sent events for new comments on a post"""
+    await _ensure_can_read(community_id, current_user, service)
+    await _ensure_post_in_community(community_id, post_id, service)
+    subscription = _open_subscription(post_topic(post_id))
+
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from uuid import UUID
+import structlog
+
+from app.core.auth import CurrentUser, get_current_user
+from app.core.database import Database, get_db
+from app.services.timeline_service import TimelineService
+from app.models.timeline import TimelineResponse
+
+logger = structlog.get_logger()
+router = APIRouter()
+
+def get_timeline_service(db: Database = Depends(get_db)) -> TimelineService:
+    return TimelineService(db)
+
+# E26: GET /api/v1/me/feed
+@router.get(
+    "/feed",
+    response_model=TimelineResponse
+)
+async def get_home_feed(
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    cursor: Optional[str] = Query(None, deprecated=True, description="Old name of after"),
+    current_user: CurrentUser = Depends(get_current_user),
+    service: TimelineService = Depends(get_timeline_service)
+):
+    """Newest posts from all communities the user belongs to"""
+    return await service.get_home_feed(
+        user_id=UUID(current_user.user_id),
+        limit=limit,
+        cursor=after or cursor
+    )
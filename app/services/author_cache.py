@@ -0,0 +1,99 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+import structlog
+
+from app.config import settings
+from app.core.database import Database
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT
+
+logger = structlog.get_logger()
+
+class AuthorCache:
+    """
+    Bounded in-process LRU of user profile snippets
+    - List procedures return author/member IDs only
+    - Hits are served from memory, misses are fetched in one batched = ANY($1) call
+    - Entries expire after AUTHOR_CACHE_TTL_SECONDS so profile edits show up eventually
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, user_id: UUID, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, snippet = entry
+        if expires_at <= now:
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return snippet
+
+    def _put(self, user_id: UUID, snippet: Dict[str, Any], now: float):
+        self._entries[user_id] = (now + self.ttl_seconds, snippet)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID):
+        """Drop a single profile (e.g. after a profile change notification)"""
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_many(
+        self,
+        db: Database,
+        user_ids: Iterable[UUID]
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """Return snippets for the given users (unknown users are omitted)"""
+        now = time.monotonic()
+        found: Dict[UUID, Dict[str, Any]] = {}
+        missing = []
+
+        for user_id in set(user_ids):
+            snippet = self._get(user_id, now)
+            if snippet is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = snippet
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            rows = await execute_stored_procedure(
+                db,
+                "activity.sp_community_get_user_snippets",
+                timeout=READ_TIMEOUT,
+                p_user_ids=missing
+            )
+            for row in rows:
+                user_id = row.pop('user_id')
+                self._put(user_id, row, now)
+                found[user_id] = row
+
+        return found
+
+def author_fields(snippet: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a snippet onto the author_* fields used by post and comment list items"""
+    return {
+        'author_username': snippet['username'],
+        'author_first_name': snippet['first_name'],
+        'author_main_photo_url': snippet['main_photo_url'],
+    }
+
+author_cache = AuthorCache(
+    max_size=settings.AUTHOR_CACHE_SIZE,
+    ttl_seconds=settings.AUTHOR_CACHE_TTL_SECONDS
+)
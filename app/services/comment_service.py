@@ -1,9 +1,16 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 import structlog
 
+from app.config import settings
 from app.core.database import Database
-from app.utils.stored_procedures import execute_stored_procedure
+from app.core.errors import raise_http_exception
+from app.models.common import CountMode
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT, WRITE_TIMEOUT
+from app.services.author_cache import author_cache, author_fields
+from app.services.reaction_service import ReactionService
 from app.models.comment import (
     CommentCreateRequest,
     CommentCreateResponse,
@@ -18,6 +25,7 @@ logger = structlog.get_logger()
 class CommentService:
     def __init__(self, db: Database):
         self.db = db
+        self.reactions = ReactionService(db)
 
     async def create_comment(
         self,
@@ -31,6 +39,7 @@ class CommentService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_comment_create",
+            timeout=WRITE_TIMEOUT,
             p_post_id=post_id,
             p_author_user_id=author_user_id,
             p_parent_comment_id=request.parent_comment_id,
@@ -51,6 +60,7 @@ class CommentService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_comment_update",
+            timeout=WRITE_TIMEOUT,
             p_comment_id=comment_id,
             p_updating_user_id=updating_user_id,
             p_content=request.content
@@ -69,6 +79,7 @@ class CommentService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_comment_delete",
+            timeout=WRITE_TIMEOUT,
             p_comment_id=comment_id,
             p_deleting_user_id=deleting_user_id
         )
@@ -79,25 +90,106 @@ class CommentService:
         self,
         post_id: UUID,
         parent_comment_id: Optional[UUID],
+        requesting_user_id: Optional[UUID] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> tuple[List[CommentListItem], int]:
-        """Get comments for a post (returns comments list and total count)"""
+        offset: int = 0,
+        count_mode: CountMode = 'exact',
+        after: Optional[str] = None
+    ) -> Tuple[List[CommentListItem], Optional[int], Optional[str]]:
+        """
+        Get one thread level of a post's comments
+        Returns comments, total count and the cursor for the next page (None on the last page)
+        """
         logger.info("getting_comments", post_id=str(post_id))
+        after_created_at, after_comment_id = self._parse_cursor(after) if after else (None, None)
+        if after:
+            count_mode = 'none'  # Keyset pages don't recount: the first page reported the total
 
+        # One extra row tells whether there is a next page
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_post_get_comments",
+            timeout=READ_TIMEOUT,
             p_post_id=post_id,
             p_parent_comment_id=parent_comment_id,
-            p_limit=limit,
-            p_offset=offset
+            p_limit=limit + 1,
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP,
+            p_after_created_at=after_created_at,
+            p_after_comment_id=after_comment_id
         )
 
         if not results:
-            return [], 0
+            return [], None if count_mode == 'none' else 0, None
+
+        total_count = results[0].get('total_count', 0)
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = encode_cursor(t=last['created_at'].isoformat(), id=last['comment_id'])
+
+        authors = await author_cache.get_many(self.db, (row['author_user_id'] for row in results))
+        reactions = await self.reactions.get_reaction_summaries(
+            "comment", (row['comment_id'] for row in results), requesting_user_id
+        )
+        comments = [
+            CommentListItem(
+                **row,
+                **author_fields(authors[row['author_user_id']]),
+                **reactions[row['comment_id']]
+            )
+            for row in results
+            if row['author_user_id'] in authors
+        ]
+
+        return comments, total_count, next_cursor
+
+    async def get_comments_json(
+        self,
+        post_id: UUID,
+        parent_comment_id: Optional[UUID],
+        requesting_user_id: Optional[UUID] = None,
+        limit: int = 50,
+        offset: int = 0,
+        count_mode: CountMode = 'exact',
+        after: Optional[str] = None
+    ) -> Tuple[str, Optional[int], Optional[str]]:
+        """
+        Same page as get_comments, as a JSON array built by the database
+        Returns items JSON, total count and the cursor for the next page
+        """
+        logger.info("getting_comments", post_id=str(post_id), db_json=True)
+        after_created_at, after_comment_id = self._parse_cursor(after) if after else (None, None)
+        if after:
+            count_mode = 'none'
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_post_get_comments_json",
+            timeout=READ_TIMEOUT,
+            p_post_id=post_id,
+            p_parent_comment_id=parent_comment_id,
+            p_requesting_user_id=requesting_user_id,
+            p_limit=limit,
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP,
+            p_after_created_at=after_created_at,
+            p_after_comment_id=after_comment_id
+        )
+
+        page = results[0]
+        next_cursor = None
+        if page['has_more']:
+            next_cursor = encode_cursor(t=page['last_created_at'].isoformat(), id=page['last_comment_id'])
 
-        total_count = results[0].get('total_count', 0) if results else 0
-        comments = [CommentListItem(**row) for row in results]
+        return page['items'], page['total_count'], next_cursor
 
-        return comments, total_count
+    def _parse_cursor(self, cursor: str) -> Tuple[datetime, UUID]:
+        fields = decode_cursor(cursor)
+        try:
+            return datetime.fromisoformat(fields["t"]), UUID(fields["id"])
+        except (KeyError, TypeError, ValueError):
+            raise_http_exception("INVALID_CURSOR")
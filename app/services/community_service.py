@@ -1,9 +1,16 @@
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, get_args
 from uuid import UUID
 import structlog
 
+from app.config import settings
 from app.core.database import Database
-from app.utils.stored_procedures import execute_stored_procedure
+from app.models.common import CountMode
+from app.core.errors import raise_http_exception
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT, WRITE_TIMEOUT, SEARCH_TIMEOUT, BULK_TIMEOUT
+from app.services.author_cache import author_cache
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.models.community import (
     CommunityCreateRequest,
     CommunityCreateResponse,
@@ -14,6 +21,11 @@ from app.models.community import (
     MembershipCreateResponse,
     MembershipLeaveResponse,
     MemberListItem,
+    MemberRole,
+    BulkJoinResult,
+    BulkJoinResponse,
+    RemoveUserContentRequest,
+    RemoveUserContentResponse,
 )
 
 logger = structlog.get_logger()
@@ -33,6 +45,7 @@ class CommunityService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_create",
+            timeout=WRITE_TIMEOUT,
             p_creator_user_id=creator_user_id,
             p_organization_id=request.organization_id,
             p_name=request.name,
@@ -58,6 +71,7 @@ class CommunityService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_get_by_id",
+            timeout=READ_TIMEOUT,
             p_community_id=community_id,
             p_requesting_user_id=requesting_user_id
         )
@@ -67,6 +81,22 @@ class CommunityService:
 
         return CommunityDetailResponse(**results[0])
 
+    async def get_content_versions(
+        self,
+        community_id: UUID,
+        post_id: Optional[UUID] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get cheap validators for conditional GETs (None if community not found)"""
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_content_versions",
+            timeout=READ_TIMEOUT,
+            p_community_id=community_id,
+            p_post_id=post_id
+        )
+
+        return results[0] if results else None
+
     async def update_community(
         self,
         community_id: UUID,
@@ -79,6 +109,7 @@ class CommunityService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_update",
+            timeout=WRITE_TIMEOUT,
             p_community_id=community_id,
             p_updating_user_id=updating_user_id,
             p_name=request.name,
@@ -102,12 +133,103 @@ class CommunityService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_join",
+            timeout=WRITE_TIMEOUT,
             p_community_id=community_id,
             p_user_id=user_id
         )
 
         return MembershipCreateResponse(**results[0])
 
+    async def bulk_join_community(
+        self,
+        community_id: UUID,
+        requesting_user_id: Optional[UUID],
+        user_ids: List[UUID]
+    ) -> BulkJoinResponse:
+        """
+        Join many users at once (organizer import)
+        - User IDs are streamed into a temp table with COPY, then inserted set-based
+        - member_count and max_members are applied once for the whole batch
+        - requesting_user_id None skips the organizer check (CLI import)
+        """
+        if len(user_ids) > settings.BULK_JOIN_MAX_USERS:
+            raise_http_exception("BULK_JOIN_TOO_LARGE")
+
+        logger.info("bulk_joining_community", community_id=str(community_id), requested=len(user_ids))
+
+        async with self.db.transaction() as conn:
+            await execute_stored_procedure(
+                self.db,
+                "activity.sp_community_bulk_join_prepare",
+                conn=conn,
+                timeout=BULK_TIMEOUT
+            )
+            await conn.copy_records_to_table(
+                "bulk_join_users",
+                records=enumerate(user_ids),
+                columns=["ordinal", "user_id"]
+            )
+            results = await execute_stored_procedure(
+                self.db,
+                "activity.sp_community_bulk_join",
+                conn=conn,
+                timeout=BULK_TIMEOUT,
+                p_community_id=community_id,
+                p_requesting_user_id=requesting_user_id
+            )
+
+        outcomes = Counter(row['outcome'] for row in results)
+        logger.info("bulk_join_completed", community_id=str(community_id), **outcomes)
+
+        return BulkJoinResponse(
+            community_id=community_id,
+            requested=len(results),
+            joined=outcomes['joined'],
+            already_member=outcomes['already_member'],
+            user_not_found=outcomes['user_not_found'],
+            community_full=outcomes['community_full'],
+            results=[BulkJoinResult(**row) for row in results]
+        )
+
+    async def remove_user_content(
+        self,
+        community_id: UUID,
+        moderator_user_id: UUID,
+        request: RemoveUserContentRequest
+    ) -> RemoveUserContentResponse:
+        """Remove a user's posts, comments and reactions in a community (organizer only)"""
+        logger.info(
+            "removing_user_content",
+            community_id=str(community_id),
+            target_user_id=str(request.user_id),
+            moderator_user_id=str(moderator_user_id)
+        )
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_moderate_remove_user_content",
+            timeout=BULK_TIMEOUT,
+            p_community_id=community_id,
+            p_moderator_user_id=moderator_user_id,
+            p_target_user_id=request.user_id,
+            p_since=request.since,
+            p_until=request.until
+        )
+
+        result = RemoveUserContentResponse(
+            community_id=community_id,
+            user_id=request.user_id,
+            **results[0]
+        )
+        logger.info(
+            "user_content_removed",
+            community_id=str(community_id),
+            posts=result.posts_removed,
+            comments=result.comments_removed,
+            reactions=result.reactions_removed
+        )
+        return result
+
     async def leave_community(
         self,
         community_id: UUID,
@@ -119,6 +241,7 @@ class CommunityService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_leave",
+            timeout=WRITE_TIMEOUT,
             p_community_id=community_id,
             p_user_id=user_id
         )
@@ -130,27 +253,116 @@ class CommunityService:
         community_id: UUID,
         requesting_user_id: UUID,
         limit: int = 50,
-        offset: int = 0
-    ) -> tuple[List[MemberListItem], int]:
-        """Get community members (returns members list and total count)"""
+        offset: int = 0,
+        count_mode: CountMode = 'exact',
+        role: Optional[MemberRole] = None,
+        search: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> tuple[List[MemberListItem], Optional[int], Optional[str]]:
+        """
+        Get community members, organizers first
+        Returns members, total count and the cursor for the next page (None on the last page)
+        """
         logger.info("getting_members", community_id=str(community_id))
+        after_role, after_joined_at, after_user_id = (
+            self._parse_member_cursor(after) if after else (None, None, None)
+        )
+        if after:
+            count_mode = 'none'  # Keyset pages don't recount: the first page reported the total
 
+        # One extra row tells whether there is a next page
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_get_members",
+            timeout=SEARCH_TIMEOUT if search else READ_TIMEOUT,
             p_community_id=community_id,
             p_requesting_user_id=requesting_user_id,
-            p_limit=limit,
-            p_offset=offset
+            p_limit=limit + 1,
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP,
+            p_role=role,
+            p_search=search,
+            p_after_role=after_role,
+            p_after_joined_at=after_joined_at,
+            p_after_user_id=after_user_id
         )
 
         if not results:
-            return [], 0
+            return [], None if count_mode == 'none' else 0, None
 
         total_count = results[0].get('total_count', 0)
-        members = [MemberListItem(**row) for row in results]
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            next_cursor = encode_cursor(r=last['role'], t=last['joined_at'].isoformat(), id=last['user_id'])
+
+        profiles = await author_cache.get_many(self.db, (row['user_id'] for row in results))
+        members = [
+            MemberListItem(**row, **profiles[row['user_id']])
+            for row in results
+            if row['user_id'] in profiles
+        ]
+
+        return members, total_count, next_cursor
+
+    async def get_members_json(
+        self,
+        community_id: UUID,
+        requesting_user_id: UUID,
+        limit: int = 50,
+        offset: int = 0,
+        count_mode: CountMode = 'exact',
+        role: Optional[MemberRole] = None,
+        search: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> tuple[str, Optional[int], Optional[str]]:
+        """
+        Same page as get_members, as a JSON array built by the database
+        Returns items JSON, total count and the cursor for the next page
+        """
+        logger.info("getting_members", community_id=str(community_id), db_json=True)
+        after_role, after_joined_at, after_user_id = (
+            self._parse_member_cursor(after) if after else (None, None, None)
+        )
+        if after:
+            count_mode = 'none'
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_members_json",
+            timeout=SEARCH_TIMEOUT if search else READ_TIMEOUT,
+            p_community_id=community_id,
+            p_requesting_user_id=requesting_user_id,
+            p_limit=limit,
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP,
+            p_role=role,
+            p_search=search,
+            p_after_role=after_role,
+            p_after_joined_at=after_joined_at,
+            p_after_user_id=after_user_id
+        )
+
+        page = results[0]
+        next_cursor = None
+        if page['has_more']:
+            next_cursor = encode_cursor(
+                r=page['last_role'], t=page['last_joined_at'].isoformat(), id=page['last_user_id']
+            )
+
+        return page['items'], page['total_count'], next_cursor
 
-        return members, total_count
+    def _parse_member_cursor(self, cursor: str) -> tuple[str, datetime, UUID]:
+        fields = decode_cursor(cursor)
+        try:
+            if fields["r"] not in get_args(MemberRole):
+                raise ValueError(fields["r"])
+            return fields["r"], datetime.fromisoformat(fields["t"]), UUID(fields["id"])
+        except (KeyError, TypeError, ValueError):
+            raise_http_exception("INVALID_CURSOR")
 
     async def search_communities(
         self,
@@ -159,20 +371,24 @@ class CommunityService:
         tags: Optional[List[str]],
         requesting_user_id: Optional[UUID],
         limit: int = 20,
-        offset: int = 0
-    ) -> tuple[List[CommunityListItem], int]:
+        offset: int = 0,
+        count_mode: CountMode = 'exact'
+    ) -> tuple[List[CommunityListItem], Optional[int]]:
         """Search communities (returns communities list and total count)"""
         logger.info("searching_communities", search_text=search_text)
 
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_search",
+            timeout=SEARCH_TIMEOUT,
             p_search_text=search_text,
             p_organization_id=organization_id,
             p_tags=tags,
             p_requesting_user_id=requesting_user_id,
             p_limit=limit,
-            p_offset=offset
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP
         )
 
         if not results:
@@ -0,0 +1,142 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+import structlog
+
+from app.config import settings
+from app.core.database import Database, db
+from app.core.redis import redis_client
+from app.utils.periodic import PeriodicTask
+from app.utils.stored_procedures import execute_stored_procedure, WRITE_TIMEOUT
+
+logger = structlog.get_logger()
+
+def encode_event(row: Dict[str, Any]) -> Dict[str, str]:
+    """Flat string fields for a stream entry (payload stays a JSON document)"""
+    payload = row['payload']
+    return {
+        "event_id": str(row['event_id']),
+        "type": row['event_type'],
+        "aggregate_id": str(row['aggregate_id']),
+        "payload": payload if isinstance(payload, str) else json.dumps(payload),
+        "created_at": row['created_at'].isoformat(),
+    }
+
+class RedisStreamSink:
+    """Append events to a Redis stream (XADD, approximately capped at OUTBOX_STREAM_MAXLEN)"""
+
+    async def publish(self, events: List[Dict[str, str]]):
+        redis = redis_client.client
+        if redis is None:
+            raise RuntimeError("Redis client not initialized")
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(
+                    settings.OUTBOX_STREAM_KEY,
+                    event,
+                    maxlen=settings.OUTBOX_STREAM_MAXLEN,
+                    approximate=True
+                )
+            await pipe.execute()
+
+class MemorySink:
+    """Keep published events in process (local development and tests)"""
+
+    def __init__(self):
+        self.events: List[Dict[str, str]] = []
+
+    async def publish(self, events: List[Dict[str, str]]):
+        self.events.extend(events)
+
+SINKS = {"redis": RedisStreamSink, "memory": MemorySink}
+
+class OutboxRelay:
+    """
+    Drain activity.community_outbox to the configured sink
+    - Claims up to OUTBOX_BATCH_SIZE events with FOR UPDATE SKIP LOCKED, publishes
+      them, then deletes them in the same transaction
+    - A failed publish rolls back: the events stay and are retried on the next pass
+      (at-least-once; consumers dedupe on event_id)
+    - Full batches are drained back to back; otherwise it polls every half
+      OUTBOX_LAG_TARGET_SECONDS
+    - Every worker runs a relay; SKIP LOCKED keeps them on disjoint batches, so
+      ordering is per batch, not global
+    """
+
+    def __init__(self, database: Database, sink):
+        self.db = database
+        self.sink = sink
+        self.published = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_lag_seconds = 0.0
+        self._task = PeriodicTask(
+            "outbox_relay",
+            settings.OUTBOX_LAG_TARGET_SECONDS / 2,
+            self.drain
+        )
+
+    def start(self):
+        self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    async def drain(self):
+        """Relay batches until the outbox has less than a full batch left"""
+        while await self.relay_batch() == settings.OUTBOX_BATCH_SIZE:
+            pass
+
+    async def relay_batch(self) -> int:
+        started = time.perf_counter()
+        try:
+            async with self.db.transaction() as conn:
+                rows = await execute_stored_procedure(
+                    self.db,
+                    "activity.sp_community_outbox_claim",
+                    conn=conn,
+                    timeout=WRITE_TIMEOUT,
+                    p_limit=settings.OUTBOX_BATCH_SIZE
+                )
+                if not rows:
+                    return 0
+
+                await self.sink.publish([encode_event(row) for row in rows])
+
+                await execute_stored_procedure(
+                    self.db,
+                    "activity.sp_community_outbox_delete",
+                    conn=conn,
+                    timeout=WRITE_TIMEOUT,
+                    p_event_ids=[row['event_id'] for row in rows]
+                )
+
+        except Exception as e:
+            self.failures += 1
+            logger.warning("outbox_relay_failed", error=str(e), error_type=type(e).__name__)
+            return 0
+
+        self.published += len(rows)
+        self.batches += 1
+        self.last_lag_seconds = (datetime.now(timezone.utc) - rows[0]['created_at']).total_seconds()
+        if self.last_lag_seconds > settings.OUTBOX_LAG_TARGET_SECONDS:
+            logger.warning("outbox_lag_exceeded", lag_seconds=round(self.last_lag_seconds, 3))
+
+        logger.debug(
+            "outbox_batch_relayed",
+            events=len(rows),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
+        return len(rows)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "published": self.published,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+        }
+
+outbox_relay = OutboxRelay(db, SINKS[settings.OUTBOX_SINK]())
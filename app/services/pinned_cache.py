@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import structlog
+
+from app.config import settings
+from app.core.database import Database
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT
+
+logger = structlog.get_logger()
+
+class PinnedPostCache:
+    """
+    Bounded in-process LRU of each community's pinned posts (raw procedure rows)
+    - The feed procedure skips pinned posts; this cache serves the pinned section
+    - Dropped on 'pinned_changed' notifications (pin/unpin, edit or removal of a
+      pinned post) for communities cached by this worker
+    - Entries are tagged with the community's feed version; a newer version (comments,
+      reactions, posts) refetches, so counters match the feed they are shown with
+    - Entries also expire after PINNED_CACHE_TTL_SECONDS (missed notifications)
+    - Authors and reactions are hydrated per request, so nothing viewer-specific is cached
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[UUID, tuple[float, Optional[int], List[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get(self, community_id: UUID, version: Optional[int], now: float) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(community_id)
+        if entry is None:
+            return None
+
+        expires_at, cached_version, rows = entry
+        if expires_at <= now or cached_version != version:
+            del self._entries[community_id]
+            return None
+
+        self._entries.move_to_end(community_id)
+        return rows
+
+    def _put(self, community_id: UUID, version: Optional[int], rows: List[Dict[str, Any]], now: float):
+        self._entries[community_id] = (now + self.ttl_seconds, version, rows)
+        self._entries.move_to_end(community_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, community_id: UUID):
+        if self._entries.pop(community_id, None) is not None:
+            self.invalidations += 1
+
+    def on_pinned_changed(self, event: Dict):
+        self.invalidate(UUID(event['community_id']))
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get(
+        self,
+        db: Database,
+        community_id: UUID,
+        version: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Pinned post rows for a community, newest first (callers must not mutate them)
+        - version: the community's feed_version (sp_community_get_content_versions)
+        """
+        now = time.monotonic()
+        rows = self._get(community_id, version, now)
+        if rows is not None:
+            self.hits += 1
+            return rows
+
+        self.misses += 1
+        rows = await execute_stored_procedure(
+            db,
+            "activity.sp_community_post_get_pinned",
+            timeout=READ_TIMEOUT,
+            p_community_id=community_id,
+            p_limit=settings.PINNED_POSTS_LIMIT
+        )
+        self._put(community_id, version, rows, now)
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+pinned_cache = PinnedPostCache(
+    max_size=settings.PINNED_CACHE_SIZE,
+    ttl_seconds=settings.PINNED_CACHE_TTL_SECONDS
+)
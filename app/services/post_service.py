@@ -1,15 +1,21 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import structlog
 
+from app.config import settings
 from app.core.database import Database
-from app.utils.stored_procedures import execute_stored_procedure
+from app.models.common import CountMode
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT, WRITE_TIMEOUT
+from app.services.author_cache import author_cache, author_fields
+from app.services.pinned_cache import pinned_cache
+from app.services.reaction_service import ReactionService
 from app.models.post import (
     PostCreateRequest,
     PostCreateResponse,
     PostUpdateRequest,
     PostUpdateResponse,
     PostDeleteResponse,
+    PostPinResponse,
     PostListItem,
 )
 
@@ -18,6 +24,7 @@ logger = structlog.get_logger()
 class PostService:
     def __init__(self, db: Database):
         self.db = db
+        self.reactions = ReactionService(db)
 
     async def create_post(
         self,
@@ -31,6 +38,7 @@ class PostService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_post_create",
+            timeout=WRITE_TIMEOUT,
             p_community_id=community_id,
             p_author_user_id=author_user_id,
             p_activity_id=request.activity_id,
@@ -53,6 +61,7 @@ class PostService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_post_update",
+            timeout=WRITE_TIMEOUT,
             p_post_id=post_id,
             p_updating_user_id=updating_user_id,
             p_title=request.title,
@@ -72,35 +81,120 @@ class PostService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_post_delete",
+            timeout=WRITE_TIMEOUT,
             p_post_id=post_id,
             p_deleting_user_id=deleting_user_id
         )
 
         return PostDeleteResponse(**results[0])
 
+    async def set_pinned(
+        self,
+        post_id: UUID,
+        user_id: UUID,
+        is_pinned: bool
+    ) -> PostPinResponse:
+        """Pin or unpin a post (organizers only, at most PINNED_POSTS_LIMIT pins per community)"""
+        logger.info("setting_post_pinned", post_id=str(post_id), is_pinned=is_pinned)
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_post_set_pinned",
+            timeout=WRITE_TIMEOUT,
+            p_post_id=post_id,
+            p_user_id=user_id,
+            p_is_pinned=is_pinned,
+            p_max_pinned=settings.PINNED_POSTS_LIMIT
+        )
+
+        return PostPinResponse(**results[0])
+
     async def get_post_feed(
         self,
         community_id: UUID,
         requesting_user_id: Optional[UUID],
         limit: int = 20,
-        offset: int = 0
-    ) -> tuple[List[PostListItem], int]:
+        offset: int = 0,
+        count_mode: CountMode = 'exact'
+    ) -> tuple[List[PostListItem], Optional[int]]:
         """Get post feed for a community (returns posts list and total count)"""
         logger.info("getting_post_feed", community_id=str(community_id))
 
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_post_get_feed",
+            timeout=READ_TIMEOUT,
             p_community_id=community_id,
             p_requesting_user_id=requesting_user_id,
             p_limit=limit,
-            p_offset=offset
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP
         )
 
         if not results:
-            return [], 0
+            return [], None if count_mode == 'none' else 0
 
         total_count = results[0].get('total_count', 0) if results else 0
-        posts = [PostListItem(**row) for row in results]
+        posts = await self._hydrate(results, requesting_user_id)
 
         return posts, total_count
+
+    async def get_post_feed_json(
+        self,
+        community_id: UUID,
+        requesting_user_id: Optional[UUID],
+        limit: int = 20,
+        offset: int = 0,
+        count_mode: CountMode = 'exact'
+    ) -> tuple[str, Optional[int]]:
+        """Post feed page as a JSON array built by the database (returns items JSON and total count)"""
+        logger.info("getting_post_feed", community_id=str(community_id), db_json=True)
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_post_get_feed_json",
+            timeout=READ_TIMEOUT,
+            p_community_id=community_id,
+            p_requesting_user_id=requesting_user_id,
+            p_limit=limit,
+            p_offset=offset,
+            p_count_mode=count_mode,
+            p_count_cap=settings.PAGINATION_COUNT_CAP
+        )
+
+        return results[0]['items'], results[0]['total_count']
+
+    async def get_pinned_posts(
+        self,
+        community_id: UUID,
+        requesting_user_id: Optional[UUID],
+        feed_version: Optional[int] = None
+    ) -> List[PostListItem]:
+        """
+        Pinned section of a community feed (call after get_post_feed, which checks access)
+        """
+        rows = await pinned_cache.get(self.db, community_id, feed_version)
+        if not rows:
+            return []
+        return await self._hydrate(rows, requesting_user_id)
+
+    async def _hydrate(
+        self,
+        rows: List[Dict[str, Any]],
+        requesting_user_id: Optional[UUID]
+    ) -> List[PostListItem]:
+        """Attach author snippets and reaction summaries to feed rows"""
+        authors = await author_cache.get_many(self.db, (row['author_user_id'] for row in rows))
+        reactions = await self.reactions.get_reaction_summaries(
+            "post", (row['post_id'] for row in rows), requesting_user_id
+        )
+        return [
+            PostListItem(
+                **row,
+                **author_fields(authors[row['author_user_id']]),
+                **reactions[row['post_id']]
+            )
+            for row in rows
+            if row['author_user_id'] in authors
+        ]
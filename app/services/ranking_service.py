@@ -0,0 +1,72 @@
+from typing import List, Optional
+from uuid import UUID
+import structlog
+
+from app.config import settings
+from app.core.database import Database, db
+from app.utils.periodic import PeriodicTask
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT, BULK_TIMEOUT
+from app.models.community import CommunityTrendingItem
+
+logger = structlog.get_logger()
+
+class RankingService:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def refresh_rankings(self) -> Optional[int]:
+        """Recompute the trending snapshot (returns None if another worker holds the lock)"""
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_refresh_rankings",
+            timeout=BULK_TIMEOUT,
+            p_window_hours=settings.TRENDING_WINDOW_HOURS,
+            p_half_life_hours=settings.TRENDING_HALF_LIFE_HOURS,
+            p_join_weight=settings.TRENDING_JOIN_WEIGHT,
+            p_post_weight=settings.TRENDING_POST_WEIGHT,
+            p_reaction_weight=settings.TRENDING_REACTION_WEIGHT,
+            p_featured_boost=settings.TRENDING_FEATURED_BOOST
+        )
+
+        if not results:
+            logger.debug("trending_refresh_skipped")
+            return None
+
+        ranked_count = results[0]['ranked_count']
+        logger.info("trending_refreshed", ranked_count=ranked_count)
+        return ranked_count
+
+    async def get_trending(
+        self,
+        requesting_user_id: Optional[UUID],
+        limit: int = 20,
+        offset: int = 0
+    ) -> tuple[List[CommunityTrendingItem], int]:
+        """Get trending communities (returns communities list and total count)"""
+        logger.info("getting_trending_communities", offset=offset)
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_trending",
+            timeout=READ_TIMEOUT,
+            p_requesting_user_id=requesting_user_id,
+            p_limit=limit,
+            p_offset=offset
+        )
+
+        if not results:
+            return [], 0
+
+        total_count = results[0].get('total_count', 0)
+        communities = [CommunityTrendingItem(**row) for row in results]
+
+        return communities, total_count
+
+async def _refresh_rankings():
+    await RankingService(db).refresh_rankings()
+
+ranking_refresher = PeriodicTask(
+    name="trending_rankings",
+    interval_seconds=settings.TRENDING_REFRESH_SECONDS,
+    func=_refresh_rankings
+)
@@ -1,8 +1,9 @@
+from typing import Any, Dict, Iterable, Optional
 from uuid import UUID
 import structlog
 
 from app.core.database import Database
-from app.utils.stored_procedures import execute_stored_procedure
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT, WRITE_TIMEOUT
 from app.models.reaction import (
     ReactionCreateRequest,
     ReactionCreateResponse,
@@ -30,6 +31,7 @@ class ReactionService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_reaction_create",
+            timeout=WRITE_TIMEOUT,
             p_user_id=user_id,
             p_target_type=target_type,
             p_target_id=target_id,
@@ -50,6 +52,7 @@ class ReactionService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_reaction_delete",
+            timeout=WRITE_TIMEOUT,
             p_user_id=user_id,
             p_target_type=target_type,
             p_target_id=target_id
@@ -57,6 +60,42 @@ class ReactionService:
 
         return ReactionDeleteResponse(**results[0])
 
+    async def get_reaction_summaries(
+        self,
+        target_type: str,
+        target_ids: Iterable[UUID],
+        viewer_user_id: Optional[UUID]
+    ) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Per-type counts and the viewer's own reaction for a page of targets
+        - One batched query for the whole page
+        - Every requested id is present in the result (empty counts if no reactions)
+        """
+        ids = list(dict.fromkeys(target_ids))
+        summaries: Dict[UUID, Dict[str, Any]] = {
+            target_id: {"reaction_counts": {}, "viewer_reaction": None}
+            for target_id in ids
+        }
+        if not ids:
+            return summaries
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_reaction_summaries",
+            timeout=READ_TIMEOUT,
+            p_target_type=target_type,
+            p_target_ids=ids,
+            p_viewer_user_id=viewer_user_id
+        )
+
+        for row in results:
+            summary = summaries[row['target_id']]
+            summary["reaction_counts"][row['reaction_type']] = row['reaction_count']
+            if row['is_viewer_reaction']:
+                summary["viewer_reaction"] = row['reaction_type']
+
+        return summaries
+
     async def link_activity_to_community(
         self,
         community_id: UUID,
@@ -69,6 +108,7 @@ class ReactionService:
         results = await execute_stored_procedure(
             self.db,
             "activity.sp_community_link_activity",
+            timeout=WRITE_TIMEOUT,
             p_community_id=community_id,
             p_activity_id=request.activity_id,
             p_linking_user_id=linking_user_id
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import structlog
+
+from app.config import settings
+from app.core.admission import admission
+from app.core.database import Database, db
+from app.utils.periodic import PeriodicTask
+from app.utils.stored_procedures import execute_stored_procedure, WRITE_TIMEOUT
+
+logger = structlog.get_logger()
+
+# Procedure per content kind; posts first (their comments cascade with them)
+PURGE_PROCEDURES = {
+    "posts": "activity.sp_community_purge_posts",
+    "comments": "activity.sp_community_purge_comments",
+}
+
+# Pause multiplier while live traffic is over the admission latency target
+BACKOFF_FACTOR = 10
+
+class RetentionPurger:
+    """
+    Hard-delete soft-deleted posts and comments older than RETENTION_DAYS
+    - Small keyset-ordered batches (RETENTION_BATCH_SIZE), one short transaction each
+    - Sleeps RETENTION_BATCH_PAUSE_SECONDS between batches, ten times longer while
+      procedure latency is over ADMISSION_LATENCY_TARGET_MS
+    - At most RETENTION_MAX_BATCHES_PER_RUN batches per kind per run; the rest waits
+      for the next run
+    - One worker at a time (advisory lock in the procedures); others skip the run
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+        self.purged: Dict[str, int] = {kind: 0 for kind in PURGE_PROCEDURES}
+        self.last_run: Dict[str, object] = {}
+        self._task = PeriodicTask(
+            "retention_purge",
+            settings.RETENTION_INTERVAL_SECONDS,
+            self.run,
+            run_immediately=False
+        )
+
+    def start(self):
+        self._task.start()
+
+    async def stop(self):
+        await self._task.stop()
+
+    async def run(self):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.RETENTION_DAYS)
+        started = time.perf_counter()
+        run: Dict[str, int] = {}
+
+        for kind, procedure in PURGE_PROCEDURES.items():
+            purged = await self._purge(procedure, cutoff)
+            if purged is None:
+                logger.info("retention_purge_skipped", reason="locked_by_another_worker")
+                return
+            run[kind] = purged
+            self.purged[kind] += purged
+
+        elapsed = time.perf_counter() - started
+        total = sum(run.values())
+        self.last_run = {
+            **run,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": round(elapsed, 3),
+            "rows_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info("retention_purge_completed", **self.last_run)
+
+    async def _purge(self, procedure: str, cutoff: datetime) -> Optional[int]:
+        """Purge one content kind in batches (None if another worker holds the lock)"""
+        after_updated_at = None
+        after_id = None
+        purged = 0
+
+        for _ in range(settings.RETENTION_MAX_BATCHES_PER_RUN):
+            rows = await execute_stored_procedure(
+                self.db,
+                procedure,
+                timeout=WRITE_TIMEOUT,
+                p_older_than=cutoff,
+                p_after_updated_at=after_updated_at,
+                p_after_id=after_id,
+                p_batch_size=settings.RETENTION_BATCH_SIZE,
+                p_archive=settings.RETENTION_ARCHIVE
+            )
+            if not rows:
+                return None if purged == 0 and after_id is None else purged
+
+            batch = rows[0]
+            purged += batch['purged_count']
+            if batch['scanned_count'] < settings.RETENTION_BATCH_SIZE:
+                break
+
+            after_updated_at = batch['last_updated_at']
+            after_id = batch['last_id']
+            await self._throttle()
+
+        return purged
+
+    async def _throttle(self):
+        pause = settings.RETENTION_BATCH_PAUSE_SECONDS
+        if admission.latency_ewma_ms > settings.ADMISSION_LATENCY_TARGET_MS:
+            pause *= BACKOFF_FACTOR
+        await asyncio.sleep(pause)
+
+    def stats(self) -> Dict[str, object]:
+        return {"purged": dict(self.purged), "last_run": self.last_run}
+
+retention_purger = RetentionPurger(db)
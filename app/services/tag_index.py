@@ -0,0 +1,82 @@
+import bisect
+import heapq
+from typing import Dict, Iterable, List, Tuple
+import structlog
+
+from app.config import settings
+from app.core.database import Database, db
+from app.utils.periodic import PeriodicTask
+from app.utils.stored_procedures import execute_stored_procedure, BULK_TIMEOUT
+
+logger = structlog.get_logger()
+
+class TagIndex:
+    """
+    In-memory prefix index of (tag, community_count)
+    - Sorted array of casefolded keys, searched with bisect (no DB hit per request)
+    - Built from one aggregate query at startup and rebuilt periodically
+    - Kept current incrementally from 'tags_changed' notifications
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self._counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    async def load(self, db: Database):
+        """Rebuild the index from the database and swap it in atomically"""
+        rows = await execute_stored_procedure(
+            db, "activity.sp_community_get_tag_counts", timeout=BULK_TIMEOUT
+        )
+
+        counts = {row['tag']: row['community_count'] for row in rows}
+        keys = sorted((tag.casefold(), tag) for tag in counts)
+
+        self._keys, self._counts = keys, counts
+        logger.info("tag_index_loaded", tag_count=len(counts))
+
+    def apply_change(self, added: Iterable[str], removed: Iterable[str]):
+        """Adjust counts for one community's tag changes"""
+        for tag in added:
+            count = self._counts.get(tag, 0)
+            if count == 0:
+                bisect.insort(self._keys, (tag.casefold(), tag))
+            self._counts[tag] = count + 1
+
+        for tag in removed:
+            count = self._counts.get(tag, 0)
+            if count <= 1:
+                if count:
+                    del self._counts[tag]
+                    position = bisect.bisect_left(self._keys, (tag.casefold(), tag))
+                    if position < len(self._keys) and self._keys[position][1] == tag:
+                        del self._keys[position]
+            else:
+                self._counts[tag] = count - 1
+
+    def on_tags_changed(self, event: Dict):
+        self.apply_change(event.get('added') or [], event.get('removed') or [])
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most used tags starting with prefix (case-insensitive)"""
+        key = prefix.casefold()
+        start = bisect.bisect_left(self._keys, (key,))
+        end = bisect.bisect_left(self._keys, (key + "\U0010ffff",), lo=start)
+
+        counts = self._counts
+        matches = ((tag, counts[tag]) for _, tag in self._keys[start:end])
+        return heapq.nlargest(limit, matches, key=lambda item: item[1])
+
+async def _rebuild_tag_index():
+    await tag_index.load(db)
+
+tag_index = TagIndex()
+
+tag_index_rebuilder = PeriodicTask(
+    name="tag_index_rebuild",
+    interval_seconds=settings.TAG_INDEX_REBUILD_SECONDS,
+    func=_rebuild_tag_index,
+    run_immediately=False
+)
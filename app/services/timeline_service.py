@@ -0,0 +1,343 @@
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from redis.exceptions import RedisError
+import structlog
+
+from app.config import settings
+from app.core.database import Database
+from app.core.errors import raise_http_exception
+from app.core.redis import redis_client
+from app.utils.stored_procedures import execute_stored_procedure, READ_TIMEOUT
+from app.utils.pagination import build_pagination_meta, encode_cursor, decode_cursor
+from app.services.author_cache import author_cache, author_fields
+from app.services.reaction_service import ReactionService
+from app.models.timeline import TimelineItem, TimelineResponse
+
+logger = structlog.get_logger()
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Keeps an empty-but-built timeline alive so it isn't rebuilt on every read
+SENTINEL = "_"
+
+# Extra entries read past the cursor score, to skip ties already served
+TIE_SLACK = 20
+
+# Add a post to every timeline that exists (inactive users are rebuilt lazily), then trim
+_FANOUT_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('ZADD', key, ARGV[1], ARGV[2])
+        redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+    end
+end
+return 0
+"""
+
+# (score, post_id) - score is created_at in epoch microseconds, exact in a Redis double
+Entry = Tuple[int, str]
+
+def timeline_key(user_id) -> str:
+    return f"timeline:{user_id}"
+
+def to_score(created_at: datetime) -> int:
+    return (created_at - EPOCH) // timedelta(microseconds=1)
+
+def from_score(score: int) -> datetime:
+    return EPOCH + timedelta(microseconds=score)
+
+class TimelineService:
+    """
+    Home timeline across all communities a user belongs to
+    - Communities up to TIMELINE_FANOUT_MAX_MEMBERS: post IDs are pushed into
+      per-user Redis sorted sets on write (timeline:{user_id})
+    - Larger communities: read at request time (fan-in) and k-way merged
+    - Missing timelines are rebuilt from the database on first read
+    - Without Redis, every community is read by fan-in
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.reactions = ReactionService(db)
+
+    # ----- Read path -----
+
+    async def get_home_feed(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> TimelineResponse:
+        """Newest posts from the user's communities (cursor-paginated)"""
+        before = self._parse_cursor(cursor) if cursor else None
+
+        sources = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_timeline_sources",
+            timeout=READ_TIMEOUT,
+            p_user_id=user_id,
+            p_fanout_max_members=settings.TIMELINE_FANOUT_MAX_MEMBERS
+        )
+        fanout_ids = [row['community_id'] for row in sources if row['is_fanout']]
+        fanin_ids = [row['community_id'] for row in sources if not row['is_fanout']]
+
+        streams: List[List[Entry]] = []
+        want = limit + 1
+
+        stored = await self._read_stored(user_id, fanout_ids, before, want)
+        if stored is None:
+            # Redis unavailable, or the page is older than the trimmed timeline
+            fanin_ids += fanout_ids
+        else:
+            streams.append(stored)
+
+        if fanin_ids:
+            streams.extend(await self._read_fanin(fanin_ids, before, want))
+
+        entries = self._merge(streams, want)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        posts = await self._hydrate([post_id for _, post_id in entries], user_id)
+        next_cursor = None
+        if has_more and entries:
+            score, post_id = entries[-1]
+            next_cursor = encode_cursor(s=score, id=post_id)
+
+        return TimelineResponse(
+            posts=posts,
+            pagination=build_pagination_meta(limit, 0, None, 'none', next_cursor)
+        )
+
+    def _parse_cursor(self, cursor: str) -> Entry:
+        fields = decode_cursor(cursor)
+        try:
+            return int(fields["s"]), str(UUID(fields["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise_http_exception("INVALID_CURSOR")
+
+    async def _read_stored(
+        self,
+        user_id: UUID,
+        fanout_ids: List[UUID],
+        before: Optional[Entry],
+        count: int
+    ) -> Optional[List[Entry]]:
+        """Entries from the user's sorted set (None = serve these communities by fan-in)"""
+        redis = redis_client.client
+        if redis is None or not settings.TIMELINE_ENABLED:
+            return None
+
+        key = timeline_key(user_id)
+        try:
+            if not await redis.exists(key):
+                await self._rebuild(user_id, fanout_ids)
+
+            raw = await redis.zrevrangebyscore(
+                key,
+                before[0] if before else "+inf",
+                "-inf",
+                start=0,
+                num=count + TIE_SLACK,
+                withscores=True
+            )
+            size = await redis.zcard(key)
+            await redis.expire(key, settings.TIMELINE_TTL_SECONDS)
+        except RedisError as e:
+            logger.warning("timeline_read_failed", error=str(e))
+            return None
+
+        entries = [
+            (int(score), member) for member, score in raw
+            if member != SENTINEL and (before is None or (int(score), member) < before)
+        ]
+
+        # Trimmed timeline ran out before the page did: older posts only exist in the DB
+        if len(entries) < count and size >= settings.TIMELINE_MAX_LENGTH:
+            return None
+        return entries[:count]
+
+    async def _read_fanin(
+        self,
+        community_ids: List[UUID],
+        before: Optional[Entry],
+        count: int
+    ) -> List[List[Entry]]:
+        """Newest posts per community from the database, one sorted stream each"""
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_recent_post_ids",
+            timeout=READ_TIMEOUT,
+            p_community_ids=community_ids,
+            p_before_created_at=from_score(before[0]) if before else None,
+            p_before_post_id=UUID(before[1]) if before else None,
+            p_limit_per_community=count
+        )
+
+        streams: Dict[UUID, List[Entry]] = {}
+        for row in results:
+            streams.setdefault(row['community_id'], []).append(
+                (to_score(row['created_at']), str(row['post_id']))
+            )
+        return list(streams.values())
+
+    def _merge(self, streams: List[List[Entry]], count: int) -> List[Entry]:
+        """k-way merge of newest-first streams, deduplicated by post ID"""
+        merged: List[Entry] = []
+        seen = set()
+        for entry in heapq.merge(*streams, reverse=True):
+            if entry[1] in seen:
+                continue
+            seen.add(entry[1])
+            merged.append(entry)
+            if len(merged) == count:
+                break
+        return merged
+
+    async def _hydrate(self, post_ids: List[str], user_id: UUID) -> List[TimelineItem]:
+        if not post_ids:
+            return []
+
+        results = await execute_stored_procedure(
+            self.db,
+            "activity.sp_community_get_posts_by_ids",
+            timeout=READ_TIMEOUT,
+            p_post_ids=[UUID(post_id) for post_id in post_ids],
+            p_requesting_user_id=user_id
+        )
+        rows = {str(row['post_id']): row for row in results}
+
+        authors = await author_cache.get_many(self.db, (row['author_user_id'] for row in results))
+        reactions = await self.reactions.get_reaction_summaries(
+            "post", (row['post_id'] for row in results), user_id
+        )
+
+        # Keep timeline order; posts deleted or no longer visible are skipped
+        return [
+            TimelineItem(
+                **row,
+                **author_fields(authors[row['author_user_id']]),
+                **reactions[row['post_id']]
+            )
+            for row in (rows.get(post_id) for post_id in post_ids)
+            if row is not None and row['author_user_id'] in authors
+        ]
+
+    async def _rebuild(self, user_id: UUID, fanout_ids: List[UUID]):
+        """
+        Rebuild a user's sorted set from the newest posts of their fan-out communities
+        - The key is created before the database read, so posts committed meanwhile
+          are delivered by fan_out_post (it only writes to existing keys)
+        - Read entries are then merged in, not swapped in, to keep those deliveries
+        """
+        key = timeline_key(user_id)
+        redis = redis_client.client
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {SENTINEL: 0})
+            pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+            await pipe.execute()
+
+        entries: List[Entry] = []
+        if fanout_ids:
+            streams = await self._read_fanin(fanout_ids, None, settings.TIMELINE_MAX_LENGTH)
+            entries = self._merge(streams, settings.TIMELINE_MAX_LENGTH)
+
+        if entries:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(key, {post_id: score for score, post_id in entries})
+                pipe.zremrangebyrank(key, 0, -(settings.TIMELINE_MAX_LENGTH + 1))
+                await pipe.execute()
+
+        logger.info("timeline_rebuilt", user_id=str(user_id), entries=len(entries))
+
+    # ----- Write path (run as background tasks) -----
+
+    async def fan_out_post(self, community_id: UUID, post_id: UUID, created_at: datetime):
+        """Push a new post into the timelines of the community's members"""
+        redis = redis_client.client
+        if redis is None or not settings.TIMELINE_ENABLED:
+            return
+
+        fanout = redis.register_script(_FANOUT_SCRIPT)
+        score = to_score(created_at)
+        after_user_id = None
+        delivered = 0
+
+        try:
+            while True:
+                rows = await execute_stored_procedure(
+                    self.db,
+                    "activity.sp_community_get_fanout_targets",
+                    timeout=READ_TIMEOUT,
+                    p_community_id=community_id,
+                    p_fanout_max_members=settings.TIMELINE_FANOUT_MAX_MEMBERS,
+                    p_after_user_id=after_user_id,
+                    p_limit=settings.TIMELINE_FANOUT_BATCH_SIZE
+                )
+                if not rows:
+                    break
+
+                await fanout(
+                    keys=[timeline_key(row['user_id']) for row in rows],
+                    args=[score, str(post_id), settings.TIMELINE_MAX_LENGTH]
+                )
+                delivered += len(rows)
+
+                if len(rows) < settings.TIMELINE_FANOUT_BATCH_SIZE:
+                    break
+                after_user_id = rows[-1]['user_id']
+
+        except RedisError as e:
+            # Timelines missing this post are repaired when they expire and rebuild
+            logger.warning("timeline_fanout_failed", post_id=str(post_id), error=str(e))
+            return
+
+        logger.info("timeline_fanout", post_id=str(post_id), members=delivered)
+
+    async def on_member_joined(self, user_id: UUID, community_id: UUID):
+        """Merge the newly joined community's recent posts into an existing timeline"""
+        redis = redis_client.client
+        if redis is None or not settings.TIMELINE_ENABLED:
+            return
+
+        key = timeline_key(user_id)
+        try:
+            if not await redis.exists(key):
+                return  # Built with the new community on next read
+
+            sources = await execute_stored_procedure(
+                self.db,
+                "activity.sp_community_get_timeline_sources",
+                timeout=READ_TIMEOUT,
+                p_user_id=user_id,
+                p_fanout_max_members=settings.TIMELINE_FANOUT_MAX_MEMBERS
+            )
+            if not any(row['community_id'] == community_id and row['is_fanout'] for row in sources):
+                return  # Large community: served by fan-in
+
+            streams = await self._read_fanin([community_id], None, settings.TIMELINE_MAX_LENGTH)
+            if not streams:
+                return
+
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(key, {post_id: score for score, post_id in streams[0]})
+                pipe.zremrangebyrank(key, 0, -(settings.TIMELINE_MAX_LENGTH + 1))
+                pipe.expire(key, settings.TIMELINE_TTL_SECONDS)
+                await pipe.execute()
+
+        except RedisError as e:
+            logger.warning("timeline_join_repair_failed", user_id=str(user_id), error=str(e))
+
+    async def invalidate(self, user_ids: Iterable[UUID]):
+        """Drop timelines so they are rebuilt on next read (after leave, bulk join)"""
+        redis = redis_client.client
+        keys = [timeline_key(user_id) for user_id in user_ids]
+        if redis is None or not keys:
+            return
+
+        try:
+            await redis.delete(*keys)
+        except RedisError as e:
+            logger.warning("timeline_invalidate_failed", error=str(e))
@@ -0,0 +1,56 @@
+import gzip
+from typing import Optional
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency: fall back to gzip only
+    brotli = None
+
+IDENTITY = "identity"
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick the best supported encoding from Accept-Encoding (br > gzip > identity)"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return IDENTITY
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    return body
+
+def choose_encoding(accept_encoding: str, size: int) -> str:
+    """Encoding to use for a body of the given size (identity below the threshold)"""
+    if not settings.COMPRESSION_ENABLED or size < settings.COMPRESSION_MIN_SIZE:
+        return IDENTITY
+    return negotiate_encoding(accept_encoding)
+
+def should_compress(body: bytes, encoding: Optional[str]) -> bool:
+    return (
+        settings.COMPRESSION_ENABLED
+        and encoding not in (None, IDENTITY)
+        and len(body) >= settings.COMPRESSION_MIN_SIZE
+    )
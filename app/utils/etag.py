@@ -0,0 +1,36 @@
+import hashlib
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Clients must revalidate, but may keep the body and send If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Weak ETag from version components (ids, counters, timestamps, query params)"""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match (RFC 9110 13.1.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,28 @@
+import json
+from typing import Any, Optional
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+from app.models.common import PaginationMeta
+
+def _render(value: Any) -> bytes:
+    # Same encoding as JSONResponse
+    return json.dumps(
+        jsonable_encoder(value), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def json_list_body(items_key: str, items_json: str, pagination: PaginationMeta, **sections: Any) -> bytes:
+    """
+    Response body around a page assembled by a *_json procedure (DB_JSON_LISTS)
+    - The items array is spliced in as the database produced it, with no per-row work
+    - Only the small parts (extra sections such as pinned posts, pagination) are encoded here
+    """
+    parts = [b'"%s":%s' % (key.encode(), _render(value)) for key, value in sections.items()]
+    parts.append(b'"%s":%s' % (items_key.encode(), items_json.encode("utf-8")))
+    parts.append(b'"pagination":%s' % _render(pagination))
+    return b"{" + b",".join(parts) + b"}"
+
+def json_body_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """Raw JSON response, keeping headers already set on the route's response (ETag)"""
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
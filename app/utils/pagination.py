@@ -1,29 +1,54 @@
-from typing import List, TypeVar, Generic
-from pydantic import BaseModel
+import base64
+import binascii
+import json
+from typing import Any, Dict, Optional
 
-T = TypeVar('T')
+from app.config import settings
+from app.core.errors import raise_http_exception
+from app.models.common import CountMode, PaginationMeta
 
-class PaginationMeta(BaseModel):
-    limit: int
-    offset: int
-    total_count: int
-
-class PaginatedResponse(BaseModel, Generic[T]):
-    items: List[T]
-    pagination: PaginationMeta
-
-def build_pagination_response(
-    items: List[T],
-    total_count: int,
+def build_pagination_meta(
     limit: int,
-    offset: int
-) -> PaginatedResponse[T]:
-    """Build paginated response"""
-    return PaginatedResponse(
-        items=items,
-        pagination=PaginationMeta(
-            limit=limit,
-            offset=offset,
-            total_count=total_count
+    offset: int,
+    total_count: Optional[int],
+    count_mode: CountMode = 'exact',
+    next_cursor: Optional[str] = None
+) -> PaginationMeta:
+    """Build pagination metadata, labelling capped and estimated totals"""
+    if count_mode == 'none' or total_count is None:
+        return PaginationMeta(
+            limit=limit, offset=offset, total_count=None, count_kind='none', next_cursor=next_cursor
         )
+
+    label = str(total_count)
+    if count_mode == 'capped' and total_count > settings.PAGINATION_COUNT_CAP:
+        total_count = settings.PAGINATION_COUNT_CAP
+        label = f"{total_count}+"
+    elif count_mode == 'estimate':
+        label = f"~{total_count}"
+
+    return PaginationMeta(
+        limit=limit,
+        offset=offset,
+        total_count=total_count,
+        count_kind=count_mode,
+        total_count_label=label,
+        next_cursor=next_cursor
     )
+
+def encode_cursor(**fields: Any) -> str:
+    """Opaque URL-safe cursor from keyset fields"""
+    raw = json.dumps(fields, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Inverse of encode_cursor (400 INVALID_CURSOR if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fields = json.loads(raw)
+    except (binascii.Error, ValueError):
+        fields = None
+
+    if not isinstance(fields, dict):
+        raise_http_exception("INVALID_CURSOR")
+    return fields
@@ -0,0 +1,63 @@
+import asyncio
+import contextlib
+from typing import Awaitable, Callable, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+class PeriodicTask:
+    """
+    Run a coroutine function on a fixed interval in the background
+    - Started/stopped from the application lifespan
+    - Failures are logged and the next run is attempted on schedule
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], Awaitable[None]],
+        run_immediately: bool = True
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_immediately = run_immediately
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name=self.name)
+        logger.info("periodic_task_started", task=self.name, interval_seconds=self.interval_seconds)
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        logger.info("periodic_task_stopped", task=self.name)
+
+    async def _run(self):
+        if not self.run_immediately:
+            await asyncio.sleep(self.interval_seconds)
+
+        while True:
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "periodic_task_failed",
+                    task=self.name,
+                    error=str(e),
+                    error_type=type(e).__name__
+                )
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import settings
+from app.utils.compression import IDENTITY, choose_encoding, compress
+from app.utils.etag import CACHE_CONTROL
+
+class EncodedResponseCache:
+    """
+    LRU of serialized JSON bodies keyed by ETag
+    - The ETag already encodes the content version, so entries never go stale;
+      a new version simply produces a new key and the old one ages out
+    - Compressed variants are stored next to the identity body, so each
+      encoding is paid for once per cache fill rather than once per request
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str, accept_encoding: str) -> Optional[Tuple[bytes, str]]:
+        """Return (body, encoding) for the client's preferred encoding, or None"""
+        variants = self._entries.get(etag)
+        if variants is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(etag)
+        self.hits += 1
+
+        encoding = choose_encoding(accept_encoding, len(variants[IDENTITY]))
+        body = variants.get(encoding)
+        if body is None:
+            body = compress(variants[IDENTITY], encoding)
+            variants[encoding] = body
+        return body, encoding
+
+    def put(self, etag: str, body: bytes):
+        self._entries[etag] = {IDENTITY: body}
+        self._entries.move_to_end(etag)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+response_cache = EncodedResponseCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+def _encoded_response(body: bytes, etag: str, encoding: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def cached_response(request: Request, etag: str) -> Optional[Response]:
+    """Serve a cached body for this ETag in the client's preferred encoding"""
+    cached = response_cache.get(etag, request.headers.get("accept-encoding", ""))
+    if cached is None:
+        return None
+
+    body, encoding = cached
+    return _encoded_response(body, etag, encoding)
+
+def cache_response(request: Request, etag: str, content: Any) -> Response:
+    """Serialize once, store under the ETag and answer in the client's preferred encoding"""
+    return cache_body(request, etag, JSONResponse(jsonable_encoder(content)).body)
+
+def cache_body(request: Request, etag: str, body: bytes) -> Response:
+    """Store an already serialized JSON body under the ETag (database-assembled pages)"""
+    response_cache.put(etag, body)
+    return cached_response(request, etag)
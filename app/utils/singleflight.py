@@ -0,0 +1,53 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into one
+    - The first caller for a key starts the call; callers arriving while it is
+      in flight await the same task and get its result (or exception)
+    - The shared task is shielded, so a cancelled caller (client disconnect)
+      doesn't cancel it for the others
+    - Nothing is cached: once the call completes the next caller starts a new one
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.executions: Dict[str, int] = defaultdict(int)
+
+    async def do(
+        self,
+        name: str,
+        key: Hashable,
+        func: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        self.calls[name] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions[name] += 1
+            task = asyncio.create_task(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        rows = await asyncio.shield(task)
+        # Each caller gets its own row dicts (services add fields to them)
+        return [dict(row) for row in rows]
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Mark the exception retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {
+                "calls": calls,
+                "executions": self.executions[name],
+                "coalesced": calls - self.executions[name],
+            }
+            for name, calls in self.calls.items()
+        }
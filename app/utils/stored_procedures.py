@@ -1,14 +1,54 @@
+import asyncio
 import asyncpg
-from typing import List, Dict, Any
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, List, Dict, Any, Optional
 import structlog
+from app.config import settings
+from app.core.admission import admission
 from app.core.database import Database
+from app.core.slow_procedures import slow_procedure_log
 from app.core.errors import parse_db_error, raise_http_exception
+from app.utils.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
+# Identical concurrent calls of opted-in read procedures share one DB round trip
+singleflight = SingleFlight()
+
+# Per-call timeout budgets (seconds), passed as timeout= at each call site.
+# On expiry asyncpg cancels the statement server-side and frees the connection.
+# Override per procedure with settings.PROCEDURE_TIMEOUTS.
+READ_TIMEOUT = 5.0
+WRITE_TIMEOUT = 10.0
+SEARCH_TIMEOUT = 3.0
+BULK_TIMEOUT = 120.0
+
+# Calls that hit their timeout / were cancelled (client disconnect), per procedure
+timeout_counts: Dict[str, int] = defaultdict(int)
+cancel_counts: Dict[str, int] = defaultdict(int)
+
+def resolve_timeout(procedure_name: str, timeout: Optional[float]) -> Optional[float]:
+    """Settings override first, then the call site's budget (None = pool command_timeout)"""
+    return settings.PROCEDURE_TIMEOUTS.get(procedure_name, timeout)
+
+@asynccontextmanager
+async def _connection(
+    db: Database,
+    conn: Optional[asyncpg.Connection]
+) -> AsyncGenerator[asyncpg.Connection, None]:
+    if conn is not None:
+        yield conn
+    else:
+        async with db.get_connection() as connection:
+            yield connection
+
 async def execute_stored_procedure(
     db: Database,
     procedure_name: str,
+    conn: Optional[asyncpg.Connection] = None,
+    timeout: Optional[float] = None,
     **kwargs
 ) -> List[Dict[str, Any]]:
     """
@@ -17,6 +57,8 @@ async def execute_stored_procedure(
     Args:
         db: Database instance
         procedure_name: Full procedure name (e.g., 'activity.sp_community_create')
+        conn: Connection to run on (e.g. inside db.transaction()); pooled if omitted
+        timeout: Budget in seconds (READ_TIMEOUT, WRITE_TIMEOUT, ...); pool default if omitted
         **kwargs: Procedure parameters
 
     Returns:
@@ -25,6 +67,28 @@ async def execute_stored_procedure(
     Raises:
         HTTPException: With appropriate status code and error details
     """
+    timeout = resolve_timeout(procedure_name, timeout)
+
+    if (
+        conn is None
+        and settings.SINGLEFLIGHT_ENABLED
+        and procedure_name in settings.COALESCED_PROCEDURES
+    ):
+        return await singleflight.do(
+            procedure_name,
+            (procedure_name, repr(list(kwargs.items()))),
+            lambda: _execute(db, procedure_name, None, timeout, kwargs)
+        )
+
+    return await _execute(db, procedure_name, conn, timeout, kwargs)
+
+async def _execute(
+    db: Database,
+    procedure_name: str,
+    conn: Optional[asyncpg.Connection],
+    timeout: Optional[float],
+    kwargs: Dict[str, Any]
+) -> List[Dict[str, Any]]:
     # Build parameter list
     params = []
     param_placeholders = []
@@ -41,9 +105,15 @@ async def execute_stored_procedure(
         params={k: str(v)[:50] for k, v in kwargs.items()}
     )
 
+    started = time.perf_counter()
     try:
-        async with db.get_connection() as conn:
-            rows = await conn.fetch(query, *params)
+        async with _connection(db, conn) as connection:
+            query_started = time.perf_counter()
+            rows = await connection.fetch(query, *params, timeout=timeout)
+            slow_procedure_log.observe(
+                db, procedure_name, query, params, kwargs,
+                time.perf_counter() - query_started, len(rows), timeout
+            )
 
             # Convert to list of dicts
             results = [dict(row) for row in rows]
@@ -56,6 +126,23 @@ async def execute_stored_procedure(
 
             return results
 
+    except (asyncio.TimeoutError, asyncpg.exceptions.QueryCanceledError) as e:
+        # Client-side budget, or the server's statement_timeout
+        timeout_counts[procedure_name] += 1
+        logger.warning(
+            "stored_procedure_timeout",
+            procedure=procedure_name,
+            timeout_seconds=timeout,
+            error_type=type(e).__name__
+        )
+        raise_http_exception("QUERY_TIMEOUT")
+
+    except asyncio.CancelledError:
+        # Request task cancelled (client disconnected): asyncpg cancels the statement
+        cancel_counts[procedure_name] += 1
+        logger.info("stored_procedure_cancelled", procedure=procedure_name)
+        raise
+
     except asyncpg.exceptions.RaiseError as e:
         # Database raised custom error
         error_code = parse_db_error(str(e))
@@ -86,3 +173,7 @@ async def execute_stored_procedure(
             error_type=type(e).__name__
         )
         raise_http_exception("INTERNAL_ERROR")
+
+    finally:
+        # Pool wait included: the admission controller's overload signal
+        admission.observe_latency(time.perf_counter() - started)
@@ -0,0 +1,106 @@
+"""
+Compression cost/benefit for a limit=100 post feed
+
+Compares wire size and CPU per response for gzip levels and brotli qualities,
+against serving a body that was compressed once and cached (precompressed).
+
+Usage:
+    python benchmarks/compression_benchmark.py [--posts 100] [--iterations 200]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WORDS = (
+    "community meetup weekend hiking coffee board games volunteers photo walk "
+    "beginners welcome bring water schedule park downtown evening session "
+    "update thanks everyone see you next time route changed rain plan"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def build_feed(posts: int, seed: int = 7) -> bytes:
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    community_id = str(uuid.UUID(int=rng.getrandbits(128)))
+
+    items = []
+    for i in range(posts):
+        created = now - timedelta(minutes=17 * i)
+        items.append({
+            "post_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "community_id": community_id,
+            "author_user_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "author_username": f"member_{rng.randint(1, 5000)}",
+            "author_first_name": rng.choice(["Anna", "Bram", "Chen", "Dewi", "Emre", None]),
+            "author_main_photo_url": f"https://cdn.example.com/u/{rng.getrandbits(48):x}.jpg",
+            "title": _sentence(rng, rng.randint(3, 9)) if rng.random() < 0.6 else None,
+            "content": " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(1, 6))),
+            "content_type": "text",
+            "view_count": rng.randint(0, 4000),
+            "comment_count": rng.randint(0, 80),
+            "reaction_count": rng.randint(0, 300),
+            "is_pinned": i < 2,
+            "tags": rng.sample(WORDS, rng.randint(0, 4)),
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+        })
+
+    payload = {
+        "posts": items,
+        "pagination": {"limit": posts, "offset": 0, "total_count": 2400, "has_more": True},
+    }
+    return json.dumps(payload).encode()
+
+def _measure(compress, body: bytes, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        out = compress(body)
+    elapsed = (time.perf_counter() - start) / iterations
+    return len(out), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    body = build_feed(args.posts)
+    candidates = [("identity", lambda b: b)]
+    candidates += [
+        (f"gzip-{level}", lambda b, level=level: gzip.compress(b, compresslevel=level, mtime=0))
+        for level in (1, 4, 6, 9)
+    ]
+    if brotli is not None:
+        candidates += [
+            (f"br-{quality}", lambda b, quality=quality: brotli.compress(b, quality=quality))
+            for quality in (1, 4, 6, 11)
+        ]
+    else:
+        print("brotli not installed: skipping br variants\n")
+
+    print(f"feed payload: {args.posts} posts, {len(body):,} bytes\n")
+    print(f"{'encoding':<10} {'bytes':>9} {'ratio':>7} {'per-request':>13}")
+
+    variants = {}
+    for name, compress in candidates:
+        size, elapsed = _measure(compress, body, args.iterations)
+        variants[name] = compress(body)
+        print(f"{name:<10} {size:>9,} {len(body) / size:>6.1f}x {elapsed * 1e3:>10.3f} ms")
+
+    # Precompressed cache hit: a variant lookup, no encoder work per request
+    _, elapsed = _measure(lambda _: variants[name], body, args.iterations)
+    print(f"\ncached variant lookup: {elapsed * 1e6:.2f} us per request")
+
+if __name__ == "__main__":
+    main()
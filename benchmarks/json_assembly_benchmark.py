@@ -0,0 +1,151 @@
+"""
+Application CPU per feed page: row hydration vs database-built JSON (DB_JSON_LISTS)
+
+The row path is what the API does per request by default: merge author snippets and
+reaction summaries into each procedure row, validate into pydantic models and encode the
+response. The JSON path is what it does with DB_JSON_LISTS: the items array arrives as
+text from a *_json procedure and only the pagination object is encoded around it.
+
+Database time is not included: building the array moves that work into Postgres. Compare
+the saving here with the procedure latency in the slow procedure log before switching.
+
+Usage:
+    python benchmarks/json_assembly_benchmark.py [--items 100] [--iterations 500]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+WORDS = (
+    "community meetup weekend hiking coffee board games volunteers photo walk "
+    "beginners welcome bring water schedule park downtown evening session "
+    "update thanks everyone see you next time route changed rain plan"
+).split()
+REACTION_TYPES = ("like", "love", "celebrate", "support", "insightful")
+
+# Mirrors app.models.post.PostListItem (kept local so the benchmark runs without app settings)
+class FeedItem(BaseModel):
+    post_id: uuid.UUID
+    author_user_id: uuid.UUID
+    author_username: str
+    author_first_name: Optional[str]
+    author_main_photo_url: Optional[str]
+    activity_id: Optional[uuid.UUID]
+    title: Optional[str]
+    content: str
+    content_type: str
+    view_count: int
+    comment_count: int
+    reaction_count: int
+    is_pinned: bool
+    created_at: datetime
+    updated_at: datetime
+    reaction_counts: Dict[str, int] = Field(default_factory=dict)
+    viewer_reaction: Optional[str] = None
+
+class Pagination(BaseModel):
+    limit: int
+    offset: int
+    total_count: Optional[int]
+    has_more: bool
+
+class Feed(BaseModel):
+    posts: List[FeedItem]
+    pagination: Pagination
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def build_rows(items: int, seed: int = 7):
+    """Procedure rows, author snippets and reaction summaries as the row path receives them"""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    rows, authors, reactions = [], {}, {}
+    for i in range(items):
+        created = now - timedelta(minutes=17 * i)
+        author_id = uuid.UUID(int=rng.getrandbits(128))
+        post_id = uuid.UUID(int=rng.getrandbits(128))
+        rows.append({
+            "post_id": post_id,
+            "author_user_id": author_id,
+            "activity_id": None,
+            "title": _sentence(rng, rng.randint(3, 9)) if rng.random() < 0.6 else None,
+            "content": " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(1, 6))),
+            "content_type": "text",
+            "view_count": rng.randint(0, 4000),
+            "comment_count": rng.randint(0, 80),
+            "reaction_count": rng.randint(0, 300),
+            "is_pinned": False,
+            "created_at": created,
+            "updated_at": created,
+            "total_count": 2400,
+        })
+        authors[author_id] = {
+            "author_username": f"member_{rng.randint(1, 5000)}",
+            "author_first_name": rng.choice(["Anna", "Bram", "Chen", "Dewi", "Emre", None]),
+            "author_main_photo_url": f"https://cdn.example.com/u/{rng.getrandbits(48):x}.jpg",
+        }
+        reactions[post_id] = {
+            "reaction_counts": {t: rng.randint(1, 40) for t in rng.sample(REACTION_TYPES, rng.randint(0, 3))},
+            "viewer_reaction": rng.choice([None, None, "like"]),
+        }
+    return rows, authors, reactions
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def row_path(rows, authors, reactions, limit: int) -> bytes:
+    posts = [
+        FeedItem(
+            **{k: v for k, v in row.items() if k != "total_count"},
+            **authors[row["author_user_id"]],
+            **reactions[row["post_id"]]
+        )
+        for row in rows
+    ]
+    feed = Feed(
+        posts=posts,
+        pagination=Pagination(limit=limit, offset=0, total_count=rows[0]["total_count"], has_more=True)
+    )
+    return _dumps(feed.model_dump(mode="json"))
+
+def json_path(items_json: str, total_count: int, limit: int) -> bytes:
+    pagination = {"limit": limit, "offset": 0, "total_count": total_count, "has_more": True}
+    return b'{"posts":' + items_json.encode("utf-8") + b',"pagination":' + _dumps(pagination) + b"}"
+
+def _measure(fn, iterations: int):
+    start = time.process_time()
+    for _ in range(iterations):
+        out = fn()
+    return len(out), (time.process_time() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    rows, authors, reactions = build_rows(args.items)
+    # What the *_json procedure hands back: the items array, already text
+    items_json = json.dumps(json.loads(row_path(rows, authors, reactions, args.items))["posts"])
+
+    results = [
+        ("rows + pydantic", _measure(lambda: row_path(rows, authors, reactions, args.items), args.iterations)),
+        ("database JSON", _measure(lambda: json_path(items_json, 2400, args.items), args.iterations)),
+    ]
+
+    baseline = results[0][1][1]
+    print(f"{args.items} items, {args.iterations} iterations (process CPU time)")
+    print(f"{'path':<18} {'bytes':>9} {'cpu us':>10} {'speedup':>8}")
+    for name, (size, cpu) in results:
+        print(f"{name:<18} {size:>9,} {cpu * 1e6:>10.1f} {baseline / cpu:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Write procedures under concurrent writers
+
+Many users join one open community, react to and comment on one of its posts, then
+leave, all at once: every write contends for the same community and post rows.
+Reports latency percentiles and throughput per procedure, errors by message, and
+whether member_count / reaction_count / comment_count still match the rows they count.
+
+Run it against a checkout before and after a procedure change (same database, same
+arguments) to compare. It needs an open community with a published post, and users who
+have never been members of it (a membership row, even 'left', blocks a re-join).
+Memberships and comments it creates are removed at the end.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/write_contention_benchmark.py \
+        --community-id <uuid> [--writers 50] [--iterations 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+from uuid import UUID
+
+import asyncpg
+
+REACTION_TYPES = ("like", "love", "celebrate", "support", "insightful")
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    async def call(self, pool: asyncpg.Pool, procedure: str, *args):
+        placeholders = ", ".join(f"${i}" for i in range(1, len(args) + 1))
+        started = time.perf_counter()
+        try:
+            return await pool.fetch(f"SELECT * FROM {procedure}({placeholders})", *args)
+        except asyncpg.PostgresError as e:
+            self.errors[(procedure, e.sqlstate, str(e).splitlines()[0])] += 1
+            return None
+        finally:
+            self.latencies[procedure].append(time.perf_counter() - started)
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def report(phase: str, recorder: Recorder, elapsed: float):
+    calls = sum(len(v) for v in recorder.latencies.values())
+    print(f"\n{phase}: {calls:,} calls in {elapsed:.2f}s ({calls / elapsed:,.0f} calls/s)")
+    print(f"{'procedure':<40} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for procedure, values in sorted(recorder.latencies.items()):
+        print(
+            f"{procedure:<40} {len(values):>7} "
+            f"{statistics.median(values) * 1e3:>8.2f} "
+            f"{_percentile(values, 0.95) * 1e3:>8.2f} "
+            f"{_percentile(values, 0.99) * 1e3:>8.2f}"
+        )
+    for (procedure, sqlstate, message), count in recorder.errors.most_common():
+        print(f"  error x{count}: {procedure} [{sqlstate}] {message}")
+
+async def run_phase(name: str, tasks) -> Recorder:
+    recorder = Recorder()
+    started = time.perf_counter()
+    await asyncio.gather(*(task(recorder) for task in tasks))
+    report(name, recorder, time.perf_counter() - started)
+    return recorder
+
+async def churn(pool, recorder: Recorder, user_id: UUID, post_id: UUID, iterations: int, rng: random.Random):
+    """One writer: react, change reaction, comment, delete comment, unreact"""
+    comment_ids = []
+    for _ in range(iterations):
+        first, second = rng.sample(REACTION_TYPES, 2)
+        await recorder.call(pool, "activity.sp_community_reaction_create", user_id, "post", post_id, first)
+        await recorder.call(pool, "activity.sp_community_reaction_create", user_id, "post", post_id, second)
+
+        rows = await recorder.call(
+            pool, "activity.sp_community_comment_create", post_id, user_id, None, "benchmark comment"
+        )
+        if rows:
+            comment_ids.append(rows[0]["comment_id"])
+            await recorder.call(pool, "activity.sp_community_comment_delete", rows[0]["comment_id"], user_id)
+
+        await recorder.call(pool, "activity.sp_community_reaction_delete", user_id, "post", post_id)
+    return comment_ids
+
+async def check_counters(pool, community_id: UUID, post_id: UUID):
+    row = await pool.fetchrow(
+        """
+        SELECT
+            c.member_count,
+            (SELECT COUNT(*) FROM activity.community_members cm
+             WHERE cm.community_id = c.community_id AND cm.status = 'active') as active_members,
+            p.reaction_count,
+            (SELECT COUNT(*) FROM activity.reactions r
+             WHERE r.target_type = 'post' AND r.target_id = p.post_id) as reactions,
+            p.comment_count,
+            (SELECT COUNT(*) FROM activity.comments cm
+             WHERE cm.post_id = p.post_id AND NOT cm.is_deleted) as comments
+        FROM activity.communities c
+        JOIN activity.posts p ON p.community_id = c.community_id
+        WHERE c.community_id = $1 AND p.post_id = $2
+        """,
+        community_id, post_id
+    )
+    print("\ncounter drift (stored - actual):")
+    print(f"  member_count   {row['member_count'] - row['active_members']:+d}")
+    print(f"  reaction_count {row['reaction_count'] - row['reactions']:+d}")
+    print(f"  comment_count  {row['comment_count'] - row['comments']:+d}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--community-id", type=UUID, required=True)
+    parser.add_argument("--post-id", type=UUID, help="Defaults to the newest published post")
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+
+    rng = random.Random(args.seed)
+    pool = await asyncpg.create_pool(args.dsn, min_size=args.writers, max_size=args.writers)
+    user_ids: List[UUID] = []
+    comment_ids: List[UUID] = []
+    try:
+        post_id = args.post_id or await pool.fetchval(
+            """
+            SELECT p.post_id FROM activity.posts p
+            WHERE p.community_id = $1 AND p.status = 'published'
+            ORDER BY p.created_at DESC LIMIT 1
+            """,
+            args.community_id
+        )
+        if post_id is None:
+            raise SystemExit("community has no published post")
+
+        user_ids = [row["user_id"] for row in await pool.fetch(
+            """
+            SELECT u.user_id FROM activity.users u
+            WHERE NOT EXISTS (
+                SELECT 1 FROM activity.community_members cm
+                WHERE cm.community_id = $1 AND cm.user_id = u.user_id
+            )
+            LIMIT $2
+            """,
+            args.community_id, args.writers
+        )]
+        if len(user_ids) < args.writers:
+            raise SystemExit(f"only {len(user_ids)} users are not members yet (need {args.writers})")
+
+        print(f"{args.writers} writers, {args.iterations} iterations, post {post_id}")
+
+        await run_phase("join", [
+            lambda rec, u=u: rec.call(pool, "activity.sp_community_join", args.community_id, u)
+            for u in user_ids
+        ])
+
+        async def writer(rec, u, seed):
+            comment_ids.extend(await churn(pool, rec, u, post_id, args.iterations, random.Random(seed)))
+
+        await run_phase("react / comment", [
+            lambda rec, u=u, seed=rng.random(): writer(rec, u, seed)
+            for u in user_ids
+        ])
+
+        await run_phase("leave", [
+            lambda rec, u=u: rec.call(pool, "activity.sp_community_leave", args.community_id, u)
+            for u in user_ids
+        ])
+
+        await check_counters(pool, args.community_id, post_id)
+
+    finally:
+        # Leave no trace: drop benchmark memberships and comments, resync member_count
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "DELETE FROM activity.comments WHERE comment_id = ANY($1)",
+                    comment_ids
+                )
+                await conn.execute(
+                    "DELETE FROM activity.community_members WHERE community_id = $1 AND user_id = ANY($2)",
+                    args.community_id, user_ids
+                )
+                await conn.execute(
+                    """
+                    UPDATE activity.communities c
+                    SET member_count = (
+                        SELECT COUNT(*) FROM activity.community_members cm
+                        WHERE cm.community_id = c.community_id AND cm.status = 'active'
+                    )
+                    WHERE c.community_id = $1
+                    """,
+                    args.community_id
+                )
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,10 +3,40 @@
 -- Database Schema: activity
 -- PostgreSQL 15+
 --
--- This file contains all 18 stored procedures for the Community API
+-- This file contains all stored procedures for the Community API
 -- All procedures follow the naming convention: sp_community_<action>
 -- =============================================================================
 
+-- HELPER: Planner row estimate
+-- Purpose: Cheap approximate count for count=estimate (EXPLAIN only, query is not executed)
+-- Note: p_query must be built with format() and %L literals by the caller
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.fn_estimate_count(
+    p_query TEXT
+) RETURNS BIGINT AS $$
+DECLARE
+    v_plan JSON;
+BEGIN
+    EXECUTE 'EXPLAIN (FORMAT JSON) ' || p_query INTO v_plan;
+    RETURN (v_plan -> 0 -> 'Plan' ->> 'Plan Rows')::NUMERIC::BIGINT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- HELPER: Pinned posts changed
+-- Purpose: Tell API workers to drop their cached pinned section for a community
+-- Note: Call whenever a pinned post is pinned, unpinned, edited or removed (delivered on commit)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.fn_notify_pinned_changed(
+    p_community_id UUID
+) RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_notify('community_events', json_build_object(
+        'type', 'pinned_changed',
+        'community_id', p_community_id
+    )::TEXT);
+END;
+$$ LANGUAGE plpgsql;
+
 -- SP1: Create Community
 -- Purpose: Create a new community (open type only for Phase 1)
 -- =============================================================================
@@ -113,6 +143,14 @@ BEGIN
     IF p_tags IS NOT NULL AND array_length(p_tags, 1) > 0 THEN
         INSERT INTO activity.community_tags (community_id, tag)
         SELECT v_community_id, unnest(p_tags);
+
+        -- Keep in-memory tag indexes current (delivered on commit)
+        PERFORM pg_notify('community_events', json_build_object(
+            'type', 'tags_changed',
+            'community_id', v_community_id,
+            'added', p_tags,
+            'removed', ARRAY[]::TEXT[]
+        )::TEXT);
     END IF;
 
     -- 8. Return community details
@@ -204,6 +242,7 @@ CREATE OR REPLACE FUNCTION activity.sp_community_update(
 ) AS $$
 DECLARE
     v_updated_at TIMESTAMP WITH TIME ZONE;
+    v_old_tags TEXT[];
 BEGIN
     -- 1. Validate community exists and status='active'
     IF NOT EXISTS (
@@ -243,11 +282,25 @@ BEGIN
 
     -- 4. Handle tags if provided
     IF p_tags IS NOT NULL THEN
+        SELECT COALESCE(ARRAY_AGG(ct.tag::TEXT), ARRAY[]::TEXT[]) INTO v_old_tags
+        FROM activity.community_tags ct
+        WHERE ct.community_id = p_community_id;
+
         DELETE FROM activity.community_tags WHERE community_tags.community_id = p_community_id;
         IF array_length(p_tags, 1) > 0 THEN
             INSERT INTO activity.community_tags (community_id, tag)
             SELECT p_community_id, unnest(p_tags);
         END IF;
+
+        -- Keep in-memory tag indexes current (delivered on commit)
+        IF NOT (v_old_tags @> p_tags AND p_tags @> v_old_tags) THEN
+            PERFORM pg_notify('community_events', json_build_object(
+                'type', 'tags_changed',
+                'community_id', p_community_id,
+                'added', ARRAY(SELECT unnest(p_tags) EXCEPT SELECT unnest(v_old_tags)),
+                'removed', ARRAY(SELECT unnest(v_old_tags) EXCEPT SELECT unnest(p_tags))
+            )::TEXT);
+        END IF;
     END IF;
 
     -- 5. Return updated details
@@ -258,6 +311,10 @@ $$ LANGUAGE plpgsql;
 
 -- SP4: Join Community
 -- Purpose: Join an open community
+-- Note: One statement on the happy path: the membership insert (ON CONFLICT DO NOTHING), the
+--       member_count increment and the outbox event. The increment re-checks max_members on the
+--       locked community row, so concurrent joins cannot overfill it. Only a failed join re-reads
+--       state to raise the same error, in the same order, as the checks it replaces
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_join(
     p_community_id UUID,
@@ -275,63 +332,70 @@ DECLARE
     v_max_members INT;
     v_status activity.community_status;
     v_joined_at TIMESTAMP WITH TIME ZONE;
+    v_inserted BOOLEAN;
+    v_counted BOOLEAN;
 BEGIN
-    -- 1. Validate community exists and get details
-    SELECT c.community_type, c.member_count, c.max_members, c.status
-    INTO v_community_type, v_member_count, v_max_members, v_status
-    FROM activity.communities c
-    WHERE c.community_id = p_community_id;
-
-    IF NOT FOUND THEN
-        RAISE EXCEPTION 'COMMUNITY_NOT_FOUND';
-    END IF;
+    -- 1. Insert membership, take a seat, enqueue the event
+    v_joined_at := NOW();
+    WITH inserted AS (
+        INSERT INTO activity.community_members (community_id, user_id, role, status, joined_at)
+        SELECT c.community_id, p_user_id, 'member', 'active', v_joined_at
+        FROM activity.communities c
+        WHERE c.community_id = p_community_id
+        AND c.status = 'active'
+        AND c.community_type = 'open'
+        AND (c.max_members IS NULL OR c.member_count < c.max_members)
+        ON CONFLICT ON CONSTRAINT community_members_pkey DO NOTHING
+        RETURNING community_members.user_id
+    ),
+    counted AS (
+        UPDATE activity.communities c
+        SET member_count = c.member_count + 1
+        FROM inserted i
+        WHERE c.community_id = p_community_id
+        AND (c.max_members IS NULL OR c.member_count < c.max_members)
+        RETURNING c.community_id
+    ),
+    outboxed AS (
+        INSERT INTO activity.community_outbox (event_type, aggregate_id, payload)
+        SELECT 'member_joined', p_community_id, jsonb_build_object(
+            'community_id', p_community_id,
+            'user_id', p_user_id,
+            'joined_at', v_joined_at
+        )
+        FROM counted
+    )
+    SELECT EXISTS (SELECT 1 FROM inserted), EXISTS (SELECT 1 FROM counted)
+    INTO v_inserted, v_counted;
+
+    -- 2. Not joined (or the last seat went to a concurrent join): report why
+    --    Raising rolls back a membership inserted without a seat
+    IF NOT v_counted THEN
+        SELECT c.community_type, c.member_count, c.max_members, c.status
+        INTO v_community_type, v_member_count, v_max_members, v_status
+        FROM activity.communities c
+        WHERE c.community_id = p_community_id;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'COMMUNITY_NOT_FOUND';
+        END IF;
 
-    -- Check community is active
-    IF v_status != 'active' THEN
-        RAISE EXCEPTION 'COMMUNITY_NOT_ACTIVE';
-    END IF;
+        IF v_status != 'active' THEN
+            RAISE EXCEPTION 'COMMUNITY_NOT_ACTIVE';
+        END IF;
 
-    -- Check community is open type
-    IF v_community_type != 'open' THEN
-        RAISE EXCEPTION 'COMMUNITY_NOT_OPEN';
-    END IF;
+        IF v_community_type != 'open' THEN
+            RAISE EXCEPTION 'COMMUNITY_NOT_OPEN';
+        END IF;
 
-    -- 2. Check if max_members reached
-    IF v_max_members IS NOT NULL AND v_member_count >= v_max_members THEN
-        RAISE EXCEPTION 'COMMUNITY_FULL';
-    END IF;
+        IF v_max_members IS NOT NULL AND (v_member_count >= v_max_members OR v_inserted) THEN
+            RAISE EXCEPTION 'COMMUNITY_FULL';
+        END IF;
 
-    -- 3. Check user not already member
-    IF EXISTS (
-        SELECT 1 FROM activity.community_members
-        WHERE community_members.community_id = p_community_id
-        AND community_members.user_id = p_user_id
-    ) THEN
         RAISE EXCEPTION 'ALREADY_MEMBER';
     END IF;
 
-    -- 4. Insert membership
-    v_joined_at := NOW();
-    INSERT INTO activity.community_members (
-        community_id,
-        user_id,
-        role,
-        status,
-        joined_at
-    ) VALUES (
-        p_community_id,
-        p_user_id,
-        'member',
-        'active',
-        v_joined_at
-    );
-
-    -- 5. Update member count
-    UPDATE activity.communities
-    SET member_count = member_count + 1
-    WHERE communities.community_id = p_community_id;
-
-    -- 6. Return membership details
+    -- 3. Return membership details
     RETURN QUERY
     SELECT p_community_id, p_user_id, 'member'::activity.participant_role, 'active'::activity.membership_status, v_joined_at;
 END;
@@ -339,6 +403,8 @@ $$ LANGUAGE plpgsql;
 
 -- SP5: Leave Community
 -- Purpose: Leave a community (cannot leave if organizer)
+-- Note: One statement on the happy path (membership update, member_count decrement, outbox
+--       event). A concurrent second leave waits on the membership row and then finds it inactive
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_leave(
     p_community_id UUID,
@@ -352,72 +418,113 @@ DECLARE
     v_role activity.participant_role;
     v_status activity.membership_status;
     v_left_at TIMESTAMP WITH TIME ZONE;
+    v_left BOOLEAN;
 BEGIN
-    -- 1. Get membership details
-    SELECT cm.role, cm.status
-    INTO v_role, v_status
-    FROM activity.community_members cm
-    WHERE cm.community_id = p_community_id
-    AND cm.user_id = p_user_id;
+    -- 1. Mark membership left, release the seat, enqueue the event
+    v_left_at := NOW();
+    WITH left_member AS (
+        UPDATE activity.community_members cm
+        SET status = 'left', left_at = v_left_at
+        WHERE cm.community_id = p_community_id
+        AND cm.user_id = p_user_id
+        AND cm.status = 'active'
+        AND cm.role != 'organizer'
+        RETURNING cm.community_id
+    ),
+    counted AS (
+        UPDATE activity.communities c
+        SET member_count = c.member_count - 1
+        FROM left_member lm
+        WHERE c.community_id = lm.community_id
+    ),
+    outboxed AS (
+        INSERT INTO activity.community_outbox (event_type, aggregate_id, payload)
+        SELECT 'member_left', p_community_id, jsonb_build_object(
+            'community_id', p_community_id,
+            'user_id', p_user_id,
+            'left_at', v_left_at
+        )
+        FROM left_member
+    )
+    SELECT EXISTS (SELECT 1 FROM left_member) INTO v_left;
 
-    IF NOT FOUND THEN
-        RAISE EXCEPTION 'NOT_MEMBER';
-    END IF;
+    -- 2. Nothing updated: report why
+    IF NOT v_left THEN
+        SELECT cm.role, cm.status
+        INTO v_role, v_status
+        FROM activity.community_members cm
+        WHERE cm.community_id = p_community_id
+        AND cm.user_id = p_user_id;
 
-    -- Check if already left
-    IF v_status != 'active' THEN
-        RAISE EXCEPTION 'NOT_MEMBER';
-    END IF;
+        IF NOT FOUND OR v_status != 'active' THEN
+            RAISE EXCEPTION 'NOT_MEMBER';
+        END IF;
 
-    -- 2. Check user is NOT organizer
-    IF v_role = 'organizer' THEN
         RAISE EXCEPTION 'ORGANIZER_CANNOT_LEAVE';
     END IF;
 
-    -- 3. Update membership status
-    v_left_at := NOW();
-    UPDATE activity.community_members
-    SET status = 'left', left_at = v_left_at
-    WHERE community_members.community_id = p_community_id
-    AND community_members.user_id = p_user_id;
-
-    -- 4. Update member count
-    UPDATE activity.communities
-    SET member_count = member_count - 1
-    WHERE communities.community_id = p_community_id;
-
-    -- 5. Return confirmation
+    -- 3. Return confirmation
     RETURN QUERY
     SELECT p_community_id, p_user_id, v_left_at;
 END;
 $$ LANGUAGE plpgsql;
 
 -- SP6: Get Community Members
--- Purpose: Get paginated list of community members
+-- Purpose: Get paginated list of community members (optionally by role and/or name search)
+-- Note: Returns user IDs only; profiles are hydrated by the API (sp_community_get_user_snippets).
+--       Ordered by (role, joined_at, user_id): participant_role is declared in priority order
+--       (organizer, co_organizer, member), so the enum itself is the role priority.
+--       idx_community_members_listing covers the whole listing (index-only scan);
+--       pass the last row's role/joined_at/user_id as p_after_* to continue (keyset).
+--       p_search (3+ characters, the pg_trgm minimum) matches username / first / last name by
+--       substring; searches are driven by the trigram index on users, joined to members on
+--       the primary key, instead of testing every member.
+--       The page query is built per call (search, role, cursor) and run with EXECUTE, so the
+--       role and cursor stay index conditions instead of OR-guarded filters in a cached
+--       generic plan. Keyset pages skip the count (the first page reported it)
 -- =============================================================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_community_members_listing
+    ON activity.community_members(community_id, role, joined_at, user_id)
+    WHERE status = 'active';
+
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm
+    ON activity.users USING gin (
+        (username || ' ' || COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')) gin_trgm_ops
+    );
+
+DROP FUNCTION IF EXISTS activity.sp_community_get_members(UUID, UUID, INT, INT);
+DROP FUNCTION IF EXISTS activity.sp_community_get_members(UUID, UUID, INT, INT, VARCHAR, INT);
 CREATE OR REPLACE FUNCTION activity.sp_community_get_members(
     p_community_id UUID,
     p_requesting_user_id UUID,
     p_limit INT DEFAULT 50,
-    p_offset INT DEFAULT 0
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000,
+    p_role activity.participant_role DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_after_role activity.participant_role DEFAULT NULL,
+    p_after_joined_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_after_user_id UUID DEFAULT NULL
 ) RETURNS TABLE(
     user_id UUID,
-    username VARCHAR(100),
-    first_name VARCHAR(100),
-    last_name VARCHAR(100),
-    main_photo_url VARCHAR(500),
     role activity.participant_role,
     status activity.membership_status,
     joined_at TIMESTAMP WITH TIME ZONE,
-    is_verified BOOLEAN,
     total_count BIGINT
 ) AS $$
 DECLARE
     v_community_type activity.community_type;
+    v_member_count INT;
     v_is_member BOOLEAN;
+    v_total_count BIGINT;
+    v_pattern TEXT;
+    v_sql TEXT;
 BEGIN
     -- 1. Validate community exists
-    SELECT c.community_type INTO v_community_type
+    SELECT c.community_type, c.member_count INTO v_community_type, v_member_count
     FROM activity.communities c
     WHERE c.community_id = p_community_id;
 
@@ -437,45 +544,99 @@ BEGIN
         RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
     END IF;
 
-    -- 3. Return members
-    RETURN QUERY
-    SELECT
-        u.user_id,
-        u.username,
-        u.first_name,
-        u.last_name,
-        u.main_photo_url,
-        cm.role,
-        cm.status,
-        cm.joined_at,
-        u.is_verified,
-        COUNT(*) OVER() as total_count
-    FROM activity.community_members cm
-    JOIN activity.users u ON cm.user_id = u.user_id
-    WHERE cm.community_id = p_community_id
-    AND cm.status = 'active'
-    ORDER BY
-        CASE cm.role
-            WHEN 'organizer' THEN 1
-            WHEN 'co_organizer' THEN 2
-            ELSE 3
-        END,
-        cm.joined_at ASC
-    LIMIT p_limit
-    OFFSET p_offset;
+    -- Substring pattern with LIKE wildcards in the search text escaped
+    IF p_search IS NOT NULL THEN
+        v_pattern := '%' || replace(replace(replace(p_search, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+    END IF;
+
+    -- 3. Count according to p_count_mode (estimate = maintained member_count when unfiltered)
+    IF p_after_joined_at IS NOT NULL THEN
+        v_total_count := NULL;
+    ELSIF p_count_mode = 'estimate' AND p_role IS NULL AND v_pattern IS NULL THEN
+        v_total_count := v_member_count;
+    ELSIF p_count_mode = 'estimate' THEN
+        v_total_count := activity.fn_estimate_count(format(
+            $q$SELECT 1 FROM activity.community_members cm
+            JOIN activity.users u ON u.user_id = cm.user_id
+            WHERE cm.community_id = %1$L AND cm.status = 'active'
+            AND (%2$L::activity.participant_role IS NULL OR cm.role = %2$L)
+            AND (%3$L::TEXT IS NULL
+                 OR (u.username || ' ' || COALESCE(u.first_name, '') || ' ' || COALESCE(u.last_name, '')) ILIKE %3$L)$q$,
+            p_community_id, p_role, v_pattern
+        ));
+    ELSIF p_count_mode IN ('exact', 'capped') AND v_pattern IS NULL THEN
+        SELECT COUNT(*) INTO v_total_count FROM (
+            SELECT 1 FROM activity.community_members cm
+            WHERE cm.community_id = p_community_id
+            AND cm.status = 'active'
+            AND (p_role IS NULL OR cm.role = p_role)
+            LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+        ) matched;
+    ELSIF p_count_mode IN ('exact', 'capped') THEN
+        SELECT COUNT(*) INTO v_total_count FROM (
+            SELECT 1 FROM activity.users u
+            JOIN activity.community_members cm
+                ON cm.community_id = p_community_id AND cm.user_id = u.user_id
+            WHERE (u.username || ' ' || COALESCE(u.first_name, '') || ' ' || COALESCE(u.last_name, '')) ILIKE v_pattern
+            AND cm.status = 'active'
+            AND (p_role IS NULL OR cm.role = p_role)
+            LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+        ) matched;
+    END IF;
+
+    -- 4. Return members (listing index, or trigram matches joined to members)
+    v_sql := $q$
+        SELECT
+            cm.user_id,
+            cm.role,
+            cm.status,
+            cm.joined_at,
+            $9 as total_count
+    $q$;
+
+    IF v_pattern IS NULL THEN
+        v_sql := v_sql || $q$
+        FROM activity.community_members cm
+        WHERE cm.community_id = $1
+        AND cm.status = 'active'
+        $q$;
+    ELSE
+        v_sql := v_sql || $q$
+        FROM activity.users u
+        JOIN activity.community_members cm
+            ON cm.community_id = $1 AND cm.user_id = u.user_id
+        WHERE (u.username || ' ' || COALESCE(u.first_name, '') || ' ' || COALESCE(u.last_name, '')) ILIKE $3
+        AND cm.status = 'active'
+        $q$;
+    END IF;
+
+    IF p_role IS NOT NULL THEN
+        v_sql := v_sql || ' AND cm.role = $2';
+    END IF;
+
+    IF p_after_joined_at IS NOT NULL THEN
+        v_sql := v_sql || ' AND (cm.role, cm.joined_at, cm.user_id) > ($4, $5, $6)';
+    END IF;
+
+    RETURN QUERY EXECUTE v_sql || ' ORDER BY cm.role, cm.joined_at, cm.user_id LIMIT $7 OFFSET $8'
+    USING p_community_id, p_role, v_pattern, p_after_role, p_after_joined_at, p_after_user_id,
+          p_limit, p_offset, v_total_count;
 END;
 $$ LANGUAGE plpgsql;
 
 -- SP7: Search Communities
 -- Purpose: Search communities with filters
 -- =============================================================================
+DROP FUNCTION IF EXISTS activity.sp_community_search(TEXT, UUID, TEXT[], UUID, INT, INT);
 CREATE OR REPLACE FUNCTION activity.sp_community_search(
     p_search_text TEXT,
     p_organization_id UUID,
     p_tags TEXT[],
     p_requesting_user_id UUID,
     p_limit INT DEFAULT 20,
-    p_offset INT DEFAULT 0
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000
 ) RETURNS TABLE(
     community_id UUID,
     organization_id UUID,
@@ -493,7 +654,41 @@ CREATE OR REPLACE FUNCTION activity.sp_community_search(
     tags TEXT[],
     total_count BIGINT
 ) AS $$
+DECLARE
+    v_total_count BIGINT;
 BEGIN
+    -- 1. Count according to p_count_mode
+    IF p_count_mode = 'estimate' THEN
+        v_total_count := activity.fn_estimate_count(format(
+            $q$SELECT 1 FROM activity.communities c
+            WHERE c.status = 'active'
+            AND (%1$L::TEXT IS NULL OR c.name ILIKE '%%' || %1$L || '%%' OR c.description ILIKE '%%' || %1$L || '%%')
+            AND (%2$L::UUID IS NULL OR c.organization_id = %2$L)
+            AND (%3$L::TEXT[] IS NULL OR EXISTS (
+                SELECT 1 FROM activity.community_tags ct2
+                WHERE ct2.community_id = c.community_id AND ct2.tag = ANY(%3$L::TEXT[])
+            ))$q$,
+            p_search_text, p_organization_id, p_tags
+        ));
+    ELSIF p_count_mode IN ('exact', 'capped') THEN
+        SELECT COUNT(*) INTO v_total_count FROM (
+            SELECT 1 FROM activity.communities c
+            WHERE c.status = 'active'
+                AND (p_search_text IS NULL OR (
+                    c.name ILIKE '%' || p_search_text || '%' OR
+                    c.description ILIKE '%' || p_search_text || '%'
+                ))
+                AND (p_organization_id IS NULL OR c.organization_id = p_organization_id)
+                AND (p_tags IS NULL OR EXISTS (
+                    SELECT 1 FROM activity.community_tags ct2
+                    WHERE ct2.community_id = c.community_id
+                    AND ct2.tag = ANY(p_tags)
+                ))
+            LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+        ) matched;
+    END IF;
+
+    -- 2. Return page
     RETURN QUERY
     SELECT
         c.community_id,
@@ -510,7 +705,7 @@ BEGIN
         c.created_at,
         CASE WHEN cm.user_id IS NOT NULL THEN TRUE ELSE FALSE END as is_member,
         COALESCE(ARRAY_AGG(ct.tag::TEXT) FILTER (WHERE ct.tag IS NOT NULL), ARRAY[]::TEXT[]) as tags,
-        COUNT(*) OVER() as total_count
+        v_total_count as total_count
     FROM activity.communities c
     LEFT JOIN activity.community_members cm
         ON c.community_id = cm.community_id
@@ -619,7 +814,31 @@ BEGIN
         v_created_at
     ) RETURNING posts.post_id INTO v_post_id;
 
-    -- 5. Return post details
+    -- 5. Invalidate conditional-GET validators for the feed
+    PERFORM activity.fn_bump_content_version('feed', p_community_id);
+
+    -- 6. Notify realtime subscribers (delivered on commit)
+    PERFORM pg_notify('community_events', json_build_object(
+        'type', 'post_created',
+        'community_id', p_community_id,
+        'post_id', v_post_id,
+        'author_user_id', p_author_user_id,
+        'content_type', p_content_type,
+        'created_at', v_created_at
+    )::TEXT);
+
+    -- 7. Outbox event (relayed after commit)
+    PERFORM activity.fn_enqueue_event('post_created', v_post_id, jsonb_build_object(
+        'community_id', p_community_id,
+        'post_id', v_post_id,
+        'author_user_id', p_author_user_id,
+        'activity_id', p_activity_id,
+        'title', p_title,
+        'content_type', p_content_type,
+        'created_at', v_created_at
+    ));
+
+    -- 8. Return post details
     RETURN QUERY
     SELECT v_post_id, p_community_id, p_author_user_id, v_created_at, 'published'::activity.content_status;
 END;
@@ -639,12 +858,14 @@ CREATE OR REPLACE FUNCTION activity.sp_community_post_update(
 ) AS $$
 DECLARE
     v_author_user_id UUID;
+    v_community_id UUID;
     v_status activity.content_status;
+    v_is_pinned BOOLEAN;
     v_updated_at TIMESTAMP WITH TIME ZONE;
 BEGIN
     -- 1. Get post details
-    SELECT p.author_user_id, p.status
-    INTO v_author_user_id, v_status
+    SELECT p.author_user_id, p.status, p.is_pinned
+    INTO v_author_user_id, v_status, v_is_pinned
     FROM activity.posts p
     WHERE p.post_id = p_post_id;
 
@@ -669,7 +890,13 @@ BEGIN
         title = COALESCE(p_title, title),
         content = COALESCE(p_content, content),
         updated_at = v_updated_at
-    WHERE posts.post_id = p_post_id;
+    WHERE posts.post_id = p_post_id
+    RETURNING posts.community_id INTO v_community_id;
+
+    PERFORM activity.fn_bump_content_version('feed', v_community_id);
+    IF v_is_pinned THEN
+        PERFORM activity.fn_notify_pinned_changed(v_community_id);
+    END IF;
 
     -- 4. Return updated details
     RETURN QUERY
@@ -692,10 +919,11 @@ DECLARE
     v_community_id UUID;
     v_deleted_at TIMESTAMP WITH TIME ZONE;
     v_is_organizer BOOLEAN;
+    v_is_pinned BOOLEAN;
 BEGIN
     -- 1. Get post details
-    SELECT p.author_user_id, p.community_id
-    INTO v_author_user_id, v_community_id
+    SELECT p.author_user_id, p.community_id, p.is_pinned
+    INTO v_author_user_id, v_community_id, v_is_pinned
     FROM activity.posts p
     WHERE p.post_id = p_post_id;
 
@@ -722,6 +950,11 @@ BEGIN
     SET status = 'removed', updated_at = v_deleted_at
     WHERE posts.post_id = p_post_id;
 
+    PERFORM activity.fn_bump_content_version('feed', v_community_id);
+    IF v_is_pinned THEN
+        PERFORM activity.fn_notify_pinned_changed(v_community_id);
+    END IF;
+
     -- 4. Return confirmation
     RETURN QUERY
     SELECT p_post_id, v_deleted_at;
@@ -730,18 +963,21 @@ $$ LANGUAGE plpgsql;
 
 -- SP11: Get Community Post Feed
 -- Purpose: Get paginated post feed for a community
+-- Note: Returns author IDs only; profiles are hydrated by the API (sp_community_get_user_snippets)
+--       Pinned posts are excluded (served by sp_community_post_get_pinned), so pages are read
+--       in idx_posts_community order with no sort
 -- =============================================================================
+DROP FUNCTION IF EXISTS activity.sp_community_post_get_feed(UUID, UUID, INT, INT);
 CREATE OR REPLACE FUNCTION activity.sp_community_post_get_feed(
     p_community_id UUID,
     p_requesting_user_id UUID,
     p_limit INT DEFAULT 20,
-    p_offset INT DEFAULT 0
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000
 ) RETURNS TABLE(
     post_id UUID,
     author_user_id UUID,
-    author_username VARCHAR(100),
-    author_first_name VARCHAR(100),
-    author_main_photo_url VARCHAR(500),
     activity_id UUID,
     title VARCHAR(500),
     content TEXT,
@@ -757,6 +993,7 @@ CREATE OR REPLACE FUNCTION activity.sp_community_post_get_feed(
 DECLARE
     v_community_type activity.community_type;
     v_is_member BOOLEAN;
+    v_total_count BIGINT;
 BEGIN
     -- 1. Validate community exists
     SELECT c.community_type INTO v_community_type
@@ -779,14 +1016,27 @@ BEGIN
         RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
     END IF;
 
-    -- 3. Return post feed
+    -- 3. Count according to p_count_mode
+    IF p_count_mode = 'estimate' THEN
+        v_total_count := activity.fn_estimate_count(format(
+            $q$SELECT 1 FROM activity.posts p WHERE p.community_id = %L AND p.status = 'published' AND NOT p.is_pinned$q$,
+            p_community_id
+        ));
+    ELSIF p_count_mode IN ('exact', 'capped') THEN
+        SELECT COUNT(*) INTO v_total_count FROM (
+            SELECT 1 FROM activity.posts p
+            WHERE p.community_id = p_community_id
+            AND p.status = 'published'
+            AND NOT p.is_pinned
+            LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+        ) matched;
+    END IF;
+
+    -- 4. Return post feed
     RETURN QUERY
     SELECT
         p.post_id,
         p.author_user_id,
-        u.username,
-        u.first_name,
-        u.main_photo_url,
         p.activity_id,
         p.title,
         p.content,
@@ -797,12 +1047,12 @@ BEGIN
         p.is_pinned,
         p.created_at,
         p.updated_at,
-        COUNT(*) OVER() as total_count
+        v_total_count as total_count
     FROM activity.posts p
-    JOIN activity.users u ON p.author_user_id = u.user_id
     WHERE p.community_id = p_community_id
     AND p.status = 'published'
-    ORDER BY p.is_pinned DESC, p.created_at DESC
+    AND NOT p.is_pinned
+    ORDER BY p.created_at DESC
     LIMIT p_limit
     OFFSET p_offset;
 END;
@@ -810,6 +1060,9 @@ $$ LANGUAGE plpgsql;
 
 -- SP12: Create Comment
 -- Purpose: Create a comment on a post
+-- Note: One statement on the happy path: the checks are the insert's WHERE clause, and the
+--       comment_count increment, version bumps and outbox event ride along as CTEs. Only a
+--       rejected insert re-reads state to raise the same error, in the same order, as before
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_comment_create(
     p_post_id UUID,
@@ -829,68 +1082,106 @@ DECLARE
     v_community_id UUID;
     v_post_status activity.content_status;
 BEGIN
-    -- 1. Validate post exists and get details
-    SELECT p.community_id, p.status
-    INTO v_community_id, v_post_status
-    FROM activity.posts p
-    WHERE p.post_id = p_post_id;
-
-    IF NOT FOUND THEN
-        RAISE EXCEPTION 'POST_NOT_FOUND';
-    END IF;
-
-    IF v_post_status != 'published' THEN
-        RAISE EXCEPTION 'POST_NOT_PUBLISHED';
-    END IF;
-
-    -- 2. Check user is active member
-    IF NOT EXISTS (
-        SELECT 1 FROM activity.community_members cm
-        WHERE cm.community_id = v_community_id
-        AND cm.user_id = p_author_user_id
-        AND cm.status = 'active'
-    ) THEN
-        RAISE EXCEPTION 'NOT_MEMBER';
-    END IF;
-
-    -- 3. If parent comment provided, validate it
-    IF p_parent_comment_id IS NOT NULL THEN
-        IF NOT EXISTS (
+    -- 1. Insert comment (post published, author active member, parent on the same post)
+    v_created_at := NOW();
+    WITH inserted AS (
+        INSERT INTO activity.comments (
+            post_id,
+            parent_comment_id,
+            author_user_id,
+            content,
+            is_deleted,
+            reaction_count,
+            created_at
+        )
+        SELECT p.post_id, p_parent_comment_id, p_author_user_id, p_content, FALSE, 0, v_created_at
+        FROM activity.posts p
+        WHERE p.post_id = p_post_id
+        AND p.status = 'published'
+        AND EXISTS (
+            SELECT 1 FROM activity.community_members cm
+            WHERE cm.community_id = p.community_id
+            AND cm.user_id = p_author_user_id
+            AND cm.status = 'active'
+        )
+        AND (p_parent_comment_id IS NULL OR EXISTS (
             SELECT 1 FROM activity.comments c
             WHERE c.comment_id = p_parent_comment_id
             AND c.post_id = p_post_id
             AND c.is_deleted = FALSE
-        ) THEN
-            RAISE EXCEPTION 'PARENT_COMMENT_NOT_FOUND';
+        ))
+        RETURNING comments.comment_id
+    ),
+    counted AS (
+        UPDATE activity.posts p
+        SET comment_count = p.comment_count + 1
+        FROM inserted i
+        WHERE p.post_id = p_post_id
+        RETURNING p.community_id
+    ),
+    bumped AS (
+        INSERT INTO activity.content_versions AS cv (scope, scope_id, version)
+        SELECT v.scope, v.scope_id, 1
+        FROM counted ct
+        CROSS JOIN LATERAL (VALUES ('feed', ct.community_id), ('comments', p_post_id)) v(scope, scope_id)
+        ON CONFLICT (scope, scope_id)
+        DO UPDATE SET version = cv.version + 1
+    ),
+    outboxed AS (
+        INSERT INTO activity.community_outbox (event_type, aggregate_id, payload)
+        SELECT 'comment_created', i.comment_id, jsonb_build_object(
+            'community_id', ct.community_id,
+            'post_id', p_post_id,
+            'comment_id', i.comment_id,
+            'parent_comment_id', p_parent_comment_id,
+            'author_user_id', p_author_user_id,
+            'created_at', v_created_at
+        )
+        FROM inserted i, counted ct
+    )
+    SELECT i.comment_id, ct.community_id
+    INTO v_comment_id, v_community_id
+    FROM inserted i, counted ct;
+
+    -- 2. Rejected: report the first failing check
+    IF v_comment_id IS NULL THEN
+        SELECT p.community_id, p.status
+        INTO v_community_id, v_post_status
+        FROM activity.posts p
+        WHERE p.post_id = p_post_id;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'POST_NOT_FOUND';
         END IF;
-    END IF;
 
-    -- 4. Insert comment
-    v_created_at := NOW();
-    INSERT INTO activity.comments (
-        post_id,
-        parent_comment_id,
-        author_user_id,
-        content,
-        is_deleted,
-        reaction_count,
-        created_at
-    ) VALUES (
-        p_post_id,
-        p_parent_comment_id,
-        p_author_user_id,
-        p_content,
-        FALSE,
-        0,
-        v_created_at
-    ) RETURNING comments.comment_id INTO v_comment_id;
+        IF v_post_status != 'published' THEN
+            RAISE EXCEPTION 'POST_NOT_PUBLISHED';
+        END IF;
 
-    -- 5. Update post comment count
-    UPDATE activity.posts
-    SET comment_count = comment_count + 1
-    WHERE posts.post_id = p_post_id;
+        IF NOT EXISTS (
+            SELECT 1 FROM activity.community_members cm
+            WHERE cm.community_id = v_community_id
+            AND cm.user_id = p_author_user_id
+            AND cm.status = 'active'
+        ) THEN
+            RAISE EXCEPTION 'NOT_MEMBER';
+        END IF;
+
+        RAISE EXCEPTION 'PARENT_COMMENT_NOT_FOUND';
+    END IF;
 
-    -- 6. Return comment details
+    -- 3. Notify realtime subscribers (delivered on commit)
+    PERFORM pg_notify('community_events', json_build_object(
+        'type', 'comment_created',
+        'community_id', v_community_id,
+        'post_id', p_post_id,
+        'comment_id', v_comment_id,
+        'parent_comment_id', p_parent_comment_id,
+        'author_user_id', p_author_user_id,
+        'created_at', v_created_at
+    )::TEXT);
+
+    -- 4. Return comment details
     RETURN QUERY
     SELECT v_comment_id, p_post_id, p_parent_comment_id, p_author_user_id, v_created_at;
 END;
@@ -909,6 +1200,7 @@ CREATE OR REPLACE FUNCTION activity.sp_community_comment_update(
 ) AS $$
 DECLARE
     v_author_user_id UUID;
+    v_post_id UUID;
     v_is_deleted BOOLEAN;
     v_updated_at TIMESTAMP WITH TIME ZONE;
 BEGIN
@@ -935,7 +1227,10 @@ BEGIN
     v_updated_at := NOW();
     UPDATE activity.comments
     SET content = p_content, updated_at = v_updated_at
-    WHERE comments.comment_id = p_comment_id;
+    WHERE comments.comment_id = p_comment_id
+    RETURNING comments.post_id INTO v_post_id;
+
+    PERFORM activity.fn_bump_content_version('comments', v_post_id);
 
     -- 4. Return updated details
     RETURN QUERY
@@ -945,6 +1240,9 @@ $$ LANGUAGE plpgsql;
 
 -- SP14: Delete Comment
 -- Purpose: Delete own comment (soft delete)
+-- Note: One statement on the happy path (soft delete with the permission check in its WHERE,
+--       comment_count decrement, version bumps). Deleting an already deleted comment still
+--       succeeds, returning its original deletion time, and no longer decrements comment_count
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_comment_delete(
     p_comment_id UUID,
@@ -955,71 +1253,107 @@ CREATE OR REPLACE FUNCTION activity.sp_community_comment_delete(
 ) AS $$
 DECLARE
     v_author_user_id UUID;
-    v_post_id UUID;
     v_community_id UUID;
+    v_is_deleted BOOLEAN;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
     v_deleted_at TIMESTAMP WITH TIME ZONE;
-    v_is_organizer BOOLEAN;
+    v_deleted BOOLEAN;
 BEGIN
-    -- 1. Get comment details
-    SELECT c.author_user_id, c.post_id
-    INTO v_author_user_id, v_post_id
-    FROM activity.comments c
-    WHERE c.comment_id = p_comment_id;
-
-    IF NOT FOUND THEN
-        RAISE EXCEPTION 'COMMENT_NOT_FOUND';
-    END IF;
-
-    -- Get community_id from post
-    SELECT p.community_id INTO v_community_id
-    FROM activity.posts p
-    WHERE p.post_id = v_post_id;
+    -- 1. Soft delete (author or community organizer), adjust count, bump versions
+    v_deleted_at := NOW();
+    WITH deleted AS (
+        UPDATE activity.comments c
+        SET is_deleted = TRUE, updated_at = v_deleted_at
+        FROM activity.posts p
+        WHERE c.comment_id = p_comment_id
+        AND p.post_id = c.post_id
+        AND NOT c.is_deleted
+        AND (
+            c.author_user_id = p_deleting_user_id
+            OR EXISTS (
+                SELECT 1 FROM activity.community_members cm
+                WHERE cm.community_id = p.community_id
+                AND cm.user_id = p_deleting_user_id
+                AND cm.role = 'organizer'
+                AND cm.status = 'active'
+            )
+        )
+        RETURNING c.post_id, p.community_id
+    ),
+    counted AS (
+        UPDATE activity.posts p
+        SET comment_count = p.comment_count - 1
+        FROM deleted d
+        WHERE p.post_id = d.post_id
+    ),
+    bumped AS (
+        INSERT INTO activity.content_versions AS cv (scope, scope_id, version)
+        SELECT v.scope, v.scope_id, 1
+        FROM deleted d
+        CROSS JOIN LATERAL (VALUES ('feed', d.community_id), ('comments', d.post_id)) v(scope, scope_id)
+        ON CONFLICT (scope, scope_id)
+        DO UPDATE SET version = cv.version + 1
+    )
+    SELECT EXISTS (SELECT 1 FROM deleted) INTO v_deleted;
+
+    -- 2. Nothing deleted: report why (or confirm an earlier delete)
+    IF NOT v_deleted THEN
+        SELECT c.author_user_id, p.community_id, c.is_deleted, c.updated_at
+        INTO v_author_user_id, v_community_id, v_is_deleted, v_updated_at
+        FROM activity.comments c
+        JOIN activity.posts p ON p.post_id = c.post_id
+        WHERE c.comment_id = p_comment_id;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'COMMENT_NOT_FOUND';
+        END IF;
 
-    -- 2. Check if user is author or community organizer
-    v_is_organizer := EXISTS (
-        SELECT 1 FROM activity.community_members cm
-        WHERE cm.community_id = v_community_id
-        AND cm.user_id = p_deleting_user_id
-        AND cm.role = 'organizer'
-        AND cm.status = 'active'
-    );
+        IF v_author_user_id != p_deleting_user_id AND NOT EXISTS (
+            SELECT 1 FROM activity.community_members cm
+            WHERE cm.community_id = v_community_id
+            AND cm.user_id = p_deleting_user_id
+            AND cm.role = 'organizer'
+            AND cm.status = 'active'
+        ) THEN
+            RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+        END IF;
 
-    IF v_author_user_id != p_deleting_user_id AND NOT v_is_organizer THEN
-        RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+        v_deleted_at := v_updated_at;
     END IF;
 
-    -- 3. Soft delete comment
-    v_deleted_at := NOW();
-    UPDATE activity.comments
-    SET is_deleted = TRUE, updated_at = v_deleted_at
-    WHERE comments.comment_id = p_comment_id;
-
-    -- 4. Update post comment count
-    UPDATE activity.posts
-    SET comment_count = comment_count - 1
-    WHERE posts.post_id = v_post_id;
-
-    -- 5. Return confirmation
+    -- 3. Return confirmation
     RETURN QUERY
     SELECT p_comment_id, v_deleted_at;
 END;
 $$ LANGUAGE plpgsql;
 
 -- SP15: Get Post Comments
--- Purpose: Get paginated comments for a post (threaded)
+-- Purpose: Get paginated comments for a post (one thread level: root comments or replies to one comment)
+-- Note: Returns author IDs only; profiles are hydrated by the API (sp_community_get_user_snippets).
+--       Pass the last row's created_at/comment_id as p_after_* to continue (keyset); p_offset is
+--       kept for old clients. The page query is built per call (thread level, cursor or not) and
+--       run with EXECUTE, so it is always planned with the actual values: a cached generic plan
+--       would lose the row comparison as an index condition on idx_comments_post_parent and
+--       walk the level from the start. Keyset pages skip the count (the first page reported it)
 -- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_comments_post_parent
+    ON activity.comments(post_id, parent_comment_id, created_at, comment_id);
+
+DROP FUNCTION IF EXISTS activity.sp_community_post_get_comments(UUID, UUID, INT, INT);
+DROP FUNCTION IF EXISTS activity.sp_community_post_get_comments(UUID, UUID, INT, INT, VARCHAR, INT);
 CREATE OR REPLACE FUNCTION activity.sp_community_post_get_comments(
     p_post_id UUID,
     p_parent_comment_id UUID,
     p_limit INT DEFAULT 50,
-    p_offset INT DEFAULT 0
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000,
+    p_after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_after_comment_id UUID DEFAULT NULL
 ) RETURNS TABLE(
     comment_id UUID,
     parent_comment_id UUID,
     author_user_id UUID,
-    author_username VARCHAR(100),
-    author_first_name VARCHAR(100),
-    author_main_photo_url VARCHAR(500),
     content TEXT,
     reaction_count INT,
     is_deleted BOOLEAN,
@@ -1027,42 +1361,89 @@ CREATE OR REPLACE FUNCTION activity.sp_community_post_get_comments(
     updated_at TIMESTAMP WITH TIME ZONE,
     total_count BIGINT
 ) AS $$
+DECLARE
+    v_total_count BIGINT;
+    v_sql TEXT;
 BEGIN
     -- 1. Validate post exists
     IF NOT EXISTS (SELECT 1 FROM activity.posts WHERE post_id = p_post_id) THEN
         RAISE EXCEPTION 'POST_NOT_FOUND';
     END IF;
 
-    -- 2. Return comments
-    RETURN QUERY
-    SELECT
-        c.comment_id,
-        c.parent_comment_id,
-        c.author_user_id,
-        u.username,
-        u.first_name,
-        u.main_photo_url,
-        CASE WHEN c.is_deleted THEN '[deleted]' ELSE c.content END as content,
-        c.reaction_count,
-        c.is_deleted,
-        c.created_at,
-        c.updated_at,
-        COUNT(*) OVER() as total_count
-    FROM activity.comments c
-    JOIN activity.users u ON c.author_user_id = u.user_id
-    WHERE c.post_id = p_post_id
-    AND (
-        (c.parent_comment_id = p_parent_comment_id) OR
-        (c.parent_comment_id IS NULL AND p_parent_comment_id IS NULL)
-    )
-    ORDER BY c.created_at ASC
-    LIMIT p_limit
-    OFFSET p_offset;
+    -- 2. Count according to p_count_mode (whole thread level, first page only)
+    IF p_after_created_at IS NOT NULL THEN
+        v_total_count := NULL;
+    ELSIF p_count_mode = 'estimate' THEN
+        IF p_parent_comment_id IS NULL THEN
+            v_total_count := activity.fn_estimate_count(format(
+                $q$SELECT 1 FROM activity.comments c
+                WHERE c.post_id = %L AND c.parent_comment_id IS NULL$q$,
+                p_post_id
+            ));
+        ELSE
+            v_total_count := activity.fn_estimate_count(format(
+                $q$SELECT 1 FROM activity.comments c
+                WHERE c.post_id = %L AND c.parent_comment_id = %L$q$,
+                p_post_id, p_parent_comment_id
+            ));
+        END IF;
+    ELSIF p_count_mode IN ('exact', 'capped') THEN
+        IF p_parent_comment_id IS NULL THEN
+            SELECT COUNT(*) INTO v_total_count FROM (
+                SELECT 1 FROM activity.comments c
+                WHERE c.post_id = p_post_id
+                AND c.parent_comment_id IS NULL
+                LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+            ) matched;
+        ELSE
+            SELECT COUNT(*) INTO v_total_count FROM (
+                SELECT 1 FROM activity.comments c
+                WHERE c.post_id = p_post_id
+                AND c.parent_comment_id = p_parent_comment_id
+                LIMIT CASE WHEN p_count_mode = 'capped' THEN p_count_cap + 1 END
+            ) matched;
+        END IF;
+    END IF;
+
+    -- 3. Return comments: one range scan on idx_comments_post_parent in (created_at, comment_id) order
+    v_sql := $q$
+        SELECT
+            c.comment_id,
+            c.parent_comment_id,
+            c.author_user_id,
+            CASE WHEN c.is_deleted THEN '[deleted]' ELSE c.content END as content,
+            c.reaction_count,
+            c.is_deleted,
+            c.created_at,
+            c.updated_at,
+            $7 as total_count
+        FROM activity.comments c
+        WHERE c.post_id = $1
+    $q$;
+
+    IF p_parent_comment_id IS NULL THEN
+        v_sql := v_sql || ' AND c.parent_comment_id IS NULL';
+    ELSE
+        v_sql := v_sql || ' AND c.parent_comment_id = $2';
+    END IF;
+
+    IF p_after_created_at IS NOT NULL THEN
+        v_sql := v_sql || ' AND (c.created_at, c.comment_id) > ($3, $4)';
+    END IF;
+
+    RETURN QUERY EXECUTE v_sql || ' ORDER BY c.created_at ASC, c.comment_id ASC LIMIT $5 OFFSET $6'
+    USING p_post_id, p_parent_comment_id, p_after_created_at, p_after_comment_id,
+          p_limit, p_offset, v_total_count;
 END;
 $$ LANGUAGE plpgsql;
 
 -- SP16: Create Reaction
 -- Purpose: Create or update reaction on post/comment
+-- Note: A first reaction is one statement: INSERT ... ON CONFLICT DO NOTHING with the per-type
+--       and total counters and the version bump as CTEs. On conflict (existing reaction, or a
+--       concurrent first reaction by the same user that committed first) the row is re-read
+--       with FOR UPDATE in a fresh snapshot, so a type change moves the counter of the type
+--       actually stored. Same reaction again is a no-op returning the existing row (idempotent)
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_reaction_create(
     p_user_id UUID,
@@ -1078,82 +1459,124 @@ CREATE OR REPLACE FUNCTION activity.sp_community_reaction_create(
 ) AS $$
 DECLARE
     v_reaction_id UUID;
-    v_existing_reaction_type activity.reaction_type;
+    v_previous_type activity.reaction_type;
     v_created_at TIMESTAMP WITH TIME ZONE;
+    v_now TIMESTAMP WITH TIME ZONE;
+    v_scope VARCHAR(20);
+    v_scope_id UUID;
 BEGIN
-    -- 1. Validate target exists
-    IF p_target_type = 'post' THEN
-        IF NOT EXISTS (SELECT 1 FROM activity.posts WHERE post_id = p_target_id) THEN
-            RAISE EXCEPTION 'TARGET_NOT_FOUND';
-        END IF;
-    ELSIF p_target_type = 'comment' THEN
-        IF NOT EXISTS (SELECT 1 FROM activity.comments WHERE comment_id = p_target_id) THEN
-            RAISE EXCEPTION 'TARGET_NOT_FOUND';
-        END IF;
-    ELSE
+    IF p_target_type NOT IN ('post', 'comment') THEN
         RAISE EXCEPTION 'INVALID_TARGET_TYPE';
     END IF;
 
-    -- 2. Check if reaction already exists
-    SELECT r.reaction_id, r.reaction_type
-    INTO v_reaction_id, v_existing_reaction_type
-    FROM activity.reactions r
-    WHERE r.user_id = p_user_id
-    AND r.target_type = p_target_type
-    AND r.target_id = p_target_id;
-
-    IF FOUND THEN
-        -- Reaction exists
-        IF v_existing_reaction_type = p_reaction_type THEN
-            -- Same reaction, do nothing (idempotent)
-            SELECT created_at INTO v_created_at
-            FROM activity.reactions
-            WHERE reaction_id = v_reaction_id;
-
-            RETURN QUERY
-            SELECT v_reaction_id, p_target_type, p_target_id, p_reaction_type, v_created_at;
-            RETURN;
-        ELSE
-            -- Different reaction, update
-            UPDATE activity.reactions
-            SET reaction_type = p_reaction_type, created_at = NOW()
-            WHERE reaction_id = v_reaction_id
-            RETURNING created_at INTO v_created_at;
-
-            RETURN QUERY
-            SELECT v_reaction_id, p_target_type, p_target_id, p_reaction_type, v_created_at;
-            RETURN;
+    v_now := NOW();
+    LOOP
+        -- 1. First reaction: insert, count it, bump the version of the list showing the target
+        WITH target AS (
+            SELECT 'feed'::VARCHAR(20) as scope, p.community_id as scope_id
+            FROM activity.posts p
+            WHERE p_target_type = 'post'
+            AND p.post_id = p_target_id
+            UNION ALL
+            SELECT 'comments'::VARCHAR(20), c.post_id
+            FROM activity.comments c
+            WHERE p_target_type = 'comment'
+            AND c.comment_id = p_target_id
+        ),
+        inserted AS (
+            INSERT INTO activity.reactions AS r (user_id, target_type, target_id, reaction_type, created_at)
+            SELECT p_user_id, p_target_type, p_target_id, p_reaction_type, v_now
+            FROM target
+            ON CONFLICT ON CONSTRAINT reactions_user_id_target_type_target_id_key DO NOTHING
+            RETURNING r.reaction_id, r.created_at
+        ),
+        counted AS (
+            INSERT INTO activity.reaction_counts AS rc (target_type, target_id, reaction_type, count)
+            SELECT p_target_type, p_target_id, p_reaction_type, 1
+            FROM inserted
+            ON CONFLICT ON CONSTRAINT reaction_counts_pkey
+            DO UPDATE SET count = rc.count + 1
+        ),
+        post_total AS (
+            UPDATE activity.posts p
+            SET reaction_count = p.reaction_count + 1
+            FROM inserted
+            WHERE p_target_type = 'post'
+            AND p.post_id = p_target_id
+        ),
+        comment_total AS (
+            UPDATE activity.comments c
+            SET reaction_count = c.reaction_count + 1
+            FROM inserted
+            WHERE p_target_type = 'comment'
+            AND c.comment_id = p_target_id
+        ),
+        bumped AS (
+            INSERT INTO activity.content_versions AS cv (scope, scope_id, version)
+            SELECT t.scope, t.scope_id, 1
+            FROM target t, inserted
+            ON CONFLICT (scope, scope_id)
+            DO UPDATE SET version = cv.version + 1
+        )
+        SELECT
+            (SELECT t.scope FROM target t),
+            (SELECT t.scope_id FROM target t),
+            (SELECT i.reaction_id FROM inserted i),
+            (SELECT i.created_at FROM inserted i)
+        INTO v_scope, v_scope_id, v_reaction_id, v_created_at;
+
+        IF v_scope IS NULL THEN
+            RAISE EXCEPTION 'TARGET_NOT_FOUND';
         END IF;
-    END IF;
 
-    -- 3. Insert new reaction
-    v_created_at := NOW();
-    INSERT INTO activity.reactions (
-        user_id,
-        target_type,
-        target_id,
-        reaction_type,
-        created_at
-    ) VALUES (
-        p_user_id,
-        p_target_type,
-        p_target_id,
-        p_reaction_type,
-        v_created_at
-    ) RETURNING reactions.reaction_id INTO v_reaction_id;
+        EXIT WHEN v_reaction_id IS NOT NULL;
 
-    -- 4. Update target reaction count
-    IF p_target_type = 'post' THEN
-        UPDATE activity.posts
-        SET reaction_count = reaction_count + 1
-        WHERE post_id = p_target_id;
-    ELSIF p_target_type = 'comment' THEN
-        UPDATE activity.comments
-        SET reaction_count = reaction_count + 1
-        WHERE comment_id = p_target_id;
-    END IF;
+        -- 2. Conflict: lock the committed row (not the first statement's snapshot)
+        SELECT r.reaction_id, r.reaction_type, r.created_at
+        INTO v_reaction_id, v_previous_type, v_created_at
+        FROM activity.reactions r
+        WHERE r.user_id = p_user_id
+        AND r.target_type = p_target_type
+        AND r.target_id = p_target_id
+        FOR UPDATE;
+
+        -- Removed by a concurrent delete in between: insert again
+        CONTINUE WHEN NOT FOUND;
+
+        -- Same reaction: no-op
+        EXIT WHEN v_previous_type = p_reaction_type;
+
+        -- 3. Type change: move the per-type counter from the stored type, bump the version
+        WITH changed AS (
+            UPDATE activity.reactions r
+            SET reaction_type = p_reaction_type, created_at = v_now
+            WHERE r.reaction_id = v_reaction_id
+            RETURNING r.created_at
+        ),
+        moved_from AS (
+            UPDATE activity.reaction_counts rc
+            SET count = GREATEST(rc.count - 1, 0)
+            WHERE rc.target_type = p_target_type
+            AND rc.target_id = p_target_id
+            AND rc.reaction_type = v_previous_type
+        ),
+        moved_to AS (
+            INSERT INTO activity.reaction_counts AS rc (target_type, target_id, reaction_type, count)
+            VALUES (p_target_type, p_target_id, p_reaction_type, 1)
+            ON CONFLICT ON CONSTRAINT reaction_counts_pkey
+            DO UPDATE SET count = rc.count + 1
+        ),
+        bumped AS (
+            INSERT INTO activity.content_versions AS cv (scope, scope_id, version)
+            VALUES (v_scope, v_scope_id, 1)
+            ON CONFLICT (scope, scope_id)
+            DO UPDATE SET version = cv.version + 1
+        )
+        SELECT ch.created_at INTO v_created_at FROM changed ch;
+        EXIT;
+    END LOOP;
 
-    -- 5. Return reaction details
+    -- 4. Return reaction details
     RETURN QUERY
     SELECT v_reaction_id, p_target_type, p_target_id, p_reaction_type, v_created_at;
 END;
@@ -1161,6 +1584,7 @@ $$ LANGUAGE plpgsql;
 
 -- SP17: Delete Reaction
 -- Purpose: Remove reaction from post/comment
+-- Note: One statement: the delete, counter decrements and version bump are CTEs
 -- =============================================================================
 CREATE OR REPLACE FUNCTION activity.sp_community_reaction_delete(
     p_user_id UUID,
@@ -1170,41 +1594,51 @@ CREATE OR REPLACE FUNCTION activity.sp_community_reaction_delete(
     deleted BOOLEAN
 ) AS $$
 DECLARE
-    v_reaction_exists BOOLEAN;
+    v_deleted BOOLEAN;
 BEGIN
-    -- 1. Check if reaction exists
-    SELECT EXISTS (
-        SELECT 1 FROM activity.reactions r
+    -- 1. Delete reaction (if any) and adjust counters (total and per type)
+    WITH removed AS (
+        DELETE FROM activity.reactions r
         WHERE r.user_id = p_user_id
         AND r.target_type = p_target_type
         AND r.target_id = p_target_id
-    ) INTO v_reaction_exists;
+        RETURNING r.reaction_type
+    ),
+    per_type AS (
+        UPDATE activity.reaction_counts rc
+        SET count = GREATEST(rc.count - 1, 0)
+        FROM removed d
+        WHERE rc.target_type = p_target_type
+        AND rc.target_id = p_target_id
+        AND rc.reaction_type = d.reaction_type
+    ),
+    post_total AS (
+        UPDATE activity.posts p
+        SET reaction_count = p.reaction_count - 1
+        FROM removed d
+        WHERE p_target_type = 'post'
+        AND p.post_id = p_target_id
+        RETURNING 'feed'::VARCHAR(20) as scope, p.community_id as scope_id
+    ),
+    comment_total AS (
+        UPDATE activity.comments c
+        SET reaction_count = c.reaction_count - 1
+        FROM removed d
+        WHERE p_target_type = 'comment'
+        AND c.comment_id = p_target_id
+        RETURNING 'comments'::VARCHAR(20) as scope, c.post_id as scope_id
+    ),
+    bumped AS (
+        INSERT INTO activity.content_versions AS cv (scope, scope_id, version)
+        SELECT t.scope, t.scope_id, 1
+        FROM (SELECT * FROM post_total UNION ALL SELECT * FROM comment_total) t
+        ON CONFLICT (scope, scope_id)
+        DO UPDATE SET version = cv.version + 1
+    )
+    SELECT EXISTS (SELECT 1 FROM removed) INTO v_deleted;
 
-    IF NOT v_reaction_exists THEN
-        -- Idempotent: no reaction to delete
-        RETURN QUERY SELECT FALSE;
-        RETURN;
-    END IF;
-
-    -- 2. Delete reaction
-    DELETE FROM activity.reactions
-    WHERE user_id = p_user_id
-    AND target_type = p_target_type
-    AND target_id = p_target_id;
-
-    -- 3. Update target reaction count
-    IF p_target_type = 'post' THEN
-        UPDATE activity.posts
-        SET reaction_count = reaction_count - 1
-        WHERE post_id = p_target_id;
-    ELSIF p_target_type = 'comment' THEN
-        UPDATE activity.comments
-        SET reaction_count = reaction_count - 1
-        WHERE comment_id = p_target_id;
-    END IF;
-
-    -- 4. Return success
-    RETURN QUERY SELECT TRUE;
+    -- 2. Return whether a reaction was removed (FALSE: nothing to delete, idempotent)
+    RETURN QUERY SELECT v_deleted;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -1300,6 +1734,1423 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- SP19: Get User Snippets
+-- Purpose: Batched profile lookup used to hydrate authors/members in list responses
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_user_snippets(
+    p_user_ids UUID[]
+) RETURNS TABLE(
+    user_id UUID,
+    username VARCHAR(100),
+    first_name VARCHAR(100),
+    last_name VARCHAR(100),
+    main_photo_url VARCHAR(500),
+    is_verified BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        u.user_id,
+        u.username,
+        u.first_name,
+        u.last_name,
+        u.main_photo_url,
+        u.is_verified
+    FROM activity.users u
+    WHERE u.user_id = ANY(p_user_ids);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SCHEMA: Trending rankings snapshot
+-- Purpose: Compact, precomputed ranking read by sp_community_get_trending in O(limit)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS activity.community_rankings (
+    rank INT PRIMARY KEY,
+    community_id UUID NOT NULL UNIQUE REFERENCES activity.communities(community_id) ON DELETE CASCADE,
+    trending_score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Support the windowed scans in sp_community_refresh_rankings
+CREATE INDEX IF NOT EXISTS idx_community_members_joined ON activity.community_members(joined_at);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON activity.posts(created_at);
+CREATE INDEX IF NOT EXISTS idx_reactions_created ON activity.reactions(created_at) WHERE target_type = 'post';
+
+-- SP20: Refresh Community Rankings
+-- Purpose: Recompute trending scores from recent joins, posts and reactions (exponential decay)
+--          Featured communities are always ranked and get a flat score boost
+-- Note: Guarded by an advisory lock so only one worker refreshes; others get zero rows
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_refresh_rankings(
+    p_window_hours INT,
+    p_half_life_hours DOUBLE PRECISION,
+    p_join_weight DOUBLE PRECISION,
+    p_post_weight DOUBLE PRECISION,
+    p_reaction_weight DOUBLE PRECISION,
+    p_featured_boost DOUBLE PRECISION
+) RETURNS TABLE(
+    ranked_count INT,
+    computed_at TIMESTAMP WITH TIME ZONE
+) AS $$
+DECLARE
+    v_now TIMESTAMP WITH TIME ZONE;
+    v_since TIMESTAMP WITH TIME ZONE;
+    v_ranked_count INT;
+BEGIN
+    -- 1. Skip if another worker is already refreshing
+    IF NOT pg_try_advisory_xact_lock(hashtext('activity.community_rankings')) THEN
+        RETURN;
+    END IF;
+
+    v_now := NOW();
+    v_since := v_now - make_interval(hours => p_window_hours);
+
+    -- 2. Replace the snapshot (readers keep seeing the old one until commit)
+    DELETE FROM activity.community_rankings;
+
+    INSERT INTO activity.community_rankings (rank, community_id, trending_score, computed_at)
+    SELECT
+        ROW_NUMBER() OVER (ORDER BY ranked.score DESC, ranked.member_count DESC, ranked.community_id)::INT,
+        ranked.community_id,
+        ranked.score,
+        v_now
+    FROM (
+        SELECT
+            c.community_id,
+            c.member_count,
+            COALESCE(scored.score, 0)
+                + CASE WHEN c.is_featured THEN p_featured_boost ELSE 0 END as score
+        FROM activity.communities c
+        LEFT JOIN (
+            SELECT
+                e.community_id,
+                SUM(e.weight * EXP(-LN(2) * EXTRACT(EPOCH FROM v_now - e.happened_at) / 3600.0 / p_half_life_hours)) as score
+            FROM (
+                SELECT cm.community_id, p_join_weight as weight, cm.joined_at as happened_at
+                FROM activity.community_members cm
+                WHERE cm.joined_at >= v_since
+                AND cm.status = 'active'
+                UNION ALL
+                SELECT p.community_id, p_post_weight, p.created_at
+                FROM activity.posts p
+                WHERE p.created_at >= v_since
+                AND p.status = 'published'
+                UNION ALL
+                SELECT p.community_id, p_reaction_weight, r.created_at
+                FROM activity.reactions r
+                JOIN activity.posts p ON p.post_id = r.target_id
+                WHERE r.target_type = 'post'
+                AND r.created_at >= v_since
+            ) e
+            GROUP BY e.community_id
+        ) scored ON scored.community_id = c.community_id
+        WHERE c.status = 'active'
+        AND (scored.community_id IS NOT NULL OR c.is_featured)
+    ) ranked;
+
+    GET DIAGNOSTICS v_ranked_count = ROW_COUNT;
+
+    RETURN QUERY
+    SELECT v_ranked_count, v_now;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP21: Get Trending Communities
+-- Purpose: Page through the precomputed ranking by rank range (no sort, no offset scan)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_trending(
+    p_requesting_user_id UUID,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0
+) RETURNS TABLE(
+    community_id UUID,
+    organization_id UUID,
+    name VARCHAR(255),
+    slug VARCHAR(100),
+    description TEXT,
+    community_type activity.community_type,
+    member_count INT,
+    max_members INT,
+    is_featured BOOLEAN,
+    cover_image_url VARCHAR(500),
+    icon_url VARCHAR(500),
+    created_at TIMESTAMP WITH TIME ZONE,
+    is_member BOOLEAN,
+    tags TEXT[],
+    rank INT,
+    trending_score DOUBLE PRECISION,
+    total_count BIGINT
+) AS $$
+DECLARE
+    v_total_count BIGINT;
+BEGIN
+    -- Ranks are dense (1..N), so the max rank is the total and comes straight from the PK
+    SELECT COALESCE(MAX(r.rank), 0) INTO v_total_count
+    FROM activity.community_rankings r;
+
+    RETURN QUERY
+    SELECT
+        c.community_id,
+        c.organization_id,
+        c.name,
+        c.slug,
+        c.description,
+        c.community_type,
+        c.member_count,
+        c.max_members,
+        c.is_featured,
+        c.cover_image_url,
+        c.icon_url,
+        c.created_at,
+        CASE WHEN cm.user_id IS NOT NULL THEN TRUE ELSE FALSE END as is_member,
+        ARRAY(
+            SELECT ct.tag::TEXT FROM activity.community_tags ct
+            WHERE ct.community_id = c.community_id
+        ) as tags,
+        r.rank,
+        r.trending_score,
+        v_total_count
+    FROM activity.community_rankings r
+    JOIN activity.communities c ON c.community_id = r.community_id
+    LEFT JOIN activity.community_members cm
+        ON c.community_id = cm.community_id
+        AND cm.user_id = p_requesting_user_id
+        AND cm.status = 'active'
+    WHERE r.rank > p_offset
+    AND r.rank <= p_offset + p_limit
+    AND c.status = 'active'
+    ORDER BY r.rank;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP22: Get Tag Counts
+-- Purpose: One aggregate used to build the in-memory tag autocomplete index
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_tag_counts()
+RETURNS TABLE(
+    tag TEXT,
+    community_count INT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        ct.tag::TEXT,
+        COUNT(*)::INT as community_count
+    FROM activity.community_tags ct
+    JOIN activity.communities c ON c.community_id = ct.community_id
+    WHERE c.status = 'active'
+    GROUP BY ct.tag;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SCHEMA: Content versions
+-- Purpose: Cheap validators for conditional GETs (ETag / If-None-Match)
+--          scope 'feed'     -> scope_id = community_id (posts, their counters)
+--          scope 'comments' -> scope_id = post_id (comments, their counters)
+-- Note: Kept in a narrow side table so bumps don't fire the updated_at triggers
+--       on communities/posts or rewrite their wide rows
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS activity.content_versions (
+    scope VARCHAR(20) NOT NULL,
+    scope_id UUID NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1,
+
+    PRIMARY KEY (scope, scope_id)
+);
+
+CREATE OR REPLACE FUNCTION activity.fn_bump_content_version(
+    p_scope VARCHAR(20),
+    p_scope_id UUID
+) RETURNS VOID AS $$
+BEGIN
+    IF p_scope_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO activity.content_versions (scope, scope_id, version)
+    VALUES (p_scope, p_scope_id, 1)
+    ON CONFLICT (scope, scope_id)
+    DO UPDATE SET version = activity.content_versions.version + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP23: Get Content Versions
+-- Purpose: Primary-key lookups used to build ETags before running list/detail procedures
+-- Note: Returns zero rows if the community does not exist; post_in_community is NULL
+--       without p_post_id, FALSE if the post belongs to another community or none
+-- =============================================================================
+DROP FUNCTION IF EXISTS activity.sp_community_get_content_versions(UUID, UUID);
+CREATE OR REPLACE FUNCTION activity.sp_community_get_content_versions(
+    p_community_id UUID,
+    p_post_id UUID
+) RETURNS TABLE(
+    community_updated_at TIMESTAMP WITH TIME ZONE,
+    feed_version BIGINT,
+    comments_version BIGINT,
+    post_in_community BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        c.updated_at,
+        COALESCE((
+            SELECT v.version FROM activity.content_versions v
+            WHERE v.scope = 'feed' AND v.scope_id = c.community_id
+        ), 0),
+        CASE WHEN p_post_id IS NULL THEN NULL ELSE COALESCE((
+            SELECT v.version FROM activity.content_versions v
+            WHERE v.scope = 'comments' AND v.scope_id = p_post_id
+        ), 0) END,
+        CASE WHEN p_post_id IS NULL THEN NULL ELSE EXISTS(
+            SELECT 1 FROM activity.posts p
+            WHERE p.post_id = p_post_id AND p.community_id = c.community_id
+        ) END
+    FROM activity.communities c
+    WHERE c.community_id = p_community_id;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP24: Prepare Bulk Join
+-- Purpose: Create the per-transaction staging table filled by COPY (copy_records_to_table)
+-- Note: Must run in the same transaction as sp_community_bulk_join; dropped on commit
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_bulk_join_prepare()
+RETURNS VOID AS $$
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS bulk_join_users (
+        ordinal INT NOT NULL,
+        user_id UUID NOT NULL
+    ) ON COMMIT DROP;
+
+    TRUNCATE bulk_join_users;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP25: Bulk Join Community
+-- Purpose: Set-based membership import from bulk_join_users (organizer only)
+-- Outcomes per distinct user: joined, already_member, user_not_found, community_full
+-- Note: p_requesting_user_id NULL skips the organizer check (trusted CLI import);
+--       community type is not checked, organizers may import into closed communities
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_bulk_join(
+    p_community_id UUID,
+    p_requesting_user_id UUID
+) RETURNS TABLE(
+    user_id UUID,
+    outcome VARCHAR(20)
+) AS $$
+DECLARE
+    v_status activity.community_status;
+    v_member_count INT;
+    v_max_members INT;
+    v_available INT;
+    v_joined_at TIMESTAMP WITH TIME ZONE := NOW();
+BEGIN
+    -- 1. Lock the community row: member_count and max_members are checked once
+    SELECT c.status, c.member_count, c.max_members
+    INTO v_status, v_member_count, v_max_members
+    FROM activity.communities c
+    WHERE c.community_id = p_community_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'COMMUNITY_NOT_FOUND';
+    END IF;
+
+    IF v_status != 'active' THEN
+        RAISE EXCEPTION 'COMMUNITY_NOT_ACTIVE';
+    END IF;
+
+    -- 2. Check requesting user is organizer
+    IF p_requesting_user_id IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM activity.community_members cm
+        WHERE cm.community_id = p_community_id
+        AND cm.user_id = p_requesting_user_id
+        AND cm.role = 'organizer'
+        AND cm.status = 'active'
+    ) THEN
+        RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+    END IF;
+
+    -- 3. Remaining capacity (NULL = unlimited; LIMIT NULL means no limit)
+    IF v_max_members IS NOT NULL THEN
+        v_available := GREATEST(v_max_members - v_member_count, 0);
+    END IF;
+
+    -- 4. Classify, insert in input order up to capacity, adjust member_count once
+    RETURN QUERY
+    WITH requested AS (
+        SELECT DISTINCT ON (b.user_id) b.user_id, b.ordinal
+        FROM bulk_join_users b
+        ORDER BY b.user_id, b.ordinal
+    ),
+    classified AS (
+        SELECT
+            r.user_id,
+            r.ordinal,
+            CASE
+                WHEN NOT EXISTS (
+                    SELECT 1 FROM activity.users u WHERE u.user_id = r.user_id
+                ) THEN 'user_not_found'
+                WHEN EXISTS (
+                    SELECT 1 FROM activity.community_members cm
+                    WHERE cm.community_id = p_community_id
+                    AND cm.user_id = r.user_id
+                ) THEN 'already_member'
+            END as skipped
+        FROM requested r
+    ),
+    admitted AS (
+        SELECT cl.user_id
+        FROM classified cl
+        WHERE cl.skipped IS NULL
+        ORDER BY cl.ordinal
+        LIMIT v_available
+    ),
+    inserted AS (
+        INSERT INTO activity.community_members (community_id, user_id, role, status, joined_at)
+        SELECT p_community_id, a.user_id, 'member', 'active', v_joined_at
+        FROM admitted a
+        ON CONFLICT ON CONSTRAINT community_members_pkey DO NOTHING
+        RETURNING community_members.user_id
+    ),
+    counted AS (
+        UPDATE activity.communities
+        SET member_count = member_count + (SELECT COUNT(*) FROM inserted)
+        WHERE communities.community_id = p_community_id
+        AND EXISTS (SELECT 1 FROM inserted)
+    ),
+    outboxed AS (
+        INSERT INTO activity.community_outbox (event_type, aggregate_id, payload)
+        SELECT 'member_joined', p_community_id, jsonb_build_object(
+            'community_id', p_community_id,
+            'user_id', i.user_id,
+            'joined_at', v_joined_at
+        )
+        FROM inserted i
+    )
+    SELECT
+        cl.user_id,
+        (CASE
+            WHEN cl.skipped IS NOT NULL THEN cl.skipped
+            WHEN i.user_id IS NOT NULL THEN 'joined'
+            -- Lost a race with a concurrent single join
+            WHEN a.user_id IS NOT NULL THEN 'already_member'
+            ELSE 'community_full'
+        END)::VARCHAR(20)
+    FROM classified cl
+    LEFT JOIN admitted a ON a.user_id = cl.user_id
+    LEFT JOIN inserted i ON i.user_id = cl.user_id
+    ORDER BY cl.ordinal;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SCHEMA: Reaction counts per type
+-- Purpose: Maintained by the reaction procedures; read in batches for list pages
+-- Note: Backfilled from activity.reactions only when the table is first created (empty)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS activity.reaction_counts (
+    target_type VARCHAR(50) NOT NULL,
+    target_id UUID NOT NULL,
+    reaction_type activity.reaction_type NOT NULL,
+    count INT NOT NULL DEFAULT 0 CHECK (count >= 0),
+
+    PRIMARY KEY (target_type, target_id, reaction_type)
+);
+
+INSERT INTO activity.reaction_counts (target_type, target_id, reaction_type, count)
+SELECT r.target_type, r.target_id, r.reaction_type, COUNT(*)::INT
+FROM activity.reactions r
+WHERE NOT EXISTS (SELECT 1 FROM activity.reaction_counts)
+GROUP BY r.target_type, r.target_id, r.reaction_type;
+
+-- Per-type counters are now moved inline by the reaction procedures
+DROP FUNCTION IF EXISTS activity.fn_adjust_reaction_count(VARCHAR, UUID, activity.reaction_type, INT);
+
+-- SP26: Get Reaction Summaries
+-- Purpose: Per-type counts and the viewer's own reaction for a page of posts/comments
+-- Note: One row per (target, reaction type) with count > 0; targets without reactions are absent
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_reaction_summaries(
+    p_target_type VARCHAR(50),
+    p_target_ids UUID[],
+    p_viewer_user_id UUID
+) RETURNS TABLE(
+    target_id UUID,
+    reaction_type activity.reaction_type,
+    reaction_count INT,
+    is_viewer_reaction BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        rc.target_id,
+        rc.reaction_type,
+        rc.count,
+        (r.reaction_id IS NOT NULL) as is_viewer_reaction
+    FROM activity.reaction_counts rc
+    LEFT JOIN activity.reactions r
+        ON r.user_id = p_viewer_user_id
+        AND r.target_type = rc.target_type
+        AND r.target_id = rc.target_id
+        AND r.reaction_type = rc.reaction_type
+    WHERE rc.target_type = p_target_type
+    AND rc.target_id = ANY(p_target_ids)
+    AND rc.count > 0;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP27: Get Timeline Sources
+-- Purpose: Communities feeding a user's home timeline
+-- Note: is_fanout = FALSE for communities above p_fanout_max_members (read by fan-in)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_timeline_sources(
+    p_user_id UUID,
+    p_fanout_max_members INT
+) RETURNS TABLE(
+    community_id UUID,
+    is_fanout BOOLEAN
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        c.community_id,
+        (c.member_count <= p_fanout_max_members) as is_fanout
+    FROM activity.community_members cm
+    JOIN activity.communities c ON c.community_id = cm.community_id
+    WHERE cm.user_id = p_user_id
+    AND cm.status = 'active'
+    AND c.status = 'active';
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP28: Get Fan-out Targets
+-- Purpose: Active member IDs of a community, keyset-paged by user_id, for fan-out on write
+-- Note: Returns no rows for communities above p_fanout_max_members (read by fan-in)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_fanout_targets(
+    p_community_id UUID,
+    p_fanout_max_members INT,
+    p_after_user_id UUID,
+    p_limit INT
+) RETURNS TABLE(
+    user_id UUID
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT cm.user_id
+    FROM activity.community_members cm
+    JOIN activity.communities c ON c.community_id = cm.community_id
+    WHERE cm.community_id = p_community_id
+    AND cm.status = 'active'
+    AND c.member_count <= p_fanout_max_members
+    AND (p_after_user_id IS NULL OR cm.user_id > p_after_user_id)
+    ORDER BY cm.user_id
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP29: Get Recent Post IDs
+-- Purpose: Newest published posts per community, before an optional (created_at, post_id) cursor
+-- Note: Each community is read separately (LATERAL) so idx_posts_community serves every branch;
+--       rows are sorted newest first per community for the API-side k-way merge
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_recent_post_ids(
+    p_community_ids UUID[],
+    p_before_created_at TIMESTAMP WITH TIME ZONE,
+    p_before_post_id UUID,
+    p_limit_per_community INT
+) RETURNS TABLE(
+    community_id UUID,
+    post_id UUID,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT ids.community_id, recent.post_id, recent.created_at
+    FROM unnest(p_community_ids) AS ids(community_id)
+    CROSS JOIN LATERAL (
+        SELECT p.post_id, p.created_at
+        FROM activity.posts p
+        WHERE p.community_id = ids.community_id
+        AND p.status = 'published'
+        AND (
+            p_before_created_at IS NULL
+            OR (p.created_at, p.post_id) < (p_before_created_at, p_before_post_id)
+        )
+        ORDER BY p.created_at DESC, p.post_id DESC
+        LIMIT p_limit_per_community
+    ) recent
+    ORDER BY ids.community_id, recent.created_at DESC, recent.post_id DESC;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SP30: Get Posts by IDs
+-- Purpose: Hydrate timeline entries (published posts in communities the user is an active member of)
+-- Note: Unknown, removed or no longer visible posts are simply absent; returns author IDs only
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_posts_by_ids(
+    p_post_ids UUID[],
+    p_requesting_user_id UUID
+) RETURNS TABLE(
+    post_id UUID,
+    community_id UUID,
+    author_user_id UUID,
+    activity_id UUID,
+    title VARCHAR(500),
+    content TEXT,
+    content_type activity.content_type,
+    view_count INT,
+    comment_count INT,
+    reaction_count INT,
+    is_pinned BOOLEAN,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.post_id,
+        p.community_id,
+        p.author_user_id,
+        p.activity_id,
+        p.title,
+        p.content,
+        p.content_type,
+        p.view_count,
+        p.comment_count,
+        p.reaction_count,
+        p.is_pinned,
+        p.created_at,
+        p.updated_at
+    FROM activity.posts p
+    WHERE p.post_id = ANY(p_post_ids)
+    AND p.status = 'published'
+    AND EXISTS (
+        SELECT 1 FROM activity.community_members cm
+        WHERE cm.community_id = p.community_id
+        AND cm.user_id = p_requesting_user_id
+        AND cm.status = 'active'
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- SCHEMA: Transactional outbox
+-- Purpose: Domain events written in the same transaction as the change that caused them;
+--          drained after commit by the API's outbox relay (at-least-once delivery)
+-- Note: aggregate_id is the community for membership events, the post/comment otherwise
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS activity.community_outbox (
+    event_id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    aggregate_id UUID NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION activity.fn_enqueue_event(
+    p_event_type VARCHAR(50),
+    p_aggregate_id UUID,
+    p_payload JSONB
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO activity.community_outbox (event_type, aggregate_id, payload)
+    VALUES (p_event_type, p_aggregate_id, p_payload);
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP31: Claim Outbox Events
+-- Purpose: Lock the oldest pending events for one relay batch
+-- Note: Call inside a transaction; SKIP LOCKED lets several relays drain in parallel.
+--       The rows stay locked until sp_community_outbox_delete commits (or rollback on failure)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_outbox_claim(
+    p_limit INT
+) RETURNS TABLE(
+    event_id BIGINT,
+    event_type VARCHAR(50),
+    aggregate_id UUID,
+    payload JSONB,
+    created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT o.event_id, o.event_type, o.aggregate_id, o.payload, o.created_at
+    FROM activity.community_outbox o
+    ORDER BY o.event_id
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP32: Delete Outbox Events
+-- Purpose: Remove a batch once the sink has accepted it
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_outbox_delete(
+    p_event_ids BIGINT[]
+) RETURNS TABLE(
+    deleted_count INT
+) AS $$
+DECLARE
+    v_deleted INT;
+BEGIN
+    DELETE FROM activity.community_outbox o
+    WHERE o.event_id = ANY(p_event_ids);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    RETURN QUERY SELECT v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SCHEMA: Retention purge
+-- Purpose: Hard-delete soft-deleted posts/comments after the retention period
+-- Note: Partial indexes cover only tombstones, so the purge scans never touch live rows;
+--       purged_content keeps a JSONB copy of each row when archiving is enabled
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_posts_purge ON activity.posts(updated_at, post_id) WHERE status = 'removed';
+CREATE INDEX IF NOT EXISTS idx_comments_purge ON activity.comments(updated_at, comment_id) WHERE is_deleted;
+
+CREATE TABLE IF NOT EXISTS activity.purged_content (
+    content_kind VARCHAR(20) NOT NULL,
+    content_id UUID NOT NULL,
+    community_id UUID,
+    row_data JSONB NOT NULL,
+    purged_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (content_kind, content_id)
+);
+
+-- SP33: Purge Removed Posts
+-- Purpose: Hard-delete one keyset batch of posts removed before p_older_than
+--          (comments go with them via ON DELETE CASCADE; reactions and counters are deleted here)
+-- Note: Guarded by an advisory lock so only one worker purges at a time; others get zero rows.
+--       Pass the previous batch's last_updated_at/last_id to continue (NULL = from the start)
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_purge_posts(
+    p_older_than TIMESTAMP WITH TIME ZONE,
+    p_after_updated_at TIMESTAMP WITH TIME ZONE,
+    p_after_id UUID,
+    p_batch_size INT,
+    p_archive BOOLEAN
+) RETURNS TABLE(
+    scanned_count INT,
+    purged_count INT,
+    last_updated_at TIMESTAMP WITH TIME ZONE,
+    last_id UUID
+) AS $$
+DECLARE
+    v_post_ids UUID[];
+    v_updated_ats TIMESTAMP WITH TIME ZONE[];
+    v_comment_ids UUID[];
+    v_purged INT;
+BEGIN
+    -- 1. Skip if another worker is already purging
+    IF NOT pg_try_advisory_xact_lock(hashtext('activity.retention_purge')) THEN
+        RETURN;
+    END IF;
+
+    -- 2. Next batch of tombstones in keyset order (idx_posts_purge)
+    SELECT
+        array_agg(b.post_id ORDER BY b.updated_at, b.post_id),
+        array_agg(b.updated_at ORDER BY b.updated_at, b.post_id)
+    INTO v_post_ids, v_updated_ats
+    FROM (
+        SELECT p.post_id, p.updated_at
+        FROM activity.posts p
+        WHERE p.status = 'removed'
+        AND p.updated_at < p_older_than
+        AND (p_after_updated_at IS NULL OR (p.updated_at, p.post_id) > (p_after_updated_at, p_after_id))
+        ORDER BY p.updated_at, p.post_id
+        LIMIT p_batch_size
+    ) b;
+
+    IF v_post_ids IS NULL THEN
+        RETURN QUERY SELECT 0, 0, NULL::TIMESTAMP WITH TIME ZONE, NULL::UUID;
+        RETURN;
+    END IF;
+
+    v_comment_ids := ARRAY(
+        SELECT c.comment_id FROM activity.comments c WHERE c.post_id = ANY(v_post_ids)
+    );
+
+    -- 3. Optional archive copy
+    IF p_archive THEN
+        INSERT INTO activity.purged_content (content_kind, content_id, community_id, row_data)
+        SELECT 'post', p.post_id, p.community_id, to_jsonb(p)
+        FROM activity.posts p
+        WHERE p.post_id = ANY(v_post_ids)
+        UNION ALL
+        SELECT 'comment', c.comment_id, p.community_id, to_jsonb(c)
+        FROM activity.comments c
+        JOIN activity.posts p ON p.post_id = c.post_id
+        WHERE c.comment_id = ANY(v_comment_ids)
+        ON CONFLICT DO NOTHING;
+    END IF;
+
+    -- 4. Polymorphic rows have no foreign key to cascade from
+    DELETE FROM activity.reactions r
+    WHERE r.target_type = 'post' AND r.target_id = ANY(v_post_ids);
+    DELETE FROM activity.reactions r
+    WHERE r.target_type = 'comment' AND r.target_id = ANY(v_comment_ids);
+    DELETE FROM activity.reaction_counts rc
+    WHERE rc.target_type = 'post' AND rc.target_id = ANY(v_post_ids);
+    DELETE FROM activity.reaction_counts rc
+    WHERE rc.target_type = 'comment' AND rc.target_id = ANY(v_comment_ids);
+    DELETE FROM activity.content_versions cv
+    WHERE cv.scope = 'comments' AND cv.scope_id = ANY(v_post_ids);
+
+    -- 5. Delete the posts (their comments cascade)
+    DELETE FROM activity.posts p
+    WHERE p.post_id = ANY(v_post_ids)
+    AND p.status = 'removed';
+
+    GET DIAGNOSTICS v_purged = ROW_COUNT;
+
+    RETURN QUERY
+    SELECT
+        array_length(v_post_ids, 1),
+        v_purged,
+        v_updated_ats[array_length(v_updated_ats, 1)],
+        v_post_ids[array_length(v_post_ids, 1)];
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP34: Purge Deleted Comments
+-- Purpose: Hard-delete one keyset batch of comments deleted before p_older_than
+-- Note: Comments that still have replies are skipped (the cascade would take the replies);
+--       they become purgeable once their replies are gone. Same lock and cursor as SP33
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_purge_comments(
+    p_older_than TIMESTAMP WITH TIME ZONE,
+    p_after_updated_at TIMESTAMP WITH TIME ZONE,
+    p_after_id UUID,
+    p_batch_size INT,
+    p_archive BOOLEAN
+) RETURNS TABLE(
+    scanned_count INT,
+    purged_count INT,
+    last_updated_at TIMESTAMP WITH TIME ZONE,
+    last_id UUID
+) AS $$
+DECLARE
+    v_scanned_ids UUID[];
+    v_updated_ats TIMESTAMP WITH TIME ZONE[];
+    v_comment_ids UUID[];
+    v_post_ids UUID[];
+    v_purged INT;
+BEGIN
+    -- 1. Skip if another worker is already purging
+    IF NOT pg_try_advisory_xact_lock(hashtext('activity.retention_purge')) THEN
+        RETURN;
+    END IF;
+
+    -- 2. Next batch of tombstones in keyset order (idx_comments_purge)
+    SELECT
+        array_agg(b.comment_id ORDER BY b.updated_at, b.comment_id),
+        array_agg(b.updated_at ORDER BY b.updated_at, b.comment_id)
+    INTO v_scanned_ids, v_updated_ats
+    FROM (
+        SELECT c.comment_id, c.updated_at
+        FROM activity.comments c
+        WHERE c.is_deleted
+        AND c.updated_at < p_older_than
+        AND (p_after_updated_at IS NULL OR (c.updated_at, c.comment_id) > (p_after_updated_at, p_after_id))
+        ORDER BY c.updated_at, c.comment_id
+        LIMIT p_batch_size
+    ) b;
+
+    IF v_scanned_ids IS NULL THEN
+        RETURN QUERY SELECT 0, 0, NULL::TIMESTAMP WITH TIME ZONE, NULL::UUID;
+        RETURN;
+    END IF;
+
+    -- 3. Leaves only (idx_comments_parent)
+    v_comment_ids := ARRAY(
+        SELECT c.comment_id
+        FROM activity.comments c
+        WHERE c.comment_id = ANY(v_scanned_ids)
+        AND NOT EXISTS (
+            SELECT 1 FROM activity.comments child
+            WHERE child.parent_comment_id = c.comment_id
+        )
+    );
+
+    -- 4. Optional archive copy
+    IF p_archive THEN
+        INSERT INTO activity.purged_content (content_kind, content_id, community_id, row_data)
+        SELECT 'comment', c.comment_id, p.community_id, to_jsonb(c)
+        FROM activity.comments c
+        JOIN activity.posts p ON p.post_id = c.post_id
+        WHERE c.comment_id = ANY(v_comment_ids)
+        ON CONFLICT DO NOTHING;
+    END IF;
+
+    -- 5. Reactions and counters (no foreign key to cascade from)
+    DELETE FROM activity.reactions r
+    WHERE r.target_type = 'comment' AND r.target_id = ANY(v_comment_ids);
+    DELETE FROM activity.reaction_counts rc
+    WHERE rc.target_type = 'comment' AND rc.target_id = ANY(v_comment_ids);
+
+    -- 6. Delete, then invalidate the affected comment lists' validators
+    WITH purged AS (
+        DELETE FROM activity.comments c
+        WHERE c.comment_id = ANY(v_comment_ids)
+        AND c.is_deleted
+        AND NOT EXISTS (
+            SELECT 1 FROM activity.comments child
+            WHERE child.parent_comment_id = c.comment_id
+        )
+        RETURNING c.post_id
+    )
+    SELECT array_agg(DISTINCT purged.post_id), COUNT(*)::INT
+    INTO v_post_ids, v_purged
+    FROM purged;
+
+    PERFORM activity.fn_bump_content_version('comments', affected.post_id)
+    FROM unnest(v_post_ids) AS affected(post_id);
+
+    RETURN QUERY
+    SELECT
+        array_length(v_scanned_ids, 1),
+        v_purged,
+        v_updated_ats[array_length(v_updated_ats, 1)],
+        v_scanned_ids[array_length(v_scanned_ids, 1)];
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP35: Remove User Content (moderation)
+-- Purpose: Remove everything a user posted in a community in one pass: posts, comments
+--          (on any post in the community) and reactions, optionally limited to a time window
+-- Note: Set-based: counters are adjusted per affected row/post once, not per removed item.
+--       comment_count is recounted for posts that lost comments. Organizer content is protected
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_moderate_remove_user_content(
+    p_community_id UUID,
+    p_moderator_user_id UUID,
+    p_target_user_id UUID,
+    p_since TIMESTAMP WITH TIME ZONE,
+    p_until TIMESTAMP WITH TIME ZONE
+) RETURNS TABLE(
+    posts_removed INT,
+    comments_removed INT,
+    reactions_removed INT,
+    posts_recounted INT,
+    removed_at TIMESTAMP WITH TIME ZONE
+) AS $$
+DECLARE
+    v_removed_at TIMESTAMP WITH TIME ZONE;
+    v_posts_removed INT;
+    v_comments_removed INT;
+    v_reactions_removed INT;
+    v_posts_recounted INT;
+    v_pinned_removed BOOLEAN;
+    v_comment_post_ids UUID[];
+    v_reaction_post_ids UUID[];
+BEGIN
+    -- 1. Validate community exists
+    IF NOT EXISTS (SELECT 1 FROM activity.communities c WHERE c.community_id = p_community_id) THEN
+        RAISE EXCEPTION 'COMMUNITY_NOT_FOUND';
+    END IF;
+
+    -- 2. Check moderator is an active organizer
+    IF NOT EXISTS (
+        SELECT 1 FROM activity.community_members cm
+        WHERE cm.community_id = p_community_id
+        AND cm.user_id = p_moderator_user_id
+        AND cm.role = 'organizer'
+        AND cm.status = 'active'
+    ) THEN
+        RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+    END IF;
+
+    -- 3. Validate target (organizers can't be moderated by each other)
+    IF NOT EXISTS (SELECT 1 FROM activity.users u WHERE u.user_id = p_target_user_id) THEN
+        RAISE EXCEPTION 'USER_NOT_FOUND';
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM activity.community_members cm
+        WHERE cm.community_id = p_community_id
+        AND cm.user_id = p_target_user_id
+        AND cm.role = 'organizer'
+    ) THEN
+        RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+    END IF;
+
+    v_removed_at := NOW();
+
+    -- 4. Posts (soft delete, like sp_community_post_delete)
+    WITH removed AS (
+        UPDATE activity.posts p
+        SET status = 'removed', updated_at = v_removed_at
+        WHERE p.community_id = p_community_id
+        AND p.author_user_id = p_target_user_id
+        AND p.status != 'removed'
+        AND (p_since IS NULL OR p.created_at >= p_since)
+        AND (p_until IS NULL OR p.created_at < p_until)
+        RETURNING p.post_id, p.is_pinned
+    )
+    SELECT COUNT(*)::INT, COALESCE(bool_or(removed.is_pinned), FALSE)
+    INTO v_posts_removed, v_pinned_removed
+    FROM removed;
+
+    -- 5. Comments on any post in the community
+    WITH removed AS (
+        UPDATE activity.comments c
+        SET is_deleted = TRUE, updated_at = v_removed_at
+        FROM activity.posts p
+        WHERE p.post_id = c.post_id
+        AND p.community_id = p_community_id
+        AND c.author_user_id = p_target_user_id
+        AND NOT c.is_deleted
+        AND (p_since IS NULL OR c.created_at >= p_since)
+        AND (p_until IS NULL OR c.created_at < p_until)
+        RETURNING c.post_id
+    )
+    SELECT COUNT(*)::INT, array_agg(DISTINCT removed.post_id)
+    INTO v_comments_removed, v_comment_post_ids
+    FROM removed;
+
+    -- 6. Reactions, with per-type and total counters adjusted once per target
+    WITH removed AS (
+        DELETE FROM activity.reactions r
+        WHERE r.user_id = p_target_user_id
+        AND (p_since IS NULL OR r.created_at >= p_since)
+        AND (p_until IS NULL OR r.created_at < p_until)
+        AND (
+            (r.target_type = 'post' AND EXISTS (
+                SELECT 1 FROM activity.posts p
+                WHERE p.post_id = r.target_id
+                AND p.community_id = p_community_id
+            ))
+            OR (r.target_type = 'comment' AND EXISTS (
+                SELECT 1 FROM activity.comments c
+                JOIN activity.posts p ON p.post_id = c.post_id
+                WHERE c.comment_id = r.target_id
+                AND p.community_id = p_community_id
+            ))
+        )
+        RETURNING r.target_type, r.target_id, r.reaction_type
+    ),
+    per_type AS (
+        UPDATE activity.reaction_counts rc
+        SET count = GREATEST(rc.count - d.removed_count, 0)
+        FROM (
+            SELECT removed.target_type, removed.target_id, removed.reaction_type, COUNT(*)::INT as removed_count
+            FROM removed
+            GROUP BY removed.target_type, removed.target_id, removed.reaction_type
+        ) d
+        WHERE rc.target_type = d.target_type
+        AND rc.target_id = d.target_id
+        AND rc.reaction_type = d.reaction_type
+    ),
+    post_totals AS (
+        UPDATE activity.posts p
+        SET reaction_count = GREATEST(p.reaction_count - d.removed_count, 0)
+        FROM (
+            SELECT removed.target_id, COUNT(*)::INT as removed_count
+            FROM removed
+            WHERE removed.target_type = 'post'
+            GROUP BY removed.target_id
+        ) d
+        WHERE p.post_id = d.target_id
+    ),
+    comment_totals AS (
+        UPDATE activity.comments c
+        SET reaction_count = GREATEST(c.reaction_count - d.removed_count, 0)
+        FROM (
+            SELECT removed.target_id, COUNT(*)::INT as removed_count
+            FROM removed
+            WHERE removed.target_type = 'comment'
+            GROUP BY removed.target_id
+        ) d
+        WHERE c.comment_id = d.target_id
+        RETURNING c.post_id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM removed)::INT,
+        (SELECT array_agg(DISTINCT ct.post_id) FROM comment_totals ct)
+    INTO v_reactions_removed, v_reaction_post_ids;
+
+    -- 7. Recount comment_count once per post that lost comments
+    UPDATE activity.posts p
+    SET comment_count = (
+        SELECT COUNT(*) FROM activity.comments c
+        WHERE c.post_id = p.post_id
+        AND NOT c.is_deleted
+    )
+    WHERE p.post_id = ANY(v_comment_post_ids);
+
+    GET DIAGNOSTICS v_posts_recounted = ROW_COUNT;
+
+    -- 8. Invalidate conditional-GET validators
+    PERFORM activity.fn_bump_content_version('feed', p_community_id);
+    PERFORM activity.fn_bump_content_version('comments', affected.post_id)
+    FROM (
+        SELECT DISTINCT u.post_id
+        FROM unnest(v_comment_post_ids || v_reaction_post_ids) AS u(post_id)
+    ) affected;
+    IF v_pinned_removed THEN
+        PERFORM activity.fn_notify_pinned_changed(p_community_id);
+    END IF;
+
+    -- 9. Outbox event (relayed after commit)
+    PERFORM activity.fn_enqueue_event('user_content_removed', p_community_id, jsonb_build_object(
+        'community_id', p_community_id,
+        'user_id', p_target_user_id,
+        'moderator_user_id', p_moderator_user_id,
+        'posts_removed', v_posts_removed,
+        'comments_removed', v_comments_removed,
+        'reactions_removed', v_reactions_removed,
+        'since', p_since,
+        'until', p_until,
+        'removed_at', v_removed_at
+    ));
+
+    RETURN QUERY
+    SELECT v_posts_removed, v_comments_removed, v_reactions_removed, v_posts_recounted, v_removed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP36: Get Pinned Posts
+-- Purpose: Pinned section of a community feed (a handful of posts, cached per community by the API)
+-- Note: No access check: only called after sp_community_post_get_feed has checked the caller.
+--       Served by the idx_posts_pinned partial index
+-- =============================================================================
+CREATE INDEX IF NOT EXISTS idx_posts_pinned ON activity.posts(community_id, created_at DESC)
+WHERE is_pinned AND status = 'published';
+
+CREATE OR REPLACE FUNCTION activity.sp_community_post_get_pinned(
+    p_community_id UUID,
+    p_limit INT DEFAULT 10
+) RETURNS TABLE(
+    post_id UUID,
+    author_user_id UUID,
+    activity_id UUID,
+    title VARCHAR(500),
+    content TEXT,
+    content_type activity.content_type,
+    view_count INT,
+    comment_count INT,
+    reaction_count INT,
+    is_pinned BOOLEAN,
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.post_id,
+        p.author_user_id,
+        p.activity_id,
+        p.title,
+        p.content,
+        p.content_type,
+        p.view_count,
+        p.comment_count,
+        p.reaction_count,
+        p.is_pinned,
+        p.created_at,
+        p.updated_at
+    FROM activity.posts p
+    WHERE p.community_id = p_community_id
+    AND p.is_pinned
+    AND p.status = 'published'
+    ORDER BY p.created_at DESC
+    LIMIT p_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP37: Pin / Unpin Post
+-- Purpose: Pin a post to the top of its community feed, or unpin it (organizers only)
+-- Note: At most p_max_pinned published posts are pinned per community (the pinned section's
+--       size, PINNED_POSTS_LIMIT): the feed leaves pinned posts out, so more would show nowhere.
+--       Pins are serialized per community by locking the community row
+-- =============================================================================
+DROP FUNCTION IF EXISTS activity.sp_community_post_set_pinned(UUID, UUID, BOOLEAN);
+CREATE OR REPLACE FUNCTION activity.sp_community_post_set_pinned(
+    p_post_id UUID,
+    p_user_id UUID,
+    p_is_pinned BOOLEAN,
+    p_max_pinned INT DEFAULT 10
+) RETURNS TABLE(
+    post_id UUID,
+    is_pinned BOOLEAN,
+    updated_at TIMESTAMP WITH TIME ZONE
+) AS $$
+DECLARE
+    v_community_id UUID;
+    v_status activity.content_status;
+    v_was_pinned BOOLEAN;
+    v_updated_at TIMESTAMP WITH TIME ZONE;
+BEGIN
+    -- 1. Get post details
+    SELECT p.community_id, p.status, p.is_pinned, p.updated_at
+    INTO v_community_id, v_status, v_was_pinned, v_updated_at
+    FROM activity.posts p
+    WHERE p.post_id = p_post_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'POST_NOT_FOUND';
+    END IF;
+
+    IF v_status != 'published' THEN
+        RAISE EXCEPTION 'POST_NOT_PUBLISHED';
+    END IF;
+
+    -- 2. Check user is an active organizer
+    IF NOT EXISTS (
+        SELECT 1 FROM activity.community_members cm
+        WHERE cm.community_id = v_community_id
+        AND cm.user_id = p_user_id
+        AND cm.role = 'organizer'
+        AND cm.status = 'active'
+    ) THEN
+        RAISE EXCEPTION 'INSUFFICIENT_PERMISSIONS';
+    END IF;
+
+    -- 3. Enforce the cap on new pins
+    IF p_is_pinned AND NOT v_was_pinned THEN
+        PERFORM 1 FROM activity.communities c
+        WHERE c.community_id = v_community_id
+        FOR UPDATE;
+
+        IF (
+            SELECT COUNT(*) FROM activity.posts p
+            WHERE p.community_id = v_community_id
+            AND p.is_pinned
+            AND p.status = 'published'
+        ) >= p_max_pinned THEN
+            RAISE EXCEPTION 'PINNED_LIMIT_REACHED';
+        END IF;
+    END IF;
+
+    -- 4. Update only on change (repeated calls are no-ops)
+    IF v_was_pinned != p_is_pinned THEN
+        v_updated_at := NOW();
+        UPDATE activity.posts
+        SET is_pinned = p_is_pinned, updated_at = v_updated_at
+        WHERE posts.post_id = p_post_id;
+
+        PERFORM activity.fn_bump_content_version('feed', v_community_id);
+        PERFORM activity.fn_notify_pinned_changed(v_community_id);
+    END IF;
+
+    -- 5. Return pin state
+    RETURN QUERY
+    SELECT p_post_id, p_is_pinned, v_updated_at;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP38: Get Community Post Feed (JSON)
+-- Purpose: One page of sp_community_post_get_feed as a single JSON array, authors and reactions
+--          included, so the API can send it without decoding rows (DB_JSON_LISTS)
+-- Note: Wraps SP11 (same checks, count and order). Authors and reactions come from the same
+--       batched lookups as the API hydration (SP19, SP26), run once over the
+--       page's IDs. Items match PostListItem; posts whose author no longer exists are left out.
+--       On an empty page total_count is 0, or NULL with p_count_mode 'none'
+-- =============================================================================
+DROP FUNCTION IF EXISTS activity.fn_reaction_counts_json(VARCHAR, UUID);
+CREATE OR REPLACE FUNCTION activity.sp_community_post_get_feed_json(
+    p_community_id UUID,
+    p_requesting_user_id UUID,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000
+) RETURNS TABLE(
+    items TEXT,
+    total_count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH page AS MATERIALIZED (
+        SELECT f.*
+        FROM activity.sp_community_post_get_feed(
+            p_community_id, p_requesting_user_id, p_limit, p_offset, p_count_mode, p_count_cap
+        ) WITH ORDINALITY f
+    ),
+    authors AS (
+        SELECT s.*
+        FROM activity.sp_community_get_user_snippets(
+            ARRAY(SELECT DISTINCT pg.author_user_id FROM page pg)
+        ) s
+    ),
+    reactions AS (
+        SELECT
+            rs.target_id,
+            json_object_agg(rs.reaction_type, rs.reaction_count) as counts,
+            (array_agg(rs.reaction_type) FILTER (WHERE rs.is_viewer_reaction))[1] as viewer_reaction
+        FROM activity.sp_community_get_reaction_summaries(
+            'post', ARRAY(SELECT pg.post_id FROM page pg), p_requesting_user_id
+        ) rs
+        GROUP BY rs.target_id
+    )
+    SELECT
+        COALESCE(json_agg(json_build_object(
+            'post_id', f.post_id,
+            'author_user_id', f.author_user_id,
+            'author_username', a.username,
+            'author_first_name', a.first_name,
+            'author_main_photo_url', a.main_photo_url,
+            'activity_id', f.activity_id,
+            'title', f.title,
+            'content', f.content,
+            'content_type', f.content_type,
+            'view_count', f.view_count,
+            'comment_count', f.comment_count,
+            'reaction_count', f.reaction_count,
+            'is_pinned', f.is_pinned,
+            'created_at', f.created_at,
+            'updated_at', f.updated_at,
+            'reaction_counts', COALESCE(rx.counts, '{}'::JSON),
+            'viewer_reaction', rx.viewer_reaction
+        ) ORDER BY f.ordinality) FILTER (WHERE a.user_id IS NOT NULL), '[]'::JSON)::TEXT,
+        CASE WHEN p_count_mode = 'none' THEN NULL ELSE COALESCE(MAX(f.total_count), 0) END
+    FROM page f
+    LEFT JOIN authors a ON a.user_id = f.author_user_id
+    LEFT JOIN reactions rx ON rx.target_id = f.post_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP39: Get Post Comments (JSON)
+-- Purpose: One page of sp_community_post_get_comments as a single JSON array (DB_JSON_LISTS)
+-- Note: Wraps SP15, asking it for p_limit + 1 rows: has_more says whether there is a next page and
+--       last_created_at/last_comment_id are the keyset of the page's last item (for the cursor).
+--       Authors, reactions and total_count as in SP38
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_post_get_comments_json(
+    p_post_id UUID,
+    p_parent_comment_id UUID,
+    p_requesting_user_id UUID,
+    p_limit INT DEFAULT 50,
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000,
+    p_after_created_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_after_comment_id UUID DEFAULT NULL
+) RETURNS TABLE(
+    items TEXT,
+    total_count BIGINT,
+    has_more BOOLEAN,
+    last_created_at TIMESTAMP WITH TIME ZONE,
+    last_comment_id UUID
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH page AS MATERIALIZED (
+        SELECT f.*
+        FROM activity.sp_community_post_get_comments(
+            p_post_id, p_parent_comment_id, p_limit + 1, p_offset, p_count_mode, p_count_cap,
+            p_after_created_at, p_after_comment_id
+        ) WITH ORDINALITY f
+    ),
+    authors AS (
+        SELECT s.*
+        FROM activity.sp_community_get_user_snippets(
+            ARRAY(SELECT DISTINCT pg.author_user_id FROM page pg WHERE pg.ordinality <= p_limit)
+        ) s
+    ),
+    reactions AS (
+        SELECT
+            rs.target_id,
+            json_object_agg(rs.reaction_type, rs.reaction_count) as counts,
+            (array_agg(rs.reaction_type) FILTER (WHERE rs.is_viewer_reaction))[1] as viewer_reaction
+        FROM activity.sp_community_get_reaction_summaries(
+            'comment', ARRAY(SELECT pg.comment_id FROM page pg WHERE pg.ordinality <= p_limit),
+            p_requesting_user_id
+        ) rs
+        GROUP BY rs.target_id
+    )
+    SELECT
+        COALESCE(json_agg(json_build_object(
+            'comment_id', f.comment_id,
+            'parent_comment_id', f.parent_comment_id,
+            'author_user_id', f.author_user_id,
+            'author_username', a.username,
+            'author_first_name', a.first_name,
+            'author_main_photo_url', a.main_photo_url,
+            'content', f.content,
+            'reaction_count', f.reaction_count,
+            'is_deleted', f.is_deleted,
+            'created_at', f.created_at,
+            'updated_at', f.updated_at,
+            'reaction_counts', COALESCE(rx.counts, '{}'::JSON),
+            'viewer_reaction', rx.viewer_reaction
+        ) ORDER BY f.ordinality) FILTER (WHERE a.user_id IS NOT NULL AND f.ordinality <= p_limit), '[]'::JSON)::TEXT,
+        CASE WHEN p_count_mode = 'none' THEN NULL ELSE COALESCE(MAX(f.total_count), 0) END,
+        COUNT(*) > p_limit,
+        MAX(f.created_at) FILTER (WHERE f.ordinality = p_limit),
+        (array_agg(f.comment_id) FILTER (WHERE f.ordinality = p_limit))[1]
+    FROM page f
+    LEFT JOIN authors a ON a.user_id = f.author_user_id
+    LEFT JOIN reactions rx ON rx.target_id = f.comment_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SP40: Get Community Members (JSON)
+-- Purpose: One page of sp_community_get_members as a single JSON array (DB_JSON_LISTS)
+-- Note: Wraps SP6, asking it for p_limit + 1 rows (has_more, last_* keyset as in SP39).
+--       Profiles come from one batched sp_community_get_user_snippets call; total_count as in SP38
+-- =============================================================================
+CREATE OR REPLACE FUNCTION activity.sp_community_get_members_json(
+    p_community_id UUID,
+    p_requesting_user_id UUID,
+    p_limit INT DEFAULT 50,
+    p_offset INT DEFAULT 0,
+    p_count_mode VARCHAR(10) DEFAULT 'exact',
+    p_count_cap INT DEFAULT 1000,
+    p_role activity.participant_role DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_after_role activity.participant_role DEFAULT NULL,
+    p_after_joined_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_after_user_id UUID DEFAULT NULL
+) RETURNS TABLE(
+    items TEXT,
+    total_count BIGINT,
+    has_more BOOLEAN,
+    last_role activity.participant_role,
+    last_joined_at TIMESTAMP WITH TIME ZONE,
+    last_user_id UUID
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH page AS MATERIALIZED (
+        SELECT f.*
+        FROM activity.sp_community_get_members(
+            p_community_id, p_requesting_user_id, p_limit + 1, p_offset, p_count_mode, p_count_cap,
+            p_role, p_search, p_after_role, p_after_joined_at, p_after_user_id
+        ) WITH ORDINALITY f
+    ),
+    profiles AS (
+        SELECT s.*
+        FROM activity.sp_community_get_user_snippets(
+            ARRAY(SELECT pg.user_id FROM page pg WHERE pg.ordinality <= p_limit)
+        ) s
+    )
+    SELECT
+        COALESCE(json_agg(json_build_object(
+            'user_id', f.user_id,
+            'username', pr.username,
+            'first_name', pr.first_name,
+            'last_name', pr.last_name,
+            'main_photo_url', pr.main_photo_url,
+            'role', f.role,
+            'status', f.status,
+            'joined_at', f.joined_at,
+            'is_verified', pr.is_verified
+        ) ORDER BY f.ordinality) FILTER (WHERE pr.user_id IS NOT NULL AND f.ordinality <= p_limit), '[]'::JSON)::TEXT,
+        CASE WHEN p_count_mode = 'none' THEN NULL ELSE COALESCE(MAX(f.total_count), 0) END,
+        COUNT(*) > p_limit,
+        MAX(f.role) FILTER (WHERE f.ordinality = p_limit),
+        MAX(f.joined_at) FILTER (WHERE f.ordinality = p_limit),
+        (array_agg(f.user_id) FILTER (WHERE f.ordinality = p_limit))[1]
+    FROM page f
+    LEFT JOIN profiles pr ON pr.user_id = f.user_id;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =============================================================================
 -- END OF STORED PROCEDURES
 -- =============================================================================
@@ -3,6 +3,7 @@ import asyncio
 from httpx import AsyncClient
 from app.main import app
 from app.core.database import db
+from app.core.health import health_monitor
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -18,5 +19,7 @@ async def client():
 @pytest.fixture(scope="session", autouse=True)
 async def setup_database():
     await db.connect()
+    # The client doesn't run the lifespan: take one health sample so /health reflects the database
+    await health_monitor.run_checks()
     yield
     await db.disconnect()
@@ -9,6 +9,18 @@ async def test_health_check(client: AsyncClient):
     assert data["status"] in ["ok", "degraded"]
     assert "checks" in data
 
+@pytest.mark.asyncio
+async def test_liveness(client: AsyncClient):
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+@pytest.mark.asyncio
+async def test_readiness(client: AsyncClient):
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
 @pytest.mark.asyncio
 async def test_root_endpoint(client: AsyncClient):
     response = await client.get("/")
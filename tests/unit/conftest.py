@@ -0,0 +1,20 @@
+import types
+
+import pytest
+
+# Unit tests exercise pure logic with fakes: no database connection needed
+@pytest.fixture(scope="session", autouse=True)
+def setup_database():
+    yield
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    Hand-driven monotonic clock (`clock[0] += 61`), installed as `time` in the test module's
+    CLOCKED_MODULE. The real time.monotonic is left alone: the event loop relies on it
+    """
+    now = [1000.0]
+    monkeypatch.setattr(
+        request.module.CLOCKED_MODULE, "time", types.SimpleNamespace(monotonic=lambda: now[0])
+    )
+    return now
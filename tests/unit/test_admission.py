@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.core import admission as admission_module
+from app.core.admission import EXPENSIVE, READ, WRITE, AdmissionController
+
+CLOCKED_MODULE = admission_module
+
+@pytest.fixture
+def settings(monkeypatch):
+    values = {
+        "ADMISSION_INITIAL_LIMIT": 10,
+        "ADMISSION_MIN_LIMIT": 2,
+        "ADMISSION_MAX_LIMIT": 20,
+        "ADMISSION_QUEUE_SIZE": 2,
+        "ADMISSION_QUEUE_TIMEOUT_SECONDS": 0.05,
+        "ADMISSION_LATENCY_TARGET_MS": 100,
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(admission_module.settings, name, value)
+    return values
+
+async def fill(controller, count, priority=READ):
+    for _ in range(count):
+        assert await controller.acquire(priority)
+
+@pytest.mark.asyncio
+async def test_admits_up_to_each_class_share(settings):
+    controller = AdmissionController()
+    await fill(controller, 5)
+
+    # Expensive calls may use half the limit, and are never queued
+    assert not await controller.acquire(EXPENSIVE)
+    assert controller.rejected[EXPENSIVE] == 1
+
+    await fill(controller, 4, WRITE)
+    assert controller.in_flight == 9
+
+@pytest.mark.asyncio
+async def test_queued_request_gets_the_released_slot(settings):
+    controller = AdmissionController()
+    await fill(controller, 10)
+
+    waiting = asyncio.create_task(controller.acquire(READ))
+    await asyncio.sleep(0)
+    controller.release()
+
+    assert await waiting
+    assert controller.in_flight == 10
+
+@pytest.mark.asyncio
+async def test_reads_are_served_before_writes(settings):
+    controller = AdmissionController()
+    await fill(controller, 10)
+    order = []
+
+    async def wait(priority):
+        await controller.acquire(priority)
+        order.append(priority)
+
+    write = asyncio.create_task(wait(WRITE))
+    await asyncio.sleep(0)
+    read = asyncio.create_task(wait(READ))
+    await asyncio.sleep(0)
+    controller.release()
+    controller.release()
+    await asyncio.gather(write, read)
+
+    assert order == [READ, WRITE]
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_full_queue_reject(settings):
+    controller = AdmissionController()
+    await fill(controller, 10)
+
+    first = asyncio.create_task(controller.acquire(READ))
+    second = asyncio.create_task(controller.acquire(READ))
+    await asyncio.sleep(0)
+    assert not await controller.acquire(READ)  # queue full
+
+    assert await asyncio.gather(first, second) == [False, False]  # timed out
+    assert controller.rejected[READ] == 3
+    assert controller._queued() == 0
+
+@pytest.mark.asyncio
+async def test_slow_calls_shrink_the_limit_down_to_the_minimum(settings, clock):
+    controller = AdmissionController()
+
+    for _ in range(50):
+        clock[0] += 1
+        controller.observe_latency(0.5)
+
+    assert controller.limit == settings["ADMISSION_MIN_LIMIT"]
+
+@pytest.mark.asyncio
+async def test_backoff_is_spaced_out(settings, clock):
+    controller = AdmissionController()
+
+    controller.observe_latency(0.5)
+    controller.observe_latency(0.5)
+
+    assert controller.limit == pytest.approx(9.0)
+
+@pytest.mark.asyncio
+async def test_fast_calls_grow_the_limit_only_while_it_is_in_use(settings):
+    controller = AdmissionController()
+
+    controller.observe_latency(0.01)
+    assert controller.limit == 10
+
+    await fill(controller, 8)
+    controller.observe_latency(0.01)
+    assert controller.limit == pytest.approx(10.1)
+
+@pytest.mark.asyncio
+async def test_reads_are_not_held_behind_queued_writes(settings):
+    controller = AdmissionController()
+    await fill(controller, 9, WRITE)
+
+    write = asyncio.create_task(controller.acquire(WRITE))  # Over the write share: queued
+    await asyncio.sleep(0)
+
+    assert await controller.acquire(READ)
+    assert controller.in_flight == 10
+    assert not await write
+
+@pytest.mark.asyncio
+async def test_raising_the_limit_wakes_queued_requests(settings):
+    controller = AdmissionController()
+    await fill(controller, 10)
+
+    waiting = asyncio.create_task(controller.acquire(READ))
+    await asyncio.sleep(0)
+    for _ in range(15):
+        controller.observe_latency(0.01)
+
+    assert await waiting
+    assert controller.in_flight == 11
@@ -0,0 +1,107 @@
+import types
+from uuid import uuid4
+
+import pytest
+
+from app.services import author_cache as author_cache_module
+from app.services.author_cache import AuthorCache, author_fields
+
+CLOCKED_MODULE = author_cache_module
+
+def _snippet(user_id, username):
+    return {
+        "user_id": user_id,
+        "username": username,
+        "first_name": None,
+        "last_name": None,
+        "main_photo_url": None,
+        "is_verified": False,
+    }
+
+@pytest.fixture
+def procedure(monkeypatch):
+    """Fake sp_community_get_user_snippets: records requested IDs, knows only `users`"""
+    calls = []
+    users = {}
+
+    async def execute(db, name, timeout=None, p_user_ids=()):
+        calls.append(sorted(p_user_ids))
+        return [_snippet(user_id, users[user_id]) for user_id in p_user_ids if user_id in users]
+
+    monkeypatch.setattr(author_cache_module, "execute_stored_procedure", execute)
+    return types.SimpleNamespace(calls=calls, users=users)
+
+@pytest.mark.asyncio
+async def test_misses_are_fetched_in_one_batch_and_then_served_from_memory(clock, procedure):
+    a, b = uuid4(), uuid4()
+    procedure.users.update({a: "anna", b: "bram"})
+    cache = AuthorCache(max_size=10, ttl_seconds=60)
+
+    first = await cache.get_many(None, [a, b, a])
+    second = await cache.get_many(None, [a, b])
+
+    assert procedure.calls == [sorted([a, b])]
+    assert first[a]["username"] == "anna" and second[b]["username"] == "bram"
+    assert (cache.hits, cache.misses) == (2, 2)
+
+@pytest.mark.asyncio
+async def test_unknown_users_are_omitted(clock, procedure):
+    known, unknown = uuid4(), uuid4()
+    procedure.users[known] = "anna"
+    cache = AuthorCache(max_size=10, ttl_seconds=60)
+
+    found = await cache.get_many(None, [known, unknown])
+
+    assert set(found) == {known}
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(clock, procedure):
+    a = uuid4()
+    procedure.users[a] = "anna"
+    cache = AuthorCache(max_size=10, ttl_seconds=60)
+
+    await cache.get_many(None, [a])
+    clock[0] += 59
+    await cache.get_many(None, [a])
+    clock[0] += 1
+    await cache.get_many(None, [a])
+
+    assert len(procedure.calls) == 2
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted(clock, procedure):
+    a, b, c = uuid4(), uuid4(), uuid4()
+    procedure.users.update({a: "anna", b: "bram", c: "chen"})
+    cache = AuthorCache(max_size=2, ttl_seconds=60)
+
+    await cache.get_many(None, [a])
+    await cache.get_many(None, [b])
+    await cache.get_many(None, [a])  # a is now the most recently used
+    await cache.get_many(None, [c])  # evicts b
+    procedure.calls.clear()
+
+    await cache.get_many(None, [a, b])
+
+    assert procedure.calls == [[b]]
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_one_profile(clock, procedure):
+    a, b = uuid4(), uuid4()
+    procedure.users.update({a: "anna", b: "bram"})
+    cache = AuthorCache(max_size=10, ttl_seconds=60)
+    await cache.get_many(None, [a, b])
+    procedure.calls.clear()
+
+    cache.invalidate(a)
+    await cache.get_many(None, [a, b])
+
+    assert procedure.calls == [[a]]
+
+def test_author_fields_maps_snippet_onto_list_item_fields():
+    snippet = {"username": "anna", "first_name": "Anna", "main_photo_url": "https://x/a.jpg"}
+
+    assert author_fields(snippet) == {
+        "author_username": "anna",
+        "author_first_name": "Anna",
+        "author_main_photo_url": "https://x/a.jpg",
+    }
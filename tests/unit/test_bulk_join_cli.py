@@ -0,0 +1,82 @@
+import io
+import types
+from uuid import UUID
+
+import pytest
+
+from app.cli import bulk_join
+from app.cli.bulk_join import batched, read_user_ids
+
+A = "5b1d7c2e-8f3a-4e6b-9c0d-1a2b3c4d5e6f"
+B = "0b7c8e0e-2f7d-4f0a-8d0e-7c5e6b1a9f33"
+
+def test_read_user_ids_skips_blank_lines_and_comments():
+    source = io.StringIO(f"# exported members\n{A}\n\n  {B}  \n")
+
+    assert list(read_user_ids(source)) == [UUID(A), UUID(B)]
+
+def test_read_user_ids_reports_the_bad_line():
+    source = io.StringIO(f"{A}\nnot-a-uuid\n")
+
+    with pytest.raises(SystemExit, match="line 2: not a UUID: 'not-a-uuid'"):
+        list(read_user_ids(source))
+
+def test_batched_splits_with_a_short_last_batch():
+    assert list(batched(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched(iter(range(4)), 2)) == [[0, 1], [2, 3]]
+
+def test_batched_empty_input_yields_nothing():
+    assert list(batched(iter([]), 3)) == []
+
+class FakeConnection:
+    def __init__(self, events, name):
+        self.events, self.name = events, name
+
+    async def connect(self):
+        self.events.append(f"{self.name} connect")
+
+    async def disconnect(self):
+        self.events.append(f"{self.name} disconnect")
+
+@pytest.fixture
+def cli(monkeypatch):
+    """Fake database, Redis and services; B is already a member"""
+    state = types.SimpleNamespace(events=[], invalidated=[])
+
+    class FakeCommunityService:
+        def __init__(self, db):
+            pass
+
+        async def bulk_join_community(self, community_id, requesting_user_id, user_ids):
+            rows = [
+                types.SimpleNamespace(user_id=u, outcome="already_member" if u == UUID(B) else "joined")
+                for u in user_ids
+            ]
+            joined = sum(row.outcome == "joined" for row in rows)
+            return types.SimpleNamespace(
+                results=rows, requested=len(rows), joined=joined,
+                already_member=len(rows) - joined, user_not_found=0, community_full=0,
+            )
+
+    class FakeTimelineService:
+        def __init__(self, db):
+            pass
+
+        async def invalidate(self, user_ids):
+            state.invalidated.append(list(user_ids))
+
+    monkeypatch.setattr(bulk_join, "db", FakeConnection(state.events, "db"))
+    monkeypatch.setattr(bulk_join, "redis_client", FakeConnection(state.events, "redis"))
+    monkeypatch.setattr(bulk_join, "CommunityService", FakeCommunityService)
+    monkeypatch.setattr(bulk_join, "TimelineService", FakeTimelineService)
+    return state
+
+@pytest.mark.asyncio
+async def test_run_invalidates_timelines_of_joined_users_per_batch(cli, capsys):
+    source = io.StringIO(f"{A}\n{B}\n")
+
+    assert await bulk_join.run(UUID(A), source, batch_size=1, details=False) == 0
+
+    assert cli.invalidated == [[UUID(A)], []]
+    assert cli.events == ["db connect", "redis connect", "redis disconnect", "db disconnect"]
+    assert "requested=2, joined=1, already_member=1" in capsys.readouterr().err
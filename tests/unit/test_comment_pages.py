@@ -0,0 +1,103 @@
+import types
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import comment_service as comment_service_module
+from app.services.comment_service import CommentService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+AUTHOR = uuid4()
+
+def _comment(minutes, total_count=7):
+    return {
+        "comment_id": UUID(int=minutes + 1),
+        "parent_comment_id": None,
+        "author_user_id": AUTHOR,
+        "content": f"comment {minutes}",
+        "reaction_count": 0,
+        "is_deleted": False,
+        "created_at": START + timedelta(minutes=minutes),
+        "updated_at": START + timedelta(minutes=minutes),
+        "total_count": total_count,
+    }
+
+@pytest.fixture
+def procedure(monkeypatch):
+    """Fake sp_community_post_get_comments: returns `rows`, records the arguments"""
+    state = types.SimpleNamespace(rows=[], calls=[])
+
+    async def execute(db, name, timeout=None, **kwargs):
+        state.calls.append(kwargs)
+        return state.rows[:kwargs["p_limit"]]
+
+    async def get_many(db, user_ids):
+        return {user_id: {"username": "anna", "first_name": None, "main_photo_url": None} for user_id in user_ids}
+
+    monkeypatch.setattr(comment_service_module, "execute_stored_procedure", execute)
+    monkeypatch.setattr(comment_service_module, "author_cache", types.SimpleNamespace(get_many=get_many))
+    return state
+
+@pytest.fixture
+def service():
+    service = CommentService(None)
+
+    async def get_reaction_summaries(target_type, target_ids, viewer_user_id):
+        return {target_id: {"reaction_counts": {}, "viewer_reaction": None} for target_id in target_ids}
+
+    service.reactions = types.SimpleNamespace(get_reaction_summaries=get_reaction_summaries)
+    return service
+
+def test_cursor_round_trips():
+    comment_id = uuid4()
+    cursor = encode_cursor(t=START.isoformat(), id=comment_id)
+
+    assert CommentService(None)._parse_cursor(cursor) == (START, comment_id)
+
+@pytest.mark.parametrize("fields", [{"t": "yesterday", "id": str(UUID(int=1))}, {"t": START.isoformat()}, {"t": START.isoformat(), "id": "x"}])
+def test_malformed_cursor_is_rejected(fields):
+    with pytest.raises(HTTPException) as raised:
+        CommentService(None)._parse_cursor(encode_cursor(**fields))
+    assert raised.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_full_page_returns_a_cursor_after_its_last_row(procedure, service):
+    procedure.rows = [_comment(m) for m in range(3)]
+
+    comments, total_count, next_cursor = await service.get_comments(uuid4(), None, limit=2)
+
+    assert [c.content for c in comments] == ["comment 0", "comment 1"]
+    assert total_count == 7
+    assert procedure.calls[0]["p_limit"] == 3  # One extra row tells there is a next page
+    assert decode_cursor(next_cursor) == {"t": comments[-1].created_at.isoformat(), "id": str(UUID(int=2))}
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(procedure, service):
+    procedure.rows = [_comment(m) for m in range(2)]
+
+    comments, _, next_cursor = await service.get_comments(uuid4(), None, limit=2)
+
+    assert len(comments) == 2
+    assert next_cursor is None
+
+@pytest.mark.asyncio
+async def test_keyset_page_continues_after_the_cursor_without_counting(procedure, service):
+    procedure.rows = [_comment(m, total_count=None) for m in range(5, 7)]
+    cursor = encode_cursor(t=(START + timedelta(minutes=4)).isoformat(), id=UUID(int=5))
+
+    _, total_count, _ = await service.get_comments(uuid4(), None, limit=2, after=cursor)
+
+    call = procedure.calls[0]
+    assert call["p_after_created_at"] == START + timedelta(minutes=4)
+    assert call["p_after_comment_id"] == UUID(int=5)
+    assert call["p_count_mode"] == "none"
+    assert total_count is None
+
+@pytest.mark.asyncio
+async def test_empty_keyset_page_reports_no_count(procedure, service):
+    cursor = encode_cursor(t=START.isoformat(), id=UUID(int=1))
+
+    assert await service.get_comments(uuid4(), None, after=cursor) == ([], None, None)
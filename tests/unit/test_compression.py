@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from app.utils import compression
+from app.utils.compression import IDENTITY, choose_encoding, compress, negotiate_encoding
+
+@pytest.fixture(params=[True, False], ids=["brotli", "no-brotli"])
+def brotli_installed(request, monkeypatch):
+    if request.param and compression.brotli is None:
+        pytest.skip("brotli not installed")
+    if not request.param:
+        monkeypatch.setattr(compression, "brotli", None)
+    return request.param
+
+def test_prefers_brotli_then_gzip(brotli_installed):
+    expected = "br" if brotli_installed else "gzip"
+
+    assert negotiate_encoding("gzip, deflate, br") == expected
+    assert negotiate_encoding("br;q=0.5, gzip;q=1.0") == expected
+
+def test_zero_quality_excludes_an_encoding(brotli_installed):
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0") == IDENTITY
+
+def test_wildcard_and_malformed_quality():
+    assert negotiate_encoding("*") in ("br", "gzip")
+    assert negotiate_encoding("*;q=0") == IDENTITY
+    assert negotiate_encoding("gzip;q=abc") == IDENTITY
+
+def test_no_or_unsupported_encodings_fall_back_to_identity():
+    assert negotiate_encoding("") == IDENTITY
+    assert negotiate_encoding("deflate, compress") == IDENTITY
+
+def test_small_bodies_are_not_compressed(monkeypatch):
+    monkeypatch.setattr(compression.settings, "COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(compression.settings, "COMPRESSION_MIN_SIZE", 1024)
+
+    assert choose_encoding("gzip", 1023) == IDENTITY
+    assert choose_encoding("gzip", 1024) in ("br", "gzip")
+
+def test_disabled_compression_always_uses_identity(monkeypatch):
+    monkeypatch.setattr(compression.settings, "COMPRESSION_ENABLED", False)
+
+    assert choose_encoding("gzip, br", 10_000_000) == IDENTITY
+
+def test_gzip_output_round_trips_and_is_deterministic():
+    body = b'{"posts":[]}' * 100
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert compress(body, IDENTITY) is body
@@ -0,0 +1,116 @@
+import asyncio
+import types
+
+import pytest
+
+from app.middleware import disconnect as disconnect_module
+from app.middleware.disconnect import ClientDisconnectMiddleware
+from app.utils import stored_procedures
+from app.utils.stored_procedures import resolve_timeout
+
+SCOPE = {"type": "http", "method": "POST", "path": "/api/v1/communities"}
+
+class FakeClient:
+    """ASGI receive/send for one request: the test decides when the client disconnects"""
+
+    def __init__(self, body=b""):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.incoming.put_nowait({"type": "http.request", "body": body, "more_body": False})
+        self.sent = []
+
+    def disconnect(self):
+        self.incoming.put_nowait({"type": "http.disconnect"})
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send(self, message):
+        self.sent.append(message)
+
+@pytest.fixture
+def stats(monkeypatch):
+    monkeypatch.setattr(disconnect_module, "disconnect_stats", {"cancelled_requests": 0})
+    return disconnect_module.disconnect_stats
+
+@pytest.mark.asyncio
+async def test_disconnect_mid_handler_cancels_it(stats):
+    client = FakeClient()
+    state = types.SimpleNamespace(started=asyncio.Event(), cancelled=False)
+
+    async def app(scope, receive, send):
+        await receive()
+        state.started.set()
+        try:
+            await asyncio.Event().wait()  # A long query
+        except asyncio.CancelledError:
+            state.cancelled = True
+            raise
+
+    middleware = asyncio.create_task(ClientDisconnectMiddleware(app)(SCOPE, client.receive, client.send))
+    await state.started.wait()
+    client.disconnect()
+    await asyncio.wait_for(middleware, timeout=1)
+
+    assert state.cancelled
+    assert stats["cancelled_requests"] == 1
+    assert client.sent == []
+
+@pytest.mark.asyncio
+async def test_disconnect_after_the_response_lets_background_work_finish(stats):
+    client = FakeClient()
+    state = types.SimpleNamespace(responded=asyncio.Event(), resume=asyncio.Event(), finished=False)
+
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+        state.responded.set()
+        await state.resume.wait()  # Background task after the response
+        state.finished = True
+
+    middleware = asyncio.create_task(ClientDisconnectMiddleware(app)(SCOPE, client.receive, client.send))
+    await state.responded.wait()
+    client.disconnect()
+    await asyncio.sleep(0)
+    state.resume.set()
+    await asyncio.wait_for(middleware, timeout=1)
+
+    assert state.finished
+    assert stats["cancelled_requests"] == 0
+    assert client.sent[-1]["body"] == b"ok"
+
+@pytest.mark.asyncio
+async def test_request_body_reaches_the_handler(stats):
+    client = FakeClient(body=b'{"name": "hikers"}')
+    received = []
+
+    async def app(scope, receive, send):
+        received.append(await receive())
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    await asyncio.wait_for(ClientDisconnectMiddleware(app)(SCOPE, client.receive, client.send), timeout=1)
+
+    assert received == [{"type": "http.request", "body": b'{"name": "hikers"}', "more_body": False}]
+    assert [m["type"] for m in client.sent] == ["http.response.start", "http.response.body"]
+
+@pytest.mark.asyncio
+async def test_streams_get_the_raw_receive(stats):
+    client = FakeClient()
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(receive)
+
+    await ClientDisconnectMiddleware(app)({**SCOPE, "path": "/api/v1/communities/x/stream"}, client.receive, client.send)
+
+    assert seen == [client.receive]
+
+def test_resolve_timeout_prefers_the_settings_override(monkeypatch):
+    monkeypatch.setattr(
+        stored_procedures.settings, "PROCEDURE_TIMEOUTS", {"activity.sp_community_search": 30.0}
+    )
+
+    assert resolve_timeout("activity.sp_community_search", 5.0) == 30.0
+    assert resolve_timeout("activity.sp_community_get_by_id", 5.0) == 5.0
+    assert resolve_timeout("activity.sp_community_get_by_id", None) is None
@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.utils.etag import CACHE_CONTROL, etag_matches, make_etag, not_modified, set_etag
+
+COMMUNITY_ID = UUID("5b1d7c2e-8f3a-4e6b-9c0d-1a2b3c4d5e6f")
+
+def request_with(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("feed", COMMUNITY_ID, 7, None, "limit=20")
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("feed", COMMUNITY_ID, 7, None, "limit=20")
+
+def test_make_etag_changes_with_any_part():
+    base = make_etag("feed", COMMUNITY_ID, 7, None, "limit=20")
+
+    assert make_etag("feed", COMMUNITY_ID, 8, None, "limit=20") != base
+    assert make_etag("feed", COMMUNITY_ID, 7, "viewer", "limit=20") != base
+    assert make_etag("feed", COMMUNITY_ID, 7, None, "limit=50") != base
+
+def test_etag_matches_weak_and_strong_forms_in_a_list():
+    etag = make_etag("feed", COMMUNITY_ID, 7)
+    opaque = etag.removeprefix("W/")
+
+    assert etag_matches(request_with(etag), etag)
+    assert etag_matches(request_with(opaque), etag)
+    assert etag_matches(request_with(f'"other", {etag}'), etag)
+    assert etag_matches(request_with("*"), etag)
+
+def test_etag_does_not_match_missing_or_other_tags():
+    etag = make_etag("feed", COMMUNITY_ID, 7)
+
+    assert not etag_matches(request_with(), etag)
+    assert not etag_matches(request_with(make_etag("feed", COMMUNITY_ID, 8)), etag)
+
+def test_not_modified_and_set_etag_headers():
+    etag = make_etag("community", COMMUNITY_ID)
+    response = Response()
+    set_etag(response, etag)
+
+    assert not_modified(etag).status_code == 304
+    assert not_modified(etag).headers["etag"] == etag
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == CACHE_CONTROL
@@ -0,0 +1,111 @@
+import types
+
+import pytest
+
+from app.core import health as health_module
+from app.core.health import ERROR, OK, SATURATED, UNAVAILABLE, HealthMonitor
+
+CLOCKED_MODULE = health_module
+
+class FakePool:
+    def __init__(self, size=5, idle=2, max_size=5):
+        self.size, self.idle, self.max_size = size, idle, max_size
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.idle
+
+    def get_max_size(self):
+        return self.max_size
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(health_module.settings, "HEALTH_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(health_module.settings, "HEALTH_STALE_SECONDS", 30.0)
+    monkeypatch.setattr(health_module.settings, "HEALTH_CHECK_TIMEOUT_SECONDS", 1.0)
+    return health_module.settings
+
+@pytest.fixture
+def deps(monkeypatch):
+    """Fake pool and Redis; `database_up` decides the SELECT 1 probe"""
+    state = types.SimpleNamespace(pool=FakePool(), database_up=True, probes=0)
+    monkeypatch.setattr(health_module, "db", state)
+    monkeypatch.setattr(health_module, "redis_client", types.SimpleNamespace(client=None))
+    return state
+
+@pytest.fixture
+def monitor(deps):
+    monitor = HealthMonitor()
+
+    async def ping():
+        deps.probes += 1
+        if not deps.database_up:
+            raise ConnectionError("database down")
+
+    monitor._ping_database = ping
+    return monitor
+
+def test_not_ready_before_the_first_check(settings):
+    monitor = HealthMonitor()
+
+    assert not monitor.ready
+    assert monitor.snapshot()["status"] == "unavailable"
+
+@pytest.mark.asyncio
+async def test_ready_after_a_good_check(settings, clock, monitor):
+    await monitor.run_checks()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["ready"]
+    assert snapshot["status"] == "degraded"  # Redis not connected: reported, not fatal
+    assert snapshot["checks"] == {"api": OK, "database": OK, "redis": UNAVAILABLE}
+    assert snapshot["pool"] == {"size": 5, "idle": 2, "in_use": 3, "max_size": 5}
+
+@pytest.mark.asyncio
+async def test_ready_until_the_failure_threshold(settings, clock, deps, monitor):
+    deps.database_up = False
+
+    await monitor.run_checks()
+    await monitor.run_checks()
+    assert monitor.checks["database"] == ERROR
+    assert monitor.ready  # A blip doesn't take the instance out of rotation
+
+    await monitor.run_checks()
+    assert not monitor.ready
+
+    deps.database_up = True
+    await monitor.run_checks()
+    assert monitor.ready
+    assert monitor.database_failures == 0
+
+@pytest.mark.asyncio
+async def test_stale_result_is_not_ready(settings, clock, monitor):
+    await monitor.run_checks()
+
+    clock[0] += 31
+    assert not monitor.ready
+    assert monitor.snapshot()["checked_seconds_ago"] == 31
+
+@pytest.mark.asyncio
+async def test_saturated_pool_skips_the_probe_and_keeps_the_failure_count(settings, clock, deps, monitor):
+    deps.database_up = False
+    await monitor.run_checks()
+    assert deps.probes == 1
+
+    deps.pool.idle = 0
+    await monitor.run_checks()
+
+    assert deps.probes == 1
+    assert monitor.checks["database"] == SATURATED
+    assert monitor.database_failures == 1
+
+@pytest.mark.asyncio
+async def test_saturated_pool_is_still_probed_on_the_first_check(settings, clock, deps, monitor):
+    deps.pool.idle = 0
+
+    await monitor.run_checks()
+
+    assert deps.probes == 1
+    assert monitor.checks["database"] == OK
@@ -0,0 +1,150 @@
+import json
+import types
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import idempotency
+from app.core.errors import raise_http_exception
+from app.core.idempotency import idempotent, REPLAYED_HEADER
+
+class FakeRedis:
+    """The few string commands the idempotency store uses"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(idempotency, "redis_client", types.SimpleNamespace(client=fake))
+    monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_ENABLED", True)
+    return fake
+
+def make_request(body: bytes = b"{}", key: str = "retry-1", path: str = "/api/v1/communities/x/join"):
+    headers = [(b"content-type", b"application/json")]
+    if key is not None:
+        headers.append((b"idempotency-key", key.encode()))
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": headers}
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+USER = types.SimpleNamespace(user_id="9f0f1a43-3a2b-4c55-9a57-3c1f0c6d2a10")
+
+def counting_endpoint(result=None, error=None):
+    calls = []
+
+    @idempotent()
+    async def endpoint(request: Request, current_user):
+        calls.append(request)
+        if error:
+            raise_http_exception(error)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return endpoint, calls
+
+@pytest.mark.asyncio
+async def test_without_header_every_call_runs(redis):
+    endpoint, calls = counting_endpoint({"joined": True})
+
+    await endpoint(request=make_request(key=None), current_user=USER)
+    await endpoint(request=make_request(key=None), current_user=USER)
+
+    assert len(calls) == 2
+    assert redis.values == {}
+
+@pytest.mark.asyncio
+async def test_retry_with_same_key_and_body_is_replayed(redis):
+    endpoint, calls = counting_endpoint({"joined": True})
+
+    first = await endpoint(request=make_request(b'{"a":1}'), current_user=USER)
+    replay = await endpoint(request=make_request(b'{"a":1}'), current_user=USER)
+
+    assert len(calls) == 1
+    assert first == {"joined": True}
+    assert replay.status_code == 200
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert json.loads(replay.body) == {"joined": True}
+
+@pytest.mark.asyncio
+async def test_same_key_with_different_body_is_rejected(redis):
+    endpoint, calls = counting_endpoint({"joined": True})
+    await endpoint(request=make_request(b'{"a":1}'), current_user=USER)
+
+    with pytest.raises(HTTPException) as exc:
+        await endpoint(request=make_request(b'{"a":2}'), current_user=USER)
+
+    assert exc.value.status_code == 422
+    assert exc.value.detail["error_code"] == "IDEMPOTENCY_KEY_REUSED"
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_same_key_on_another_path_is_rejected(redis):
+    endpoint, _ = counting_endpoint({"joined": True})
+    await endpoint(request=make_request(path="/a"), current_user=USER)
+
+    with pytest.raises(HTTPException) as exc:
+        await endpoint(request=make_request(path="/b"), current_user=USER)
+
+    assert exc.value.detail["error_code"] == "IDEMPOTENCY_KEY_REUSED"
+
+@pytest.mark.asyncio
+async def test_client_errors_are_replayed(redis):
+    endpoint, calls = counting_endpoint(error="ALREADY_MEMBER")
+
+    with pytest.raises(HTTPException):
+        await endpoint(request=make_request(), current_user=USER)
+    replay = await endpoint(request=make_request(), current_user=USER)
+
+    assert len(calls) == 1
+    assert replay.status_code == 400
+    assert json.loads(replay.body)["detail"]["error_code"] == "ALREADY_MEMBER"
+
+@pytest.mark.asyncio
+async def test_unexpected_failure_releases_the_key(redis):
+    endpoint, calls = counting_endpoint(RuntimeError("connection lost"))
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await endpoint(request=make_request(), current_user=USER)
+
+    assert len(calls) == 2
+    assert redis.values == {}
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped_per_user(redis):
+    endpoint, calls = counting_endpoint({"joined": True})
+    other = types.SimpleNamespace(user_id="0b7c8e0e-2f7d-4f0a-8d0e-7c5e6b1a9f33")
+
+    await endpoint(request=make_request(), current_user=USER)
+    await endpoint(request=make_request(), current_user=other)
+
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_overlong_key_is_rejected(redis):
+    endpoint, calls = counting_endpoint({"joined": True})
+
+    with pytest.raises(HTTPException) as exc:
+        await endpoint(request=make_request(key="k" * 256), current_user=USER)
+
+    assert exc.value.detail["error_code"] == "INVALID_IDEMPOTENCY_KEY"
+    assert calls == []
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+from starlette.responses import Response
+
+from app.models.common import PaginationMeta
+from app.utils.json_lists import json_body_response, json_list_body
+
+PAGINATION = PaginationMeta(limit=20, offset=0, total_count=None, count_kind='none', next_cursor="abc")
+
+def test_items_are_spliced_verbatim():
+    items = '[{"post_id":"p1","title":"Café","created_at":"2026-01-01T00:00:00+00:00"}]'
+
+    body = json_list_body("posts", items, PAGINATION)
+
+    assert items.encode("utf-8") in body
+    assert json.loads(body) == {
+        "posts": json.loads(items),
+        "pagination": {
+            "limit": 20,
+            "offset": 0,
+            "total_count": None,
+            "count_kind": "none",
+            "total_count_label": None,
+            "next_cursor": "abc",
+        },
+    }
+
+def test_extra_sections_are_encoded_like_json_response():
+    pinned = [{"post_id": UUID(int=1), "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}]
+
+    body = json_list_body("posts", "[]", PAGINATION, pinned=pinned)
+    document = json.loads(body)
+
+    assert list(document) == ["pinned", "posts", "pagination"]
+    assert document["pinned"] == [{"post_id": str(UUID(int=1)), "created_at": "2026-01-01T00:00:00+00:00"}]
+    assert document["posts"] == []
+
+def test_json_body_response_keeps_route_headers():
+    route_response = Response()
+    route_response.headers["ETag"] = 'W/"abc"'
+
+    response = json_body_response(b'{"members":[]}', route_response)
+
+    assert response.body == b'{"members":[]}'
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == 'W/"abc"'
+    assert json_body_response(b"{}").body == b"{}"
@@ -0,0 +1,118 @@
+import types
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.auth import CurrentUser, get_current_user
+from app.routes import communities
+from app.services import community_service as community_service_module
+from app.services.community_service import CommunityService
+from app.utils.pagination import decode_cursor, encode_cursor
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def _member(n, role="member", total_count=7):
+    return {
+        "user_id": UUID(int=n + 1),
+        "role": role,
+        "status": "active",
+        "joined_at": START + timedelta(days=n),
+        "total_count": total_count,
+    }
+
+@pytest.fixture
+def procedure(monkeypatch):
+    """Fake sp_community_get_members: returns `rows`, records the arguments"""
+    state = types.SimpleNamespace(rows=[], calls=[])
+
+    async def execute(db, name, timeout=None, **kwargs):
+        state.calls.append(kwargs)
+        return state.rows[:kwargs["p_limit"]]
+
+    async def get_many(db, user_ids):
+        return {
+            user_id: {
+                "username": "anna", "first_name": None, "last_name": None,
+                "main_photo_url": None, "is_verified": False,
+            }
+            for user_id in user_ids
+        }
+
+    monkeypatch.setattr(community_service_module, "execute_stored_procedure", execute)
+    monkeypatch.setattr(community_service_module, "author_cache", types.SimpleNamespace(get_many=get_many))
+    return state
+
+def test_member_cursor_round_trips():
+    user_id = uuid4()
+    cursor = encode_cursor(r="co_organizer", t=START.isoformat(), id=user_id)
+
+    assert CommunityService(None)._parse_member_cursor(cursor) == ("co_organizer", START, user_id)
+
+def test_member_cursor_with_unknown_role_is_rejected():
+    cursor = encode_cursor(r="owner", t=START.isoformat(), id=str(uuid4()))
+
+    with pytest.raises(HTTPException) as raised:
+        CommunityService(None)._parse_member_cursor(cursor)
+    assert raised.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_full_page_returns_a_cursor_after_its_last_row(procedure):
+    procedure.rows = [_member(0, "organizer"), _member(1), _member(2)]
+
+    members, total_count, next_cursor = await CommunityService(None).get_members(uuid4(), uuid4(), limit=2)
+
+    assert [m.user_id for m in members] == [UUID(int=1), UUID(int=2)]
+    assert total_count == 7
+    assert decode_cursor(next_cursor) == {
+        "r": "member", "t": (START + timedelta(days=1)).isoformat(), "id": str(UUID(int=2))
+    }
+
+@pytest.mark.asyncio
+async def test_keyset_page_passes_the_cursor_and_role_without_counting(procedure):
+    procedure.rows = [_member(5, total_count=None)]
+    cursor = encode_cursor(r="member", t=START.isoformat(), id=UUID(int=9))
+
+    members, total_count, next_cursor = await CommunityService(None).get_members(
+        uuid4(), uuid4(), limit=2, role="member", after=cursor
+    )
+
+    call = procedure.calls[0]
+    assert (call["p_after_role"], call["p_after_joined_at"], call["p_after_user_id"]) == ("member", START, UUID(int=9))
+    assert call["p_role"] == "member"
+    assert call["p_count_mode"] == "none"
+    assert (len(members), total_count, next_cursor) == (1, None, None)
+
+class FakeService:
+    def __init__(self):
+        self.calls = []
+
+    async def get_members(self, **kwargs):
+        self.calls.append(kwargs)
+        return [], 0, None
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(communities.settings, "DB_JSON_LISTS", False)
+    service = FakeService()
+    app = FastAPI()
+    app.include_router(communities.router, prefix="/api/v1/communities")
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(user_id=str(uuid4()), email="a@example.com")
+    app.dependency_overrides[communities.get_community_service] = lambda: service
+    return types.SimpleNamespace(http=TestClient(app), service=service)
+
+def test_search_needs_three_characters(client):
+    url = f"/api/v1/communities/{uuid4()}/members"
+
+    assert client.http.get(url, params={"q": "an"}).status_code == 422
+    assert client.http.get(url, params={"q": "ann"}).status_code == 200
+    assert client.service.calls[0]["search"] == "ann"
+
+def test_role_filter_is_validated(client):
+    url = f"/api/v1/communities/{uuid4()}/members"
+
+    assert client.http.get(url, params={"role": "owner"}).status_code == 422
+    assert client.http.get(url, params={"role": "co_organizer"}).status_code == 200
+    assert client.service.calls[0]["role"] == "co_organizer"
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.admission import EXPENSIVE, READ, WRITE
+from app.middleware.admission import classify
+from app.models.community import RemoveUserContentRequest
+
+AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("since, until", [(None, None), (AT, None), (None, AT), (AT, AT + timedelta(seconds=1))])
+def test_open_or_ordered_windows_are_accepted(since, until):
+    request = RemoveUserContentRequest(user_id=uuid4(), since=since, until=until)
+
+    assert (request.since, request.until) == (since, until)
+
+@pytest.mark.parametrize("until", [AT, AT - timedelta(days=1)])
+def test_empty_or_reversed_windows_are_rejected(until):
+    with pytest.raises(ValidationError, match="since must be before until"):
+        RemoveUserContentRequest(user_id=uuid4(), since=AT, until=until)
+
+def test_bulk_content_removal_is_shed_first():
+    path = f"/api/v1/communities/{uuid4()}/moderation/remove-user-content"
+
+    assert classify("POST", path) == EXPENSIVE
+    assert classify("POST", f"/api/v1/communities/{uuid4()}/posts") == WRITE
+    assert classify("GET", f"/api/v1/communities/{uuid4()}/posts") == READ
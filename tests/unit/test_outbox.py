@@ -0,0 +1,106 @@
+import contextlib
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+
+from app.services import outbox
+from app.services.outbox import MemorySink, OutboxRelay, encode_event
+
+class FakeOutbox:
+    """In-memory activity.community_outbox; a failed transaction rolls claimed events back"""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.committed_deletes = []
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        deletes = []
+        yield deletes
+        # Committed only when the block exits without an exception
+        self.committed_deletes.extend(deletes)
+        self.events = [e for e in self.events if e["event_id"] not in deletes]
+
+    async def execute(self, db, name, conn=None, timeout=None, p_limit=None, p_event_ids=None):
+        if name == "activity.sp_community_outbox_claim":
+            return self.events[:p_limit]
+        conn.extend(p_event_ids)
+        return []
+
+def event(number, created_at=None, payload=None):
+    return {
+        "event_id": UUID(int=number),
+        "event_type": "member_joined",
+        "aggregate_id": UUID(int=1000),
+        "payload": payload if payload is not None else {"user_id": str(UUID(int=number))},
+        "created_at": created_at or datetime.now(timezone.utc),
+    }
+
+class FailingSink:
+    async def publish(self, events):
+        raise ConnectionError("stream unavailable")
+
+@pytest.fixture
+def store(monkeypatch):
+    def make(events, batch_size=2):
+        fake = FakeOutbox(events)
+        monkeypatch.setattr(outbox, "execute_stored_procedure", fake.execute)
+        monkeypatch.setattr(outbox.settings, "OUTBOX_BATCH_SIZE", batch_size)
+        return fake
+    return make
+
+def test_encode_event_flattens_fields_to_strings():
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    encoded = encode_event(event(1, created_at, {"a": 1}))
+
+    assert encoded == {
+        "event_id": str(UUID(int=1)),
+        "type": "member_joined",
+        "aggregate_id": str(UUID(int=1000)),
+        "payload": json.dumps({"a": 1}),
+        "created_at": created_at.isoformat(),
+    }
+    assert encode_event(event(1, created_at, '{"a":1}'))["payload"] == '{"a":1}'
+
+@pytest.mark.asyncio
+async def test_drain_publishes_all_events_in_batches(store):
+    fake = store([event(n) for n in range(1, 6)], batch_size=2)
+    sink = MemorySink()
+    relay = OutboxRelay(fake, sink)
+
+    await relay.drain()
+
+    assert [e["event_id"] for e in sink.events] == [str(UUID(int=n)) for n in range(1, 6)]
+    assert fake.events == []
+    assert relay.stats()["published"] == 5
+    assert relay.stats()["batches"] == 3
+
+@pytest.mark.asyncio
+async def test_failed_publish_keeps_events_for_the_next_pass(store):
+    fake = store([event(1), event(2)])
+    relay = OutboxRelay(fake, FailingSink())
+
+    assert await relay.relay_batch() == 0
+
+    assert len(fake.events) == 2
+    assert fake.committed_deletes == []
+    assert relay.stats()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_empty_outbox_is_a_no_op(store):
+    relay = OutboxRelay(store([]), MemorySink())
+
+    assert await relay.relay_batch() == 0
+    assert relay.stats()["batches"] == 0
+
+@pytest.mark.asyncio
+async def test_lag_is_measured_from_the_oldest_event(store):
+    old = datetime.now(timezone.utc) - timedelta(seconds=30)
+    relay = OutboxRelay(store([event(1, old), event(2)]), MemorySink())
+
+    await relay.relay_batch()
+
+    assert relay.stats()["last_lag_seconds"] >= 30
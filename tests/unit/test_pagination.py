@@ -0,0 +1,44 @@
+import pytest
+
+from app.utils import pagination
+from app.utils.pagination import build_pagination_meta
+
+@pytest.fixture(autouse=True)
+def count_cap(monkeypatch):
+    monkeypatch.setattr(pagination.settings, "PAGINATION_COUNT_CAP", 1000)
+
+def test_exact_count_is_labelled_as_is():
+    meta = build_pagination_meta(20, 40, 123, 'exact')
+
+    assert (meta.limit, meta.offset, meta.total_count) == (20, 40, 123)
+    assert meta.count_kind == 'exact'
+    assert meta.total_count_label == "123"
+    assert meta.next_cursor is None
+
+def test_capped_count_above_the_cap_is_clamped_and_labelled():
+    meta = build_pagination_meta(20, 0, 1001, 'capped')
+
+    assert meta.total_count == 1000
+    assert meta.total_count_label == "1000+"
+    assert meta.count_kind == 'capped'
+
+def test_capped_count_within_the_cap_is_exact():
+    meta = build_pagination_meta(20, 0, 1000, 'capped')
+
+    assert meta.total_count == 1000
+    assert meta.total_count_label == "1000"
+
+def test_estimate_is_labelled_approximate():
+    meta = build_pagination_meta(20, 0, 5400, 'estimate')
+
+    assert meta.total_count == 5400
+    assert meta.total_count_label == "~5400"
+
+@pytest.mark.parametrize("count_mode, total_count", [('none', 42), ('exact', None)])
+def test_no_count(count_mode, total_count):
+    meta = build_pagination_meta(20, 0, total_count, count_mode, next_cursor="abc")
+
+    assert meta.total_count is None
+    assert meta.count_kind == 'none'
+    assert meta.total_count_label is None
+    assert meta.next_cursor == "abc"
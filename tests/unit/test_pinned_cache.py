@@ -0,0 +1,83 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services import pinned_cache as pinned_cache_module
+from app.services.pinned_cache import PinnedPostCache
+
+CLOCKED_MODULE = pinned_cache_module
+
+@pytest.fixture
+def procedure(monkeypatch):
+    """Fake sp_community_post_get_pinned: one row per call, records the communities asked for"""
+    calls = []
+
+    async def execute(db, name, timeout=None, p_community_id=None, p_limit=None):
+        calls.append(p_community_id)
+        return [{"post_id": uuid4(), "community_id": p_community_id}]
+
+    monkeypatch.setattr(pinned_cache_module, "execute_stored_procedure", execute)
+    return calls
+
+@pytest.mark.asyncio
+async def test_same_feed_version_is_served_from_memory(clock, procedure):
+    cache = PinnedPostCache(max_size=10, ttl_seconds=60)
+    community_id = uuid4()
+
+    first = await cache.get(None, community_id, 7)
+    second = await cache.get(None, community_id, 7)
+
+    assert first is second
+    assert procedure == [community_id]
+    assert cache.stats() == {"hits": 1, "misses": 1, "invalidations": 0, "size": 1}
+
+@pytest.mark.asyncio
+async def test_newer_feed_version_refetches(clock, procedure):
+    cache = PinnedPostCache(max_size=10, ttl_seconds=60)
+    community_id = uuid4()
+
+    first = await cache.get(None, community_id, 7)
+    second = await cache.get(None, community_id, 8)
+
+    assert first is not second
+    assert len(procedure) == 2
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(clock, procedure):
+    cache = PinnedPostCache(max_size=10, ttl_seconds=60)
+    community_id = uuid4()
+
+    await cache.get(None, community_id, 7)
+    clock[0] += 60
+    await cache.get(None, community_id, 7)
+
+    assert len(procedure) == 2
+
+@pytest.mark.asyncio
+async def test_pinned_changed_notification_drops_the_entry(clock, procedure):
+    cache = PinnedPostCache(max_size=10, ttl_seconds=60)
+    community_id = uuid4()
+    await cache.get(None, community_id, 7)
+
+    cache.on_pinned_changed({"community_id": str(community_id)})
+    cache.on_pinned_changed({"community_id": str(uuid4())})  # not cached: ignored
+    await cache.get(None, community_id, 7)
+
+    assert len(procedure) == 2
+    assert cache.invalidations == 1
+
+@pytest.mark.asyncio
+async def test_least_recently_used_community_is_evicted(clock, procedure):
+    cache = PinnedPostCache(max_size=2, ttl_seconds=60)
+    a, b, c = uuid4(), uuid4(), uuid4()
+
+    await cache.get(None, a, 1)
+    await cache.get(None, b, 1)
+    await cache.get(None, a, 1)
+    await cache.get(None, c, 1)  # evicts b
+    procedure.clear()
+
+    await cache.get(None, a, 1)
+    await cache.get(None, b, 1)
+
+    assert procedure == [b]
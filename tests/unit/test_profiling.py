@@ -0,0 +1,91 @@
+import types
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import auth as auth_module
+from app.core import profiling as profiling_module
+from app.core.auth import require_admin
+from app.core.profiling import ProfileStore, should_profile, sign_trace_id
+
+@pytest.fixture
+def settings(monkeypatch):
+    monkeypatch.setattr(profiling_module.settings, "PROFILING_SECRET", "s3cret")
+    monkeypatch.setattr(profiling_module.settings, "PROFILING_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling_module.settings, "PROFILING_MAX_PROFILES", 2)
+    return profiling_module.settings
+
+@pytest.fixture
+def sample(monkeypatch):
+    """Fixed draw for the random sample"""
+    draw = [0.5]
+    monkeypatch.setattr(profiling_module, "random", types.SimpleNamespace(random=lambda: draw[0]))
+    return draw
+
+class FakeProfiler:
+    def stop(self):
+        return object()
+
+def test_signed_trace_id_is_profiled(settings):
+    assert should_profile("trace-1", sign_trace_id("trace-1"))
+
+def test_signature_for_another_trace_id_is_not(settings, sample):
+    assert not should_profile("trace-1", sign_trace_id("trace-2"))
+
+def test_non_ascii_signature_is_rejected_not_raised(settings, sample):
+    assert not should_profile("trace-1", "sïgnature")
+
+def test_signature_is_ignored_without_a_secret(settings, sample, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "")
+    sample[0] = 0.0
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 0.1)
+
+    # Unsigned path: only the sample decides
+    assert should_profile("trace-1", "anything")
+
+def test_unsigned_requests_follow_the_sample_rate(settings, sample, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 0.25)
+
+    sample[0] = 0.2
+    assert should_profile("trace-1", None)
+    sample[0] = 0.3
+    assert not should_profile("trace-1", None)
+
+def test_store_keeps_the_newest_profiles(settings):
+    store = ProfileStore()
+    for trace_id in ("a", "b", "c"):
+        store.active = True
+        store.finish(FakeProfiler(), trace_id, "GET", "/x", 200, started=0.0)
+
+    assert [profile["trace_id"] for profile in store.list()] == ["c", "b"]
+    assert store.render("a", "html") is None
+    assert not store.active
+
+def test_store_refreshes_a_repeated_trace_id(settings):
+    store = ProfileStore()
+    for trace_id in ("a", "b", "a", "c"):
+        store.finish(FakeProfiler(), trace_id, "GET", "/x", 200, started=0.0)
+
+    assert [profile["trace_id"] for profile in store.list()] == ["c", "a"]
+
+def test_store_runs_one_profiler_at_a_time(settings, monkeypatch):
+    monkeypatch.setattr(profiling_module, "Profiler", lambda **kwargs: types.SimpleNamespace(start=lambda: None))
+    store = ProfileStore()
+
+    assert store.start() is not None
+    assert store.start() is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("api_key", [None, "wrong", "ädmin-key"])
+async def test_admin_key_mismatch_is_forbidden(monkeypatch, api_key):
+    monkeypatch.setattr(auth_module.settings, "ADMIN_API_KEY", "admin-key")
+
+    with pytest.raises(HTTPException) as raised:
+        await require_admin(api_key)
+    assert raised.value.status_code == 403
+
+@pytest.mark.asyncio
+async def test_admin_key_match_is_allowed(monkeypatch):
+    monkeypatch.setattr(auth_module.settings, "ADMIN_API_KEY", "admin-key")
+
+    assert await require_admin("admin-key") is None
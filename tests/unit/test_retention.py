@@ -0,0 +1,113 @@
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import retention as retention_module
+from app.services.retention import PURGE_PROCEDURES, RetentionPurger
+
+def _batch(purged, scanned, last_id):
+    return [{
+        "purged_count": purged,
+        "scanned_count": scanned,
+        "last_updated_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "last_id": last_id,
+    }]
+
+@pytest.fixture
+def settings(monkeypatch):
+    values = {
+        "RETENTION_BATCH_SIZE": 2,
+        "RETENTION_MAX_BATCHES_PER_RUN": 3,
+        "RETENTION_BATCH_PAUSE_SECONDS": 0.2,
+        "ADMISSION_LATENCY_TARGET_MS": 100,
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(retention_module.settings, name, value)
+    return values
+
+@pytest.fixture
+def procedure(monkeypatch):
+    """Fake purge procedures: `batches[name]` is popped per call ([] = lock held elsewhere)"""
+    state = types.SimpleNamespace(batches={name: [] for name in PURGE_PROCEDURES.values()}, calls=[])
+
+    async def execute(db, name, timeout=None, **kwargs):
+        state.calls.append((name, kwargs))
+        queue = state.batches[name]
+        return queue.pop(0) if queue else []
+
+    monkeypatch.setattr(retention_module, "execute_stored_procedure", execute)
+    return state
+
+@pytest.fixture
+def pauses(monkeypatch):
+    """Records sleeps; `admission.latency_ewma_ms` is what the throttle sees"""
+    state = types.SimpleNamespace(slept=[], admission=types.SimpleNamespace(latency_ewma_ms=0.0))
+
+    async def sleep(seconds):
+        state.slept.append(seconds)
+
+    monkeypatch.setattr(retention_module, "asyncio", types.SimpleNamespace(sleep=sleep))
+    monkeypatch.setattr(retention_module, "admission", state.admission)
+    return state
+
+POSTS = PURGE_PROCEDURES["posts"]
+COMMENTS = PURGE_PROCEDURES["comments"]
+CUTOFF = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+@pytest.mark.asyncio
+async def test_batches_continue_from_the_last_row_until_a_short_batch(settings, procedure, pauses):
+    procedure.batches[POSTS] = [_batch(2, 2, "p2"), _batch(1, 1, "p3")]
+
+    assert await RetentionPurger(None)._purge(POSTS, CUTOFF) == 3
+
+    first, second = (kwargs for _, kwargs in procedure.calls)
+    assert first["p_after_id"] is None
+    assert second["p_after_id"] == "p2"
+    assert pauses.slept == [0.2]  # Only between batches
+
+@pytest.mark.asyncio
+async def test_batches_stop_at_the_per_run_maximum(settings, procedure, pauses):
+    procedure.batches[POSTS] = [_batch(2, 2, f"p{n}") for n in range(5)]
+
+    assert await RetentionPurger(None)._purge(POSTS, CUTOFF) == 6
+    assert len(procedure.calls) == 3
+
+@pytest.mark.asyncio
+async def test_lock_held_elsewhere_is_none_but_a_lost_lock_keeps_the_partial_count(settings, procedure, pauses):
+    purger = RetentionPurger(None)
+    assert await purger._purge(POSTS, CUTOFF) is None
+
+    procedure.batches[POSTS] = [_batch(2, 2, "p2")]  # Then the lock is gone
+    assert await purger._purge(POSTS, CUTOFF) == 2
+
+@pytest.mark.asyncio
+async def test_throttle_backs_off_while_latency_is_over_target(settings, procedure, pauses):
+    pauses.admission.latency_ewma_ms = 250.0
+    procedure.batches[POSTS] = [_batch(2, 2, "p2"), _batch(0, 0, None)]
+
+    await RetentionPurger(None)._purge(POSTS, CUTOFF)
+
+    assert pauses.slept == [pytest.approx(2.0)]
+
+@pytest.mark.asyncio
+async def test_run_skips_when_another_worker_holds_the_lock(settings, procedure, pauses):
+    purger = RetentionPurger(None)
+
+    await purger.run()
+
+    assert [name for name, _ in procedure.calls] == [POSTS]
+    assert purger.last_run == {}
+    assert purger.purged == {"posts": 0, "comments": 0}
+
+@pytest.mark.asyncio
+async def test_run_purges_posts_then_comments_and_keeps_totals(settings, procedure, pauses):
+    procedure.batches[POSTS] = [_batch(1, 1, "p1")]
+    procedure.batches[COMMENTS] = [_batch(0, 0, None)]
+    purger = RetentionPurger(None)
+
+    await purger.run()
+
+    assert [name for name, _ in procedure.calls] == [POSTS, COMMENTS]
+    assert purger.purged == {"posts": 1, "comments": 0}
+    assert (purger.last_run["posts"], purger.last_run["comments"]) == (1, 0)
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+def slow_call(results, calls, gate):
+    async def call():
+        calls.append(1)
+        await gate.wait()
+        if isinstance(results, Exception):
+            raise results
+        return results
+    return call
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    flight, calls, gate = SingleFlight(), [], asyncio.Event()
+    func = slow_call([{"id": 1}], calls, gate)
+
+    waiting = [asyncio.create_task(flight.do("feed", ("feed", 1), func)) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiting)
+
+    assert len(calls) == 1
+    assert all(rows == [{"id": 1}] for rows in results)
+    assert flight.stats() == {"feed": {"calls": 5, "executions": 1, "coalesced": 4}}
+
+@pytest.mark.asyncio
+async def test_callers_get_their_own_row_dicts():
+    flight, gate = SingleFlight(), asyncio.Event()
+    gate.set()
+    func = slow_call([{"id": 1}], [], gate)
+
+    first, second = await asyncio.gather(flight.do("feed", "k", func), flight.do("feed", "k", func))
+    first[0]["author"] = "anna"
+
+    assert second == [{"id": 1}]
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    flight, calls, gate = SingleFlight(), [], asyncio.Event()
+    gate.set()
+    func = slow_call([], calls, gate)
+
+    await asyncio.gather(flight.do("feed", 1, func), flight.do("feed", 2, func))
+
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_nothing_is_cached_after_completion():
+    flight, calls, gate = SingleFlight(), [], asyncio.Event()
+    gate.set()
+    func = slow_call([], calls, gate)
+
+    await flight.do("feed", "k", func)
+    await flight.do("feed", "k", func)
+
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_exception_is_shared_and_key_released():
+    flight, calls, gate = SingleFlight(), [], asyncio.Event()
+    func = slow_call(RuntimeError("timeout"), calls, gate)
+
+    waiting = [asyncio.create_task(flight.do("feed", "k", func)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiting, return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight._inflight == {}
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight, calls, gate = SingleFlight(), [], asyncio.Event()
+    func = slow_call([{"id": 1}], calls, gate)
+
+    cancelled = asyncio.create_task(flight.do("feed", "k", func))
+    survivor = asyncio.create_task(flight.do("feed", "k", func))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    gate.set()
+
+    assert await survivor == [{"id": 1}]
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert len(calls) == 1
@@ -0,0 +1,122 @@
+import contextlib
+import types
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from app.core import slow_procedures
+from app.core.slow_procedures import SlowProcedureLog, _parse_plan, redact
+
+def test_redact_keeps_query_shape_values():
+    at = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+    assert redact(None) is None
+    assert redact(True) is True
+    assert redact(50) == 50
+    assert redact(0.5) == 0.5
+    assert redact(Decimal("1.5")) == Decimal("1.5")
+    assert redact(at) == at.isoformat()
+    assert redact(date(2026, 1, 1)) == "2026-01-01"
+
+def test_redact_hides_strings_ids_and_arrays():
+    assert redact("anna@example.com") == "<str len=16>"
+    assert redact([uuid4(), uuid4()]) == "<list len=2>"
+    assert redact(("a",)) == "<tuple len=1>"
+    assert redact(uuid4()) == "<UUID>"
+
+def test_parse_plan_reads_auto_explain_json():
+    assert _parse_plan('duration: 1.2 ms  plan:\n{"Plan": {"Node Type": "Seq Scan"}}') == {
+        "Plan": {"Node Type": "Seq Scan"}
+    }
+    assert _parse_plan("plan: not json") is None
+
+def test_parse_plan_drops_query_text_and_parameters():
+    message = (
+        'duration: 1.2 ms  plan:\n{"Query Text": "SELECT * FROM activity.sp_x($1)", '
+        '"Query Parameters": "$1 = \'anna@example.com\'", "Plan": {"Node Type": "Result"}}'
+    )
+
+    assert _parse_plan(message) == {"Plan": {"Node Type": "Result"}}
+
+@pytest.fixture
+def log(monkeypatch):
+    monkeypatch.setattr(slow_procedures.settings, "SLOW_PROCEDURE_THRESHOLD_MS", 100)
+    monkeypatch.setattr(slow_procedures.settings, "SLOW_EXPLAIN_ENABLED", False)
+    return SlowProcedureLog()
+
+def observe(log, procedure, seconds, **kwargs):
+    log.observe(None, procedure, "SELECT 1", [], kwargs, seconds, row_count=1, timeout=None)
+
+def test_only_calls_over_the_threshold_are_recorded_with_redacted_args(log):
+    observe(log, "activity.sp_community_post_get_feed", 0.05)
+    observe(log, "activity.sp_community_post_get_feed", 0.25, p_limit=20, p_search_text="secret")
+
+    (entry,) = log.entries()
+    assert entry["duration_ms"] == 250.0
+    assert entry["args"] == {"p_limit": 20, "p_search_text": "<str len=6>"}
+    assert entry["plans"] is None
+
+def test_entries_are_newest_first_and_filterable(log):
+    observe(log, "a", 0.2)
+    observe(log, "b", 0.3)
+    observe(log, "a", 0.4)
+
+    assert [e["duration_ms"] for e in log.entries()] == [400.0, 300.0, 200.0]
+    assert [e["duration_ms"] for e in log.entries(procedure="a")] == [400.0, 200.0]
+    assert log.entries(trace_id="missing") == []
+
+class FakeTransaction:
+    async def start(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+class FakeConnection:
+    """Records statements; the procedure call emits one auto_explain notice"""
+
+    def __init__(self, major):
+        self.major = major
+        self.executed = []
+        self.listener = None
+
+    def get_server_version(self):
+        return types.SimpleNamespace(major=self.major)
+
+    def add_log_listener(self, listener):
+        self.listener = listener
+
+    def remove_log_listener(self, listener):
+        self.listener = None
+
+    def transaction(self, readonly=False):
+        return FakeTransaction()
+
+    async def execute(self, statement):
+        self.executed.append(statement)
+
+    async def fetch(self, query, *params, timeout=None):
+        message = '{"Query Text": "SELECT 1", "Query Parameters": "$1 = \'x\'", "Plan": {"Node Type": "Result"}}'
+        self.listener(self, types.SimpleNamespace(message=f"duration: 1 ms  plan:\n{message}"))
+        self.listener(self, types.SimpleNamespace(message="unrelated notice"))
+
+class FakeDatabase:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextlib.asynccontextmanager
+    async def get_connection(self):
+        yield self.conn
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("major, hides_parameters", [(15, False), (16, True)])
+async def test_explain_attaches_plans_without_parameters(log, major, hides_parameters):
+    conn = FakeConnection(major)
+    entry = {"procedure": "activity.sp_x", "plans": None, "plan_error": None}
+
+    await log._explain(FakeDatabase(conn), entry, "SELECT * FROM activity.sp_x($1)", ["x"], None)
+
+    assert entry["plans"] == [{"Plan": {"Node Type": "Result"}}]
+    assert (slow_procedures._AUTO_EXPLAIN_NO_PARAMETERS in conn.executed) is hides_parameters
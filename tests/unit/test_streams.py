@@ -0,0 +1,46 @@
+import types
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes import streams
+
+class FakeCommunityService:
+    def __init__(self, versions):
+        self.versions = versions
+
+    async def get_content_versions(self, community_id, post_id=None):
+        return self.versions
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("versions", [None, {"post_in_community": False}])
+async def test_comment_stream_rejects_posts_outside_the_community(versions):
+    with pytest.raises(HTTPException) as exc:
+        await streams._ensure_post_in_community(uuid4(), uuid4(), FakeCommunityService(versions))
+
+    assert exc.value.status_code == 404
+    assert exc.value.detail["error_code"] == "POST_NOT_FOUND"
+
+@pytest.mark.asyncio
+async def test_comment_stream_accepts_posts_in_the_community():
+    service = FakeCommunityService({"post_in_community": True})
+
+    await streams._ensure_post_in_community(uuid4(), uuid4(), service)
+
+def test_disabled_streams_are_reported_as_such(monkeypatch):
+    monkeypatch.setattr(streams.settings, "SSE_ENABLED", False)
+
+    with pytest.raises(HTTPException) as exc:
+        streams._open_subscription("community:x")
+
+    assert exc.value.detail["error_code"] == "STREAMS_DISABLED"
+
+def test_full_broker_reports_capacity(monkeypatch):
+    monkeypatch.setattr(streams.settings, "SSE_ENABLED", True)
+    monkeypatch.setattr(streams, "broker", types.SimpleNamespace(subscribe=lambda topic: None))
+
+    with pytest.raises(HTTPException) as exc:
+        streams._open_subscription("community:x")
+
+    assert exc.value.detail["error_code"] == "STREAM_CAPACITY_REACHED"
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services import tag_index as tag_index_module
+from app.services.tag_index import TagIndex
+
+@pytest.fixture
+def index():
+    index = TagIndex()
+    index.apply_change(["Hiking", "hiking-club", "History", "coffee"], [])
+    index.apply_change(["Hiking", "coffee"], [])
+    index.apply_change(["Hiking"], [])
+    return index
+
+def test_suggest_matches_prefix_case_insensitively_by_count(index):
+    # Ties keep alphabetical (casefolded) order
+    assert index.suggest("HI") == [("Hiking", 3), ("hiking-club", 1), ("History", 1)]
+    assert index.suggest("cof") == [("coffee", 2)]
+    assert index.suggest("zzz") == []
+
+def test_suggest_respects_limit(index):
+    assert index.suggest("h", limit=1) == [("Hiking", 3)]
+
+def test_removing_last_use_drops_the_tag(index):
+    index.apply_change([], ["hiking-club", "History"])
+
+    assert index.suggest("hi") == [("Hiking", 3)]
+    assert len(index) == 2
+
+def test_removing_one_use_decrements(index):
+    index.apply_change([], ["coffee"])
+
+    assert index.suggest("coffee") == [("coffee", 1)]
+
+def test_removing_unknown_tag_is_ignored(index):
+    index.apply_change([], ["unknown"])
+
+    assert len(index) == 4
+
+def test_on_tags_changed_applies_notification_payload(index):
+    index.on_tags_changed({"added": ["Board Games"], "removed": None})
+
+    assert index.suggest("board") == [("Board Games", 1)]
+
+@pytest.mark.asyncio
+async def test_load_replaces_index_from_tag_counts(monkeypatch, index):
+    async def execute(db, name, timeout=None):
+        return [{"tag": "Photo Walk", "community_count": 4}]
+
+    monkeypatch.setattr(tag_index_module, "execute_stored_procedure", execute)
+    await index.load(None)
+
+    assert index.suggest("h") == []
+    assert index.suggest("photo") == [("Photo Walk", 4)]
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import timeline_service
+from app.services.timeline_service import (
+    SENTINEL,
+    TimelineService,
+    from_score,
+    timeline_key,
+    to_score,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
+
+P1, P2, P3, P4 = (str(UUID(int=i)) for i in range(1, 5))
+
+@pytest.fixture
+def service():
+    return TimelineService(db=None)
+
+def test_score_round_trips_with_microsecond_precision():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+    assert from_score(to_score(created_at)) == created_at
+
+def test_merge_is_newest_first_and_deduplicated(service):
+    stored = [(40, P1), (20, P2)]
+    fanin_a = [(30, P3), (20, P2)]
+    fanin_b = [(35, P4), (10, P1)]
+
+    assert service._merge([stored, fanin_a, fanin_b], 10) == [(40, P1), (35, P4), (30, P3), (20, P2)]
+
+def test_merge_stops_at_count(service):
+    assert service._merge([[(3, P1), (1, P2)], [(2, P3)]], 2) == [(3, P1), (2, P3)]
+    assert service._merge([], 5) == []
+
+def test_cursor_round_trip(service):
+    cursor = encode_cursor(s=1234567890123456, id=P2)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"s": 1234567890123456, "id": P2}
+    assert service._parse_cursor(cursor) == (1234567890123456, P2)
+
+@pytest.mark.parametrize("cursor", ["not base64 !", encode_cursor(s="x", id=P1), encode_cursor(id=P1), "WyJhIl0"])
+def test_malformed_cursor_is_rejected(service, cursor):
+    with pytest.raises(HTTPException) as exc:
+        service._parse_cursor(cursor)
+
+    assert exc.value.detail["error_code"] == "INVALID_CURSOR"
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def zadd(self, key, mapping):
+        self.commands.append(("zadd", key, mapping))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    def zremrangebyrank(self, key, start, end):
+        self.commands.append(("zremrangebyrank", key, start, end))
+
+    async def execute(self):
+        for command in self.commands:
+            if command[0] == "zadd":
+                self.redis.sets.setdefault(command[1], {}).update(command[2])
+
+class FakeRedis:
+    def __init__(self):
+        self.sets = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+@pytest.mark.asyncio
+async def test_rebuild_creates_the_key_before_reading_posts(monkeypatch, service):
+    redis = FakeRedis()
+    monkeypatch.setattr(timeline_service.redis_client, "client", redis)
+    user_id, community_id = uuid4(), uuid4()
+    key = timeline_key(user_id)
+
+    async def read_fanin(community_ids, before, count):
+        # Fan-out only writes to existing keys: the key must exist while the DB is read
+        assert key in redis.sets
+        # A post delivered by fan-out during the read
+        redis.sets[key][P4] = 50
+        return [[(40, P1), (30, P2)]]
+
+    monkeypatch.setattr(service, "_read_fanin", read_fanin)
+    await service._rebuild(user_id, [community_id])
+
+    assert redis.sets[key] == {SENTINEL: 0, P4: 50, P1: 40, P2: 30}
+
+@pytest.mark.asyncio
+async def test_home_feed_pages_with_pagination_meta(monkeypatch, service):
+    async def execute(db, name, timeout=None, **params):
+        return [{"community_id": uuid4(), "is_fanout": False}]
+
+    async def read_fanin(community_ids, before, count):
+        return [[(40, P1), (30, P2), (20, P3)]]
+
+    async def hydrate(post_ids, user_id):
+        return []
+
+    monkeypatch.setattr(timeline_service, "execute_stored_procedure", execute)
+    monkeypatch.setattr(timeline_service.redis_client, "client", None)
+    monkeypatch.setattr(service, "_read_fanin", read_fanin)
+    monkeypatch.setattr(service, "_hydrate", hydrate)
+
+    page = await service.get_home_feed(uuid4(), limit=2)
+
+    assert page.pagination.limit == 2
+    assert page.pagination.count_kind == 'none'
+    assert page.pagination.total_count is None
+    assert service._parse_cursor(page.pagination.next_cursor) == (30, P2)